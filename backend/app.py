@@ -1,24 +1,48 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, Response, stream_with_context
 from flask_cors import CORS
+import click
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 import os
 from dotenv import load_dotenv
-import sqlite3
 from datetime import datetime, timedelta
 import base64
+import csv
 import json
-import PyPDF2
+import gzip
+import hashlib
 import io
 import re
-import random
-import string
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import as_completed
+from db import get_db
+import cache
+import changes
+import codes
+import db
+import dedupe
+import importer
+import matching
+import messaging
+import metrics
+import resume_cache
+import resume_parser
+import scheduler
+import search
+import stats
+from resume_parser import extract_candidate_info, extract_text
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', os.urandom(24).hex())
+db.init_app(app)
 
 # CORS configuration for development
 CORS(app, supports_credentials=True, origins=['http://localhost:3000'])
@@ -26,16 +50,32 @@ CORS(app, supports_credentials=True, origins=['http://localhost:3000'])
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
-DATABASE = 'candidates.db'
+MAX_RESUME_BYTES = int(os.getenv('MAX_RESUME_MB', '10')) * 1024 * 1024
+
+# JSON responses at least this large are compressed
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '3'))
+
+# Brotli is optional; without it responses are only gzip-compressed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Whole request cap; batch uploads carry many resumes
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', '100')) * 1024 * 1024
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def init_db():
-    """Initialize SQLite database with all required tables"""
-    conn = sqlite3.connect(DATABASE)
+    """Initialize SQLite database with all required tables.
+
+    Nothing here commits: migrate() runs it inside one transaction, so a
+    failed or concurrent start never leaves a half-initialized database.
+    """
+    conn = get_db()
     cursor = conn.cursor()
     
     # Users table for authentication
@@ -86,12 +126,54 @@ def init_db():
         )
     ''')
     
+    # Text extracted from the uploaded resume, for full-text search
+    db.add_column_if_missing(cursor, 'candidates', 'resume_text', 'TEXT')
+    
+    # Secondary indexes for keyset pagination of the candidate list, alone
+    # and combined with each equality filter
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates (created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidates_status_created ON candidates (status, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidates_location_created ON candidates (location, created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidates_message_sent_created ON candidates (message_sent, created_at, id)')
+    
+    # Outbound message queue and the log of sent messages
+    messaging.init_queue(cursor)
+    messaging.init_message_log(cursor)
+    
+    # Parsed resume cache
+    resume_cache.init_cache(cursor)
+    
+    # Version rows that tell each process when its caches are stale
+    cache.init_cache_versions(cursor)
+    
+    # Change log behind the live dashboard feed
+    changes.init_change_log(cursor)
+    
+    # Dashboard counters, counted from existing rows the first time
+    if stats.init_stats(cursor):
+        stats.rebuild_stats(conn, commit=False)
+    
+    # Per-year counters for candidate codes
+    codes.init_codes(cursor)
+    
+    # Interview rooms and slots
+    scheduler.init_scheduler(cursor)
+    
+    # Normalized email/phone/name keys for duplicate detection, computed
+    # for existing rows the first time
+    if dedupe.init_dedupe(cursor):
+        dedupe.rebuild_keys(conn, commit=False)
+    
+    # Full-text search index, filled from existing rows the first time
+    if search.init_search(cursor):
+        search.rebuild_index(conn, commit=False)
+    
     # Create default admin user if not exists
     cursor.execute('SELECT COUNT(*) FROM users WHERE username = ?', ('admin',))
     if cursor.fetchone()[0] == 0:
         admin_hash = generate_password_hash('admin123')
         cursor.execute('''
-            INSERT INTO users (username, password_hash, email, full_name)
+            INSERT OR IGNORE INTO users (username, password_hash, email, full_name)
             VALUES (?, ?, ?, ?)
         ''', ('admin', admin_hash, 'admin@example.com', 'Administrator'))
     
@@ -110,12 +192,78 @@ def init_db():
             '₹8-12 LPA'
         ))
     
-    conn.commit()
-    conn.close()
+    # Sparse vectors for job matching, built from existing rows the first time
+    if matching.init_matching(cursor):
+        job = cursor.execute('SELECT requirements, location FROM job_settings ORDER BY id DESC LIMIT 1').fetchone()
+        if job:
+            matching.update_job_vector(cursor, job['requirements'], job['location'])
+        matching.rebuild_index(conn, commit=False)
+    
     print("✅ Database initialized successfully")
 
-# Initialize database on startup
-init_db()
+# Bump whenever init_db or an init_* function it calls changes the schema,
+# so existing databases are migrated once more on their next start
+SCHEMA_VERSION = 3
+
+def migrate():
+    """Bring the database up to SCHEMA_VERSION; returns True if init_db ran.
+
+    A database already at this version costs one SELECT, so booting a
+    worker neither takes the write lock nor replays every CREATE ... IF NOT
+    EXISTS. Otherwise the whole of init_db and the version bump run in one
+    BEGIN IMMEDIATE transaction: processes starting together wait on the
+    write lock (up to the busy timeout), and the ones behind find the new
+    version and skip. A failure rolls the whole migration back.
+    """
+    conn = get_db()
+    if db.schema_version(conn) >= SCHEMA_VERSION:
+        return False
+    conn.execute('BEGIN IMMEDIATE')
+    if db.schema_version(conn) >= SCHEMA_VERSION:
+        conn.rollback()
+        return False
+    try:
+        init_db()
+        db.set_schema_version(conn.cursor(), SCHEMA_VERSION)
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+    return True
+
+_started = False
+_start_lock = threading.Lock()
+
+def create_app(start_workers=True):
+    """Migrate the database, start the message workers and return the app.
+
+    Importing this module only defines the routes, so tests and helper
+    processes start without touching the database, and CLI commands only
+    migrate. The entry points (python app.py, gunicorn 'app:create_app()',
+    asgi.py) call this once per process; servers given app:app directly
+    get the same on their first request. Later calls return the same app.
+    """
+    global _started
+    with _start_lock:
+        if not _started:
+            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+            with app.app_context():
+                migrate()
+            if start_workers:
+                messaging.start_workers()
+            _started = True
+    return app
+
+@app.before_request
+def start_app():
+    if not _started:
+        create_app()
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Answer oversized uploads in the API's JSON error format"""
+    limit = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({'success': False, 'error': f'Request too large. The limit is {limit} MB'}), 413
 
 def login_required(f):
     """Decorator to require login for routes"""
@@ -128,8 +276,106 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def conditional_get(*entities):
+    """Decorator adding a weak ETag and If-None-Match support to a read route.
+
+    The ETag is the newest change_log seq of the entities the route reads,
+    so it costs one index lookup per entity and a matching If-None-Match is
+    answered with 304 before the route runs its query. A hash of the sorted
+    query string and URL arguments is part of it too, since they select
+    which data (page, filter, fields) the body holds. Apply it below
+    login_required so only authenticated clients get validators.
+    """
+    from functools import wraps
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            arguments = json.dumps([sorted(request.args.items(multi=True)), sorted(kwargs.items())])
+            variant = hashlib.blake2b(arguments.encode(), digest_size=8).hexdigest()
+            etag = f'{f.__name__}-{variant}-{changes.entity_version(get_db(), entities)}'
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+@app.before_request
+def start_request_metrics():
+    """Start timing the request (and profiling it, if asked or sampled)"""
+    if metrics.METRICS_ENABLED:
+        metrics.start_request(request.headers.get(metrics.PROFILE_HEADER))
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency and database use per route.
+
+    Registered before compress_response so it runs after it (Flask runs
+    after_request hooks in reverse) and the timing includes compression.
+    """
+    if metrics.METRICS_ENABLED:
+        # A written profile's path goes to the server log, not the client
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.finish_request(request.method, endpoint, response.status_code)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses with brotli or gzip, as the client accepts"""
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    if brotli is not None and 'br' in request.accept_encodings:
+        response.set_data(brotli.compress(body, quality=min(COMPRESS_LEVEL, 11)))
+        response.headers['Content-Encoding'] = 'br'
+    elif 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=COMPRESS_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@app.after_request
+def prune_change_log(response):
+    """Keep change_log at CHANGE_LOG_RETENTION, checked after writes"""
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        try:
+            changes.prune_periodically(get_db())
+        except Exception as e:
+            print(f"❌ Error pruning change log: {e}")
+    return response
+
+# ============= METRICS ROUTES =============
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics for this process.
+
+    Needs Authorization: Bearer METRICS_TOKEN. Without a token it is only
+    served when METRICS_PUBLIC=1 opts in to leaving it open.
+    """
+    if not metrics.METRICS_TOKEN and not metrics.METRICS_PUBLIC:
+        return jsonify({'success': False, 'error': 'Set METRICS_TOKEN (or METRICS_PUBLIC=1) to enable /metrics'}), 403
+    if metrics.METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {metrics.METRICS_TOKEN}':
+        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # ============= AUTHENTICATION ROUTES =============
 
+def load_user(username):
+    """Read one user row as a dict, or None"""
+    row = get_db().execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    return dict(row) if row else None
+
 @app.route('/api/login', methods=['POST'])
 def login():
     """User login"""
@@ -141,13 +387,7 @@ def login():
         if not username or not password:
             return jsonify({'success': False, 'error': 'Username and password required'}), 400
         
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
-        user = cursor.fetchone()
-        conn.close()
+        user = cache.users_cache.get(username, lambda: load_user(username))
         
         if user and check_password_hash(user['password_hash'], password):
             session['user_id'] = user['id']
@@ -191,50 +431,6 @@ def check_auth():
 
 # ============= CANDIDATE ROUTES =============
 
-def generate_candidate_code():
-    """Generate unique candidate code"""
-    year = datetime.now().year
-    random_num = random.randint(1000, 9999)
-    return f"HR{year}-{random_num}"
-
-def extract_text_from_image(image_data):
-    """Extract text from image using OCR (basic implementation)"""
-    # In production, use Tesseract OCR or Google Vision API
-    # For demo, return placeholder
-    return "Sample extracted text from image"
-
-def extract_candidate_info(text):
-    """Extract candidate information from text using regex"""
-    info = {
-        'name': '',
-        'email': '',
-        'phone': '',
-        'location': '',
-        'skills': '',
-        'experience': ''
-    }
-    
-    # Extract email
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    if emails:
-        info['email'] = emails[0]
-    
-    # Extract phone
-    phone_pattern = r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]'
-    phones = re.findall(phone_pattern, text)
-    if phones:
-        info['phone'] = phones[0].strip()
-    
-    # Extract location (common Indian cities)
-    cities = ['Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune', 'Ahmedabad']
-    for city in cities:
-        if city.lower() in text.lower():
-            info['location'] = city
-            break
-    
-    return info
-
 @app.route('/api/upload-resume', methods=['POST'])
 @login_required
 def upload_resume():
@@ -250,35 +446,245 @@ def upload_resume():
         return jsonify({'error': 'Invalid file type. Only PNG, JPG, JPEG, PDF allowed'}), 400
     
     try:
-        # Read file content
-        file_content = file.read()
+        # Work from the upload stream rather than reading it into memory;
+        # Werkzeug spools large request bodies to a temporary file
+        stream = file.stream
+        size = stream_size(stream)
+        if size > MAX_RESUME_BYTES:
+            return jsonify({'error': f'File too large. The limit is {MAX_RESUME_BYTES // (1024 * 1024)} MB'}), 413
         
-        # Extract text based on file type
-        if file.filename.lower().endswith('.pdf'):
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ''
-            for page in pdf_reader.pages:
-                text += page.extract_text()
+        # Reuse the parse of an identical file uploaded before
+        key = resume_cache.content_hash(stream)
+        cached = resume_cache.cache.get(key)
+        if cached:
+            text, candidate_info, cache_tier = cached
+            metadata = {}
         else:
-            # For images, use basic extraction (in production, use OCR)
-            text = extract_text_from_image(file_content)
+            # Extract text based on file type
+            stream.seek(0)
+            with metrics.RESUME_PARSE_SECONDS.time(file.filename.rsplit('.', 1)[1].lower()):
+                text, candidate_info, metadata = parse_upload(file.filename, stream)
+            resume_cache.cache.put(key, text, candidate_info)
+            cache_tier = 'miss'
         
-        # Extract candidate information
-        candidate_info = extract_candidate_info(text)
-        candidate_info['code'] = generate_candidate_code()
+        # The code is allocated when the candidate is saved
         candidate_info['date'] = datetime.now().strftime('%Y-%m-%d')
+        candidate_info['resume_hash'] = key
+        metadata = {**metadata, 'bytes': size, 'cache': cache_tier}
         
         return jsonify({
             'success': True,
-            'candidate': candidate_info
+            'candidate': candidate_info,
+            'cache': cache_tier,
+            'metadata': metadata
         })
         
     except Exception as e:
         print(f"❌ Upload error: {e}")
         return jsonify({'error': str(e)}), 500
 
-def save_to_database(candidate_data):
-    """Save candidate data to SQLite database"""
+MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', '500'))
+# Uncompressed size of a whole batch, zip members included
+MAX_BATCH_BYTES = int(os.getenv('MAX_BATCH_MB', '200')) * 1024 * 1024
+
+def parse_upload(filename, stream):
+    """Extract the text, candidate fields and parse metadata of one upload.
+
+    With RESUME_PARSE_IN_POOL the parse runs in the resume process pool, so
+    it doesn't hold this process's GIL while other requests are served. The
+    upload is copied to a temporary file in chunks and the worker opens it
+    by path, so neither process holds the whole file to pickle it across.
+    """
+    if not resume_parser.RESUME_PARSE_IN_POOL:
+        text, metadata = extract_text(filename, stream)
+        return text, extract_candidate_info(text), metadata
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1], delete=False) as copy:
+        shutil.copyfileobj(stream, copy)
+    try:
+        result = resume_parser.get_pool().submit(resume_parser.parse_resume_file, filename, copy.name).result()
+    finally:
+        os.remove(copy.name)
+    if not result['success']:
+        raise ValueError(result['error'])
+    return result['text'], result['candidate'], result['metadata']
+
+def stream_size(stream):
+    """Size in bytes of a seekable upload stream, leaving it rewound"""
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+def check_batch_limits(count, size):
+    """Raise ValueError if a batch of count files and size bytes is over the limits"""
+    if count > MAX_BATCH_FILES:
+        raise ValueError(f'Too many files; the limit is {MAX_BATCH_FILES}')
+    if size > MAX_BATCH_BYTES:
+        raise ValueError(f'Batch too large; the limit is {MAX_BATCH_BYTES // (1024 * 1024)} MB uncompressed')
+
+def zip_members(archive, errors):
+    """The resume members of a zip archive as (filename, ZipInfo); others are reported in errors"""
+    members = []
+    for member in archive.infolist():
+        name = os.path.basename(member.filename)
+        if member.is_dir() or member.filename.startswith('__MACOSX/') or not name:
+            continue
+        if not allowed_file(name):
+            errors.append({'filename': name, 'success': False, 'error': 'Invalid file type'})
+            continue
+        if member.file_size > MAX_RESUME_BYTES:
+            errors.append({'filename': name, 'success': False, 'error': 'File too large'})
+            continue
+        members.append((name, member))
+    return members
+
+def collect_batch_files():
+    """Read the uploaded resumes from files=... parts and any .zip archives.
+
+    Returns a list of (filename, content) and a list of per-file errors.
+    The members of an archive are counted and sized from its directory
+    before any is decompressed (zipfile never reads past a member's
+    recorded size), and ValueError is raised as soon as the batch goes
+    over MAX_BATCH_FILES or MAX_BATCH_BYTES.
+    """
+    files = []
+    errors = []
+    total_bytes = 0
+    for upload in request.files.getlist('files') + request.files.getlist('file'):
+        if not upload.filename:
+            continue
+        if upload.filename.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(upload.stream) as archive:
+                    members = zip_members(archive, errors)
+                    total_bytes += sum(member.file_size for _, member in members)
+                    check_batch_limits(len(files) + len(members), total_bytes)
+                    files.extend((name, archive.read(member)) for name, member in members)
+            except zipfile.BadZipFile:
+                errors.append({'filename': upload.filename, 'success': False, 'error': 'Invalid zip archive'})
+        elif not allowed_file(upload.filename):
+            errors.append({'filename': upload.filename, 'success': False, 'error': 'Invalid file type'})
+        else:
+            size = stream_size(upload.stream)
+            if size > MAX_RESUME_BYTES:
+                errors.append({'filename': upload.filename, 'success': False, 'error': 'File too large'})
+                continue
+            total_bytes += size
+            check_batch_limits(len(files) + 1, total_bytes)
+            files.append((upload.filename, upload.read()))
+    return files, errors
+
+@app.route('/api/cache/stats', methods=['GET'])
+@login_required
+def get_cache_stats():
+    """Hit/miss counters of the job settings and user caches"""
+    return jsonify({
+        'success': True,
+        'caches': {
+            'job_settings': cache.job_settings_cache.stats(),
+            'users': cache.users_cache.stats()
+        }
+    })
+
+@app.route('/api/resume-cache/stats', methods=['GET'])
+@login_required
+def get_resume_cache_stats():
+    """Get hit/miss counters for the parsed resume cache"""
+    return jsonify({'success': True, 'stats': resume_cache.cache.stats()})
+
+@app.route('/api/upload-resumes', methods=['POST'])
+@login_required
+def upload_resumes():
+    """Upload and process a batch of resumes.
+
+    Accepts several files= parts and/or zip archives. Parsing is fanned out
+    to a process pool and one NDJSON line is streamed per file as soon as it
+    finishes, followed by a summary line. With auto_save=1 the parsed
+    candidates are saved once every file has been parsed and streamed, in
+    one short transaction (see save_batch), and a {"filename", "saved"} line
+    per candidate comes before the summary. A client that goes away before
+    then saves nothing.
+    """
+    try:
+        files, errors = collect_batch_files()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not files and not errors:
+        return jsonify({'error': 'No file provided'}), 400
+    
+    auto_save = request.form.get('auto_save', request.args.get('auto_save')) == '1'
+    
+    # Files seen before are answered from the cache; only new ones go to the pool
+    cached_results = []
+    futures = {}
+    pool = resume_parser.get_pool()
+    for name, content in files:
+        key = resume_cache.content_hash(content)
+        cached = resume_cache.cache.get(key)
+        if cached:
+            cached[1]['resume_hash'] = key
+            cached_results.append({'filename': name, 'success': True, 'candidate': cached[1], 'cache': cached[2]})
+        else:
+            futures[pool.submit(resume_parser.parse_resume, name, content)] = key
+    
+    def completed_results():
+        yield from cached_results
+        for future in as_completed(futures):
+            result = future.result()
+            if result['success']:
+                resume_cache.cache.put(futures[future], result.pop('text'), result['candidate'])
+                result['candidate']['resume_hash'] = futures[future]
+                result['cache'] = 'miss'
+            yield result
+    
+    def generate():
+        summary = {'done': True, 'total': len(files) + len(errors), 'parsed': 0, 'saved': 0, 'failed': len(errors)}
+        for error in errors:
+            yield json.dumps(error) + '\n'
+        
+        parsed = []
+        for result in completed_results():
+            if result['success']:
+                summary['parsed'] += 1
+                result['candidate']['date'] = datetime.now().strftime('%Y-%m-%d')
+                parsed.append(result)
+            else:
+                summary['failed'] += 1
+            yield json.dumps(result) + '\n'
+        
+        # Nothing is written while parsing and streaming, so a slow client
+        # never holds the write lock
+        if auto_save and parsed:
+            saved = save_batch([result['candidate'] for result in parsed])
+            for result, outcome in zip(parsed, saved):
+                summary['saved'] += outcome['success']
+                yield json.dumps({'filename': result['filename'], 'saved': outcome}) + '\n'
+        yield json.dumps(summary) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def save_batch(candidates):
+    """Save many candidates in one BEGIN IMMEDIATE transaction.
+
+    Returns the save_to_database result of each; rejected candidates
+    (missing fields, duplicates) don't stop the others.
+    """
+    conn = get_db()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        results = [save_to_database(candidate, commit=False) for candidate in candidates]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return results
+
+def save_to_database(candidate_data, commit=True):
+    """Save candidate data to SQLite database.
+
+    With commit=False the insert is left in the open transaction so callers
+    can save a batch of candidates and commit once.
+    """
     try:
         # Validate mandatory fields
         email = candidate_data.get('email', '').strip()
@@ -299,32 +705,35 @@ def save_to_database(candidate_data):
                 'error': f'Missing mandatory fields: {", ".join(missing_fields)}'
             }
         
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         
-        # Check if candidate already exists
-        cursor.execute('SELECT id FROM candidates WHERE email = ?', (email,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            conn.close()
+        # Check if the candidate already exists, allowing for differently
+        # written emails and phone numbers
+        duplicate = dedupe.find_duplicate(cursor, email, phone)
+        if duplicate:
+            existing, reason = duplicate
             return {
                 'success': False,
-                'error': f'Candidate with email {email} is already registered'
+                'error': dedupe.duplicate_error(existing, reason, email, phone),
+                'duplicate_of': existing['id']
             }
         
-        # Generate unique code
-        code = generate_candidate_code()
-        while True:
-            cursor.execute('SELECT id FROM candidates WHERE code = ?', (code,))
-            if not cursor.fetchone():
-                break
-            code = generate_candidate_code()
+        # Keep the resume text for full-text search; uploads return a
+        # resume_hash that points at it in the resume cache
+        resume_text = candidate_data.get('resume_text', '')
+        if not resume_text and candidate_data.get('resume_hash'):
+            cached = resume_cache.cache.get(candidate_data['resume_hash'])
+            resume_text = cached[0] if cached else ''
+        
+        # Allocate the code in the same transaction as the insert
+        code = codes.allocate_code(cursor)
         
         # Insert candidate
         cursor.execute('''
-            INSERT INTO candidates (date, name, phone, email, dob, location, skills, experience, code, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO candidates (date, name, phone, email, dob, location, skills, experience, code, status, resume_text,
+                                    email_key, phone_key, name_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             candidate_data.get('date', datetime.now().strftime('%Y-%m-%d')),
             candidate_data.get('name', ''),
@@ -335,12 +744,17 @@ def save_to_database(candidate_data):
             candidate_data.get('skills', ''),
             candidate_data.get('experience', ''),
             code,
-            'New'
+            'New',
+            resume_text,
+            *dedupe.candidate_keys(email, phone, candidate_data.get('name', ''))
         ))
-        
-        conn.commit()
         candidate_id = cursor.lastrowid
-        conn.close()
+        matching.index_candidate(
+            cursor, candidate_id, candidate_data.get('skills', ''), candidate_data.get('experience', ''), location
+        )
+        
+        if commit:
+            conn.commit()
         
         return {
             'success': True,
@@ -363,83 +777,613 @@ def save_candidate():
     
     return jsonify(result)
 
+@app.route('/api/import-candidates', methods=['POST'])
+@login_required
+def import_candidates():
+    """Bulk import candidates from a .csv or .xlsx file.
+
+    The file is read as a stream and inserted in chunked transactions;
+    rows with missing fields or already registered emails are skipped and
+    listed in errors with their row number.
+    """
+    if 'file' not in request.files or not request.files['file'].filename:
+        return jsonify({'success': False, 'error': 'No file uploaded'}), 400
+    file = request.files['file']
+    
+    try:
+        rows = importer.read_rows(file.filename, file.stream)
+        report = importer.import_candidates(get_db(), rows)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Import error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({'success': True, **report})
+
+@app.cli.command('import-candidates')
+@click.argument('path')
+def import_candidates_command(path):
+    """Bulk import candidates from a .csv or .xlsx file"""
+    migrate()
+    start = datetime.now()
+    with open(path, 'rb') as f:
+        report = importer.import_candidates(get_db(), importer.read_rows(path, f))
+    changes.prune(get_db())
+    seconds = (datetime.now() - start).total_seconds()
+    print(f"✅ Imported {report['imported']} candidates in {seconds:.1f}s ({report['failed']} rows skipped)")
+    for error in report['errors']:
+        print(f"   row {error['row']}: {error['error']}")
+
+# Columns returned by the candidate list and the default for empty values
+CANDIDATE_FIELDS = {
+    'id': None,
+    'date': None,
+    'name': '',
+    'phone': '',
+    'email': '',
+    'dob': '',
+    'location': '',
+    'skills': '',
+    'experience': '',
+    'code': None,
+    'status': 'New',
+    'interview_date': '',
+    'interview_time': '',
+    'interview_location': '',
+    'message_sent': 0
+}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def candidate_row_to_dict(row, fields):
+    """Build the API representation of a candidate row"""
+    candidate = {}
+    for field in fields:
+        default = CANDIDATE_FIELDS[field]
+        value = row[field]
+        candidate[field] = value if default is None else (value or default)
+    return candidate
+
+def encode_cursor(created_at, candidate_id):
+    """Encode a keyset position as an opaque URL-safe token"""
+    raw = json.dumps([created_at, candidate_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(token):
+    """Decode a token from encode_cursor(), raising ValueError if it is malformed"""
+    try:
+        created_at, candidate_id = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(candidate_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, candidate_id
+
+# Filters build_candidate_filters understands
+CANDIDATE_FILTERS = ('status', 'location', 'message_sent', 'date_from', 'date_to')
+
+def build_candidate_filters(filters):
+    """Translate API filters into a WHERE clause and its parameters"""
+    clauses = []
+    params = []
+    
+    if filters.get('status'):
+        clauses.append('status = ?')
+        params.append(filters['status'])
+    if filters.get('location'):
+        clauses.append('location = ?')
+        params.append(filters['location'])
+    if filters.get('message_sent') is not None:
+        clauses.append('message_sent = ?')
+        params.append(int(filters['message_sent']))
+    if filters.get('date_from'):
+        clauses.append('created_at >= ?')
+        params.append(filters['date_from'])
+    if filters.get('date_to'):
+        # date_to is inclusive, so compare against the start of the next day
+        clauses.append("created_at < date(?, '+1 day')")
+        params.append(filters['date_to'])
+    
+    return clauses, params
+
+def query_candidates(filters=None, fields=None, cursor=None, limit=None):
+    """Retrieve one page of candidates, newest first.
+
+    Pages are keyset-paginated on (created_at, id): the cursor is the
+    position of the last row of the previous page, so each page is an index
+    range scan no matter how deep into the table it is. Returns the
+    candidates and the cursor for the next page (None on the last page).
+    """
+    fields = fields or list(CANDIDATE_FIELDS)
+    clauses, params = build_candidate_filters(filters or {})
+    
+    if cursor:
+        clauses.append('(created_at, id) < (?, ?)')
+        params.extend(decode_cursor(cursor))
+    
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    columns = ', '.join(dict.fromkeys(list(fields) + ['id', 'created_at']))
+    query = f'SELECT {columns} FROM candidates {where} ORDER BY created_at DESC, id DESC'
+    
+    if limit is not None:
+        # Fetch one extra row to know whether another page follows
+        query += ' LIMIT ?'
+        params.append(limit + 1)
+    
+    conn = get_db()
+    rows = conn.execute(query, params).fetchall()
+    
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+    
+    candidates = [candidate_row_to_dict(row, fields) for row in rows]
+    return candidates, next_cursor
+
 def get_all_candidates():
     """Retrieve all candidates from database"""
     try:
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, date, name, phone, email, dob, location, skills, experience, code, status, 
-                   interview_date, interview_time, interview_location, message_sent
-            FROM candidates
-            ORDER BY created_at DESC
-        ''')
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        candidates = []
-        for row in rows:
-            candidate = {
-                'id': row['id'],
-                'date': row['date'],
-                'name': row['name'] or '',
-                'phone': row['phone'] or '',
-                'email': row['email'] or '',
-                'dob': row['dob'] or '',
-                'location': row['location'] or '',
-                'skills': row['skills'] or '',
-                'experience': row['experience'] or '',
-                'code': row['code'],
-                'status': row['status'] or 'New',
-                'interview_date': row['interview_date'] or '',
-                'interview_time': row['interview_time'] or '',
-                'interview_location': row['interview_location'] or '',
-                'message_sent': row['message_sent'] or 0
-            }
-            candidates.append(candidate)
-        
+        candidates, _ = query_candidates()
         return candidates
     except Exception as e:
         print(f"Error retrieving candidates: {e}")
         return []
 
+def parse_candidate_args(args):
+    """Read the filter and fields= query parameters shared by the list and export routes"""
+    fields = None
+    if args.get('fields'):
+        fields = ['id'] + [f.strip() for f in args['fields'].split(',') if f.strip() and f.strip() != 'id']
+        unknown = [f for f in fields if f not in CANDIDATE_FIELDS]
+        if unknown:
+            raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    
+    filters = {
+        'status': args.get('status'),
+        'location': args.get('location'),
+        'date_from': args.get('date_from'),
+        'date_to': args.get('date_to'),
+        'message_sent': args.get('message_sent')
+    }
+    if filters['message_sent'] not in (None, '0', '1'):
+        raise ValueError('message_sent must be 0 or 1')
+    
+    return filters, fields
+
 @app.route('/api/candidates', methods=['GET'])
 @login_required
+@conditional_get('candidate')
 def get_candidates():
-    """Get all candidates from database"""
-    candidates = get_all_candidates()
-    return jsonify({
+    """Get candidates from database.
+
+    Without paging parameters the full list is returned, as the dashboard
+    expects. Pass limit (and the returned next_cursor) to page through the
+    table, status/location/date_from/date_to/message_sent to filter it and
+    fields=name,email,... to return only some columns. seq is the change
+    feed position the list reflects; follow /api/changes from there.
+    """
+    args = request.args
+    
+    try:
+        filters, fields = parse_candidate_args(args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    cursor = args.get('cursor')
+    limit = None
+    if 'limit' in args or cursor:
+        limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        if limit is None or limit < 1:
+            return jsonify({'success': False, 'error': 'limit must be a positive integer'}), 400
+        limit = min(limit, MAX_PAGE_SIZE)
+    
+    try:
+        # Read the feed position first: changes racing with the query are
+        # then replayed to the client rather than lost
+        seq = changes.latest_seq(get_db())
+        candidates, next_cursor = query_candidates(filters, fields, cursor, limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error retrieving candidates: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    response = {
         'success': True,
-        'candidates': candidates
-    })
+        'candidates': candidates,
+        'seq': seq
+    }
+    if limit is not None:
+        response['next_cursor'] = next_cursor
+    return jsonify(response)
 
-def update_candidate_in_database(candidate_id, field, value):
-    """Update a specific field for a candidate in database"""
+@app.route('/api/candidates/search', methods=['GET'])
+@login_required
+def search_candidates():
+    """Full-text search over name, skills, experience, location and resume text.
+
+    Every word of q must match, the last one as a prefix. Results are
+    BM25-ranked and carry a highlighted snippet; page with limit and offset.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'q is required'}), 400
+    
+    limit = min(request.args.get('limit', 20, type=int) or 20, MAX_PAGE_SIZE)
+    offset = max(request.args.get('offset', 0, type=int) or 0, 0)
+    fields = list(CANDIDATE_FIELDS)
+    
+    try:
+        rows = search.search_candidates(get_db(), query, fields, limit, offset)
+    except Exception as e:
+        print(f"❌ Search error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    results = []
+    for row in rows:
+        candidate = candidate_row_to_dict(row, fields)
+        candidate['snippet'] = search.snippet_html(row['snippet'])
+        candidate['score'] = round(row['score'], 4)
+        results.append(candidate)
+    
+    return jsonify({'success': True, 'candidates': results})
+
+@app.route('/api/candidates/match', methods=['GET'])
+@login_required
+def match_candidates():
+    """Shortlist of candidates ranked against the current job settings.
+
+    Each candidate carries its score and the job requirements it matched.
+    """
+    limit = min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    min_score = request.args.get('min_score', 0.0, type=float)
+    fields = list(CANDIDATE_FIELDS)
+    
+    try:
+        ranked = matching.rank_candidates(get_db(), fields, limit, min_score)
+    except Exception as e:
+        print(f"❌ Match error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    results = []
+    for row, matched in ranked:
+        candidate = candidate_row_to_dict(row, fields)
+        candidate['score'] = round(row['score'], 4)
+        candidate['matched'] = matched
+        results.append(candidate)
+    
+    return jsonify({'success': True, 'candidates': results})
+
+@app.route('/api/candidates/duplicates', methods=['GET'])
+@login_required
+def get_duplicate_candidates():
+    """Clusters of candidates that are probably the same person.
+
+    Linked by normalized email or phone, and by name sound-alike plus date
+    of birth unless names=0. Returns the largest clusters first, up to limit.
+    """
+    limit = request.args.get('limit', 100, type=int)
+    if limit is None or limit < 1:
+        return jsonify({'success': False, 'error': 'limit must be a positive integer'}), 400
+    
+    conn = get_db()
+    clusters = dedupe.find_clusters(conn, request.args.get('names') != '0', limit)
+    ids = [candidate_id for cluster in clusters for candidate_id in cluster['ids']]
+    rows = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        for row in conn.execute(
+            f'SELECT id, code, name, email, phone, dob, location, status, date FROM candidates WHERE id IN ({placeholders})', chunk
+        ):
+            rows[row['id']] = dict(row)
+    for cluster in clusters:
+        cluster['candidates'] = [rows[candidate_id] for candidate_id in cluster['ids'] if candidate_id in rows]
+    return jsonify({'success': True, 'clusters': clusters})
+
+@app.cli.command('find-duplicates')
+@click.option('--limit', default=50, help='Largest clusters to print')
+@click.option('--no-names', is_flag=True, help='Only link candidates by email and phone')
+def find_duplicates_command(limit, no_names):
+    """Print clusters of likely duplicate candidates"""
+    migrate()
+    start = datetime.now()
+    clusters = dedupe.find_clusters(get_db(), not no_names)
+    seconds = (datetime.now() - start).total_seconds()
+    print(f"✅ Found {len(clusters)} duplicate clusters in {seconds:.1f}s")
+    for cluster in clusters[:limit]:
+        print(f"   {', '.join(map(str, cluster['ids']))} ({', '.join(cluster['reasons'])})")
+
+@app.cli.command('rebuild-dedupe-keys')
+@click.option('--missing', is_flag=True, help='Only fill candidates that have no keys yet')
+def rebuild_dedupe_keys_command(missing):
+    """Recompute the normalized email/phone/name keys"""
+    migrate()
+    updated = dedupe.rebuild_keys(get_db(), only_missing=missing)
+    print(f"✅ Recomputed keys of {updated} candidates")
+
+@app.cli.command('rebuild-match-index')
+def rebuild_match_index_command():
+    """Recompute every candidate's match vector"""
+    migrate()
+    matching.rebuild_index(get_db())
+    print("✅ Match index rebuilt")
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the candidate full-text search index from scratch"""
+    migrate()
+    search.rebuild_index(get_db())
+    print("✅ Search index rebuilt")
+
+EXPORT_BATCH_SIZE = 500
+
+def iter_candidate_rows(filters, fields):
+    """Yield candidate dicts straight from a database cursor in small batches.
+
+    Uses its own pooled connection so the rows can be streamed after the
+    view function has returned.
+    """
+    clauses, params = build_candidate_filters(filters)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    query = f"SELECT {', '.join(fields)} FROM candidates {where} ORDER BY created_at DESC, id DESC"
+    
+    conn = db.acquire_connection()
     try:
-        allowed_fields = ['status', 'interview_slot', 'interview_date', 'interview_time', 'interview_location', 'name', 'phone', 'email', 'dob', 'location', 'skills', 'experience', 'message_sent']
-        if field not in allowed_fields:
-            return {'success': False, 'error': 'Invalid field'}
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield candidate_row_to_dict(row, fields)
+    finally:
+        db.release_connection(conn)
+
+def batch_rows(rows, size):
+    """Group an iterator of rows into lists of at most size rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def export_ndjson(rows, fields):
+    """Encode candidate rows as newline-delimited JSON chunks"""
+    for batch in batch_rows(rows, EXPORT_BATCH_SIZE):
+        yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in batch)
+
+def export_csv(rows, fields):
+    """Encode candidate rows as CSV chunks, header first"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    yield buffer.getvalue()
+    
+    for batch in batch_rows(rows, EXPORT_BATCH_SIZE):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+def gzip_chunks(chunks):
+    """Gzip a stream of text chunks without buffering the whole body"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+EXPORT_FORMATS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson'),
+    'csv': (export_csv, 'text/csv')
+}
+
+@app.route('/api/candidates/export', methods=['GET'])
+@login_required
+def export_candidates():
+    """Stream every matching candidate as NDJSON or CSV.
+
+    Accepts the same filters and fields= as /api/candidates, plus
+    format=ndjson|csv and gzip=1. Rows go from the database cursor to the
+    client in batches, so memory use does not grow with the table.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': 'format must be ndjson or csv'}), 400
+    
+    try:
+        filters, fields = parse_candidate_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    fields = fields or list(CANDIDATE_FIELDS)
+    
+    encoder, mimetype = EXPORT_FORMATS[export_format]
+    body = encoder(iter_candidate_rows(filters, fields), fields)
+    
+    filename = f"candidates-{datetime.now().strftime('%Y%m%d')}.{export_format}"
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    if request.args.get('gzip') == '1':
+        body = gzip_chunks(body)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
+
+# Fields that make up a candidate's match vector
+MATCH_FIELDS = ('skills', 'experience', 'location')
+
+# Fields the update endpoints may change
+UPDATABLE_FIELDS = ('status', 'interview_date', 'interview_time', 'interview_location', 'name', 'phone', 'email', 'dob', 'location', 'skills', 'experience', 'message_sent')
+
+def reindex_match_vectors(cursor, candidate_ids):
+    """Recompute the match vectors of candidates whose skills, experience or location changed"""
+    for start in range(0, len(candidate_ids), ID_CHUNK_SIZE):
+        chunk = candidate_ids[start:start + ID_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        rows = cursor.execute(
+            f'SELECT id, skills, experience, location FROM candidates WHERE id IN ({placeholders})', chunk
+        ).fetchall()
+        for row in rows:
+            matching.index_candidate(cursor, row['id'], row['skills'], row['experience'], row['location'])
+
+def invalid_edits(edits):
+    """Why a {field: value} set of changes can't be applied, or None if it can"""
+    invalid = [field for field in edits if field not in UPDATABLE_FIELDS]
+    if invalid:
+        return f'Invalid field: {", ".join(invalid)}'
+    nested = [field for field, value in edits.items() if not isinstance(value, (str, int, float, type(None)))]
+    if nested:
+        return f'Value of {", ".join(nested)} must be a string or number'
+    if not all(isinstance(edits[field], str) for field in dedupe.KEYED_FIELDS if field in edits):
+        return 'name, email and phone must be strings'
+    return None
+
+def update_candidates_in_database(updates):
+    """Apply [{'id': ..., 'changes': {field: value}}] in one transaction.
+
+    Rows that change the same set of fields share one executemany. Invalid
+    or unknown rows, and rows that would give a candidate the email or
+    phone of another (in the table or earlier in the batch), are reported
+    in the per-row results and skipped; the rest are committed together.
+    """
+    results = [None] * len(updates)
+    groups = {}
+    for index, update in enumerate(updates):
+        candidate_id = update.get('id') if isinstance(update, dict) else None
+        edits = update.get('changes') if isinstance(update, dict) else None
+        if not isinstance(candidate_id, int) or not isinstance(edits, dict) or not edits:
+            results[index] = {'id': candidate_id, 'success': False, 'error': 'id and changes are required'}
+            continue
+        error = invalid_edits(edits)
+        if error:
+            results[index] = {'id': candidate_id, 'success': False, 'error': error}
+            continue
+        fields = tuple(sorted(edits))
+        groups.setdefault(fields, []).append((index, candidate_id, [edits[field] for field in fields]))
+    
+    conn = get_db()
+    cursor = conn.cursor()
+    
+    try:
+        ids = list({candidate_id for rows in groups.values() for _, candidate_id, _ in rows})
+        existing = set()
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            existing.update(row[0] for row in cursor.execute(f'SELECT id FROM candidates WHERE id IN ({placeholders})', chunk))
         
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
+        # Same check as on save, for changed emails and phones
+        claimed = {}
+        for fields, rows in groups.items():
+            if 'email' not in fields and 'phone' not in fields:
+                continue
+            for index, candidate_id, values in rows:
+                if candidate_id not in existing:
+                    continue
+                changed = dict(zip(fields, values))
+                email, phone = changed.get('email'), changed.get('phone')
+                duplicate = dedupe.find_duplicate(cursor, email, phone, exclude_id=candidate_id)
+                if duplicate:
+                    row, reason = duplicate
+                    results[index] = {
+                        'id': candidate_id,
+                        'success': False,
+                        'error': dedupe.duplicate_error(row, reason, email, phone),
+                        'duplicate_of': row['id']
+                    }
+                    continue
+                keys = [key for key in (('email', dedupe.email_key(email)), ('phone', dedupe.phone_key(phone))) if key[1]]
+                others = {claimed[key] for key in keys if key in claimed} - {candidate_id}
+                if others:
+                    results[index] = {
+                        'id': candidate_id,
+                        'success': False,
+                        'error': f'Candidate {min(others)} is given the same email or phone in this update',
+                        'duplicate_of': min(others)
+                    }
+                    continue
+                claimed.update((key, candidate_id) for key in keys)
         
-        query = f'UPDATE candidates SET {field} = ? WHERE id = ?'
-        cursor.execute(query, (value, candidate_id))
+        reindex = set()
+        rekey = set()
+        for fields, rows in groups.items():
+            rows = [(index, candidate_id, values) for index, candidate_id, values in rows if results[index] is None]
+            found = [(index, candidate_id, values) for index, candidate_id, values in rows if candidate_id in existing]
+            for index, candidate_id, _ in rows:
+                results[index] = {'id': candidate_id, 'success': candidate_id in existing}
+                if candidate_id not in existing:
+                    results[index]['error'] = 'Candidate not found'
+            
+            assignments = ', '.join(f'{field} = ?' for field in fields)
+            cursor.executemany(
+                f'UPDATE candidates SET {assignments} WHERE id = ?',
+                [values + [candidate_id] for _, candidate_id, values in found]
+            )
+            if set(fields) & set(MATCH_FIELDS):
+                reindex.update(candidate_id for _, candidate_id, _ in found)
+            if set(fields) & set(dedupe.KEYED_FIELDS):
+                rekey.update(candidate_id for _, candidate_id, _ in found)
         
+        reindex_match_vectors(cursor, list(reindex))
+        dedupe.update_keys(cursor, list(rekey))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error updating candidates: {e}")
+        return {'success': False, 'error': str(e)}
+    
+    return {
+        'success': True,
+        'updated': sum(1 for result in results if result['success']),
+        'results': results
+    }
+
+def update_matching_candidates(clauses, params, edits):
+    """Apply one set of changes to every candidate matching the WHERE clauses"""
+    conn = get_db()
+    cursor = conn.cursor()
+    
+    try:
+        fields = list(edits)
+        assignments = ', '.join(f'{field} = ?' for field in fields)
+        ids = [row[0] for row in cursor.execute(
+            f"UPDATE candidates SET {assignments} WHERE {' AND '.join(clauses)} RETURNING id",
+            [edits[field] for field in fields] + params
+        ).fetchall()]
+        if set(fields) & set(MATCH_FIELDS):
+            reindex_match_vectors(cursor, ids)
+        if set(fields) & set(dedupe.KEYED_FIELDS):
+            dedupe.update_keys(cursor, ids)
         conn.commit()
-        affected_rows = cursor.rowcount
-        conn.close()
-        
-        if affected_rows == 0:
-            return {'success': False, 'error': 'Candidate not found'}
-        
-        return {'success': True}
     except Exception as e:
-        print(f"Error updating candidate: {e}")
+        conn.rollback()
+        print(f"❌ Error updating candidates: {e}")
         return {'success': False, 'error': str(e)}
+    
+    return {'success': True, 'updated': len(ids), 'ids': ids}
+
+def update_candidate_in_database(candidate_id, field, value):
+    """Update a specific field for a candidate in database"""
+    if field not in UPDATABLE_FIELDS:
+        return {'success': False, 'error': 'Invalid field'}
+    try:
+        candidate_id = int(candidate_id)
+    except (TypeError, ValueError):
+        return {'success': False, 'error': 'Candidate not found'}
+    
+    result = update_candidates_in_database([{'id': candidate_id, 'changes': {field: value}}])
+    if not result['success']:
+        return result
+    row = result['results'][0]
+    if not row['success']:
+        return {key: value for key, value in row.items() if key != 'id'}
+    return {'success': True}
 
 @app.route('/api/update-candidate', methods=['POST'])
 @login_required
@@ -454,81 +1398,62 @@ def update_candidate():
         return jsonify({'error': 'id, field, and value are required'}), 400
     
     result = update_candidate_in_database(candidate_id, field, value)
+    if 'duplicate_of' in result:
+        return jsonify(result), 409
     return jsonify(result)
 
-# ============= MESSAGING ROUTES =============
+@app.route('/api/candidates', methods=['PATCH'])
+@login_required
+def update_candidates():
+    """Update many candidates in one transaction.
 
-def send_gmail(to_email, subject, message):
-    """Simulated email sending - DEMO MODE"""
-    try:
-        import time
-        time.sleep(0.5)
-        
-        print(f"\n{'='*60}")
-        print(f"📧 SIMULATED EMAIL SENT")
-        print(f"{'='*60}")
-        print(f"To: {to_email}")
-        print(f"Subject: {subject}")
-        print(f"Message:\n{message}")
-        print(f"{'='*60}\n")
-        
-        try:
-            with open('sent_messages.log', 'a', encoding='utf-8') as f:
-                f.write(f"\n{'='*60}\n")
-                f.write(f"EMAIL - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"To: {to_email}\n")
-                f.write(f"Subject: {subject}\n")
-                f.write(f"Message:\n{message}\n")
-                f.write(f"{'='*60}\n")
-        except:
-            pass
-        
-        return {
-            'success': True,
-            'demo_mode': True,
-            'message': 'Email simulated successfully'
-        }
-    except Exception as e:
-        print(f"❌ Simulation error: {e}")
-        return {'success': False, 'error': str(e)}
+    Send either updates=[{"id": 1, "changes": {"status": "Rejected"}}, ...]
+    for per-candidate changes, or filter={"status": ...} with one set of
+    changes for every candidate it matches.
+    """
+    data = request.json or {}
+    
+    if 'filter' in data:
+        filters = data.get('filter') or {}
+        edits = data.get('changes')
+        if not isinstance(filters, dict) or not isinstance(edits, dict) or not edits:
+            return jsonify({'success': False, 'error': 'filter and changes must be objects'}), 400
+        error = invalid_edits(edits)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        # An ignored key would widen the update, up to the whole table
+        unknown = [key for key in filters if key not in CANDIDATE_FILTERS]
+        if unknown:
+            return jsonify({'success': False, 'error': f'Unknown filter: {", ".join(unknown)}'}), 400
+        if not all(isinstance(value, (str, int, type(None))) for value in filters.values()):
+            return jsonify({'success': False, 'error': 'filter values must be strings or numbers'}), 400
+        if filters.get('message_sent') not in (None, 0, 1, '0', '1'):
+            return jsonify({'success': False, 'error': 'message_sent must be 0 or 1'}), 400
+        if 'email' in edits or 'phone' in edits:
+            # One email or phone for many candidates would make them duplicates
+            return jsonify({'success': False, 'error': 'email and phone can only be changed with updates=[...]'}), 400
+        clauses, params = build_candidate_filters(filters)
+        if not clauses:
+            return jsonify({'success': False, 'error': 'filter must include at least one condition'}), 400
+        result = update_matching_candidates(clauses, params, edits)
+    else:
+        updates = data.get('updates')
+        if not isinstance(updates, list) or not updates:
+            return jsonify({'success': False, 'error': 'updates or filter is required'}), 400
+        result = update_candidates_in_database(updates)
+    
+    return jsonify(result), 200 if result['success'] else 500
 
-def send_sms(to_phone, message):
-    """Simulated SMS sending - DEMO MODE"""
-    try:
-        import time
-        time.sleep(0.3)
-        
-        print(f"\n{'='*60}")
-        print(f"📱 SIMULATED SMS SENT")
-        print(f"{'='*60}")
-        print(f"To: {to_phone}")
-        print(f"Message: {message}")
-        print(f"{'='*60}\n")
-        
-        try:
-            with open('sent_messages.log', 'a', encoding='utf-8') as f:
-                f.write(f"\n{'='*60}\n")
-                f.write(f"SMS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"To: {to_phone}\n")
-                f.write(f"Message: {message}\n")
-                f.write(f"{'='*60}\n")
-        except:
-            pass
-        
-        return {
-            'success': True,
-            'demo_mode': True,
-            'message': 'SMS simulated successfully',
-            'sid': f'DEMO_{datetime.now().strftime("%Y%m%d%H%M%S")}'
-        }
-    except Exception as e:
-        print(f"❌ Simulation error: {e}")
-        return {'success': False, 'error': str(e)}
+# ============= MESSAGING ROUTES =============
 
 @app.route('/api/send-message', methods=['POST'])
 @login_required
 def send_message():
-    """Send email and/or SMS to candidate"""
+    """Queue email and/or SMS to candidate.
+
+    Returns 202 with the queued job ids straight away; the message worker
+    delivers them in the background. Poll /api/message-jobs for delivery status.
+    """
     try:
         data = request.json
         candidate_id = data.get('candidate_id')
@@ -542,111 +1467,377 @@ def send_message():
         if not message:
             return jsonify({'success': False, 'error': 'Message is required'}), 400
         
-        results = {'email': None, 'sms': None}
-        
+        jobs = []
         if send_email_flag and email:
-            email_result = send_gmail(email, subject, message)
-            results['email'] = email_result
-        
+            jobs.append({'candidate_id': candidate_id, 'channel': 'email', 'recipient': email, 'subject': subject, 'message': message})
         if send_sms_flag and phone:
-            sms_result = send_sms(phone, message)
-            results['sms'] = sms_result
+            jobs.append({'candidate_id': candidate_id, 'channel': 'sms', 'recipient': phone, 'message': message})
         
+        conn = get_db()
+        job_ids = messaging.enqueue_messages(conn, jobs)
         if candidate_id:
-            conn = sqlite3.connect(DATABASE)
-            cursor = conn.cursor()
-            cursor.execute('UPDATE candidates SET message_sent = 1 WHERE id = ?', (candidate_id,))
-            conn.commit()
-            conn.close()
+            conn.execute('UPDATE candidates SET message_sent = 1 WHERE id = ?', (candidate_id,))
+        conn.commit()
+        messaging.worker.notify()
+        
+        queued = {job['channel']: job_id for job, job_id in zip(jobs, job_ids)}
         
         return jsonify({
             'success': True,
-            'results': results,
-            'message': 'Message sent successfully (Demo Mode)',
-            'email_sent': bool(results['email']),
-            'sms_sent': bool(results['sms'])
-        })
+            'jobs': queued,
+            'message': 'Message queued for delivery (Demo Mode)',
+            'email_queued': 'email' in queued,
+            'sms_queued': 'sms' in queued
+        }), 202
             
     except Exception as e:
         print(f"❌ Send message error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+MAX_BULK_RECIPIENTS = int(os.getenv('MAX_BULK_RECIPIENTS', '10000'))
+TEMPLATE_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+TEMPLATE_FIELDS = ('name', 'code', 'email', 'phone', 'location', 'status',
+                   'interview_date', 'interview_time', 'interview_location')
+# SQLite's default limit on bound parameters per statement is 999
+ID_CHUNK_SIZE = 900
+
+def render_template(template, candidate):
+    """Fill {name}/{code}/{interview_date}/... placeholders; unknown ones are left as-is"""
+    def replace(match):
+        field = match.group(1)
+        if field in TEMPLATE_FIELDS:
+            return str(candidate[field] or '')
+        return match.group(0)
+    return TEMPLATE_PLACEHOLDER.sub(replace, template)
+
+def fetch_recipients(candidate_ids=None, filters=None):
+    """Load the template fields for the given candidate ids or filter match"""
+    conn = get_db()
+    columns = ', '.join(('id',) + TEMPLATE_FIELDS)
+    
+    if candidate_ids is not None:
+        rows = []
+        for start in range(0, len(candidate_ids), ID_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            rows.extend(conn.execute(f'SELECT {columns} FROM candidates WHERE id IN ({placeholders})', chunk))
+        return rows
+    
+    clauses, params = build_candidate_filters(filters)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    return conn.execute(f'SELECT {columns} FROM candidates {where}', params).fetchall()
+
+@app.route('/api/send-bulk', methods=['POST'])
+@login_required
+def send_bulk():
+    """Queue a templated email/SMS campaign to many candidates.
+
+    Takes candidate_ids, or a status (plus optional location/message_sent)
+    filter, and a message template with {name}, {code}, {interview_date}...
+    placeholders. Messages are rendered in one pass, queued with a single
+    executemany and delivered by the message worker pool. message_sent is
+    set in the same transaction for every recipient that got at least one
+    message queued; those without an email or phone for the chosen
+    channels are listed in skipped.
+    """
+    try:
+        data = request.json or {}
+        template = data.get('message')
+        subject_template = data.get('subject', 'Job Opportunity')
+        send_email_flag = data.get('send_email', True)
+        send_sms_flag = data.get('send_sms', True)
+        candidate_ids = data.get('candidate_ids')
+        
+        if not template:
+            return jsonify({'success': False, 'error': 'Message is required'}), 400
+        if candidate_ids is None and not data.get('status'):
+            return jsonify({'success': False, 'error': 'candidate_ids or status is required'}), 400
+        if candidate_ids is not None:
+            if not isinstance(candidate_ids, list) or not all(isinstance(i, int) for i in candidate_ids):
+                return jsonify({'success': False, 'error': 'candidate_ids must be a list of integers'}), 400
+            candidate_ids = list(dict.fromkeys(candidate_ids))
+        
+        filters = {
+            'status': data.get('status'),
+            'location': data.get('location'),
+            'message_sent': data.get('message_sent')
+        }
+        if not all(isinstance(filters[key], (str, type(None))) for key in ('status', 'location')):
+            return jsonify({'success': False, 'error': 'status and location must be strings'}), 400
+        if filters['message_sent'] not in (None, 0, 1, '0', '1'):
+            return jsonify({'success': False, 'error': 'message_sent must be 0 or 1'}), 400
+        recipients = fetch_recipients(candidate_ids, filters)
+        if len(recipients) > MAX_BULK_RECIPIENTS:
+            return jsonify({
+                'success': False,
+                'error': f'Too many recipients ({len(recipients)}); the limit is {MAX_BULK_RECIPIENTS}'
+            }), 400
+        
+        jobs = []
+        for candidate in recipients:
+            message = render_template(template, candidate)
+            if send_email_flag and candidate['email']:
+                jobs.append({
+                    'candidate_id': candidate['id'],
+                    'channel': 'email',
+                    'recipient': candidate['email'],
+                    'subject': render_template(subject_template, candidate),
+                    'message': message
+                })
+            if send_sms_flag and candidate['phone']:
+                jobs.append({
+                    'candidate_id': candidate['id'],
+                    'channel': 'sms',
+                    'recipient': candidate['phone'],
+                    'message': message
+                })
+        
+        messaged = set(job['candidate_id'] for job in jobs)
+        conn = get_db()
+        campaign_id = messaging.enqueue_campaign(conn, jobs)
+        conn.executemany(
+            'UPDATE candidates SET message_sent = 1 WHERE id = ?',
+            [(candidate_id,) for candidate_id in messaged]
+        )
+        conn.commit()
+        messaging.worker.notify()
+        
+        found = {candidate['id'] for candidate in recipients}
+        return jsonify({
+            'success': True,
+            'campaign_id': campaign_id,
+            'recipients': len(recipients),
+            'jobs_queued': len(jobs),
+            'skipped': [candidate['id'] for candidate in recipients if candidate['id'] not in messaged],
+            'not_found': [i for i in candidate_ids if i not in found] if candidate_ids is not None else []
+        }), 202
+        
+    except Exception as e:
+        print(f"❌ Bulk send error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/campaigns/<campaign_id>', methods=['GET'])
+@login_required
+def get_campaign(campaign_id):
+    """Get delivery progress of a bulk send"""
+    status = messaging.campaign_status(campaign_id)
+    if not status['total']:
+        return jsonify({'success': False, 'error': 'Campaign not found'}), 404
+    return jsonify({'success': True, 'campaign': status})
+
+@app.route('/api/message-jobs', methods=['GET'])
+@login_required
+def get_message_jobs():
+    """Get delivery status for queued messages, e.g. ?ids=12,13"""
+    try:
+        job_ids = [int(job_id) for job_id in request.args.get('ids', '').split(',') if job_id.strip()]
+    except ValueError:
+        return jsonify({'success': False, 'error': 'ids must be a comma-separated list of job ids'}), 400
+    
+    return jsonify({'success': True, 'jobs': messaging.get_jobs(job_ids)})
+
+@app.route('/api/message-jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_message_job(job_id):
+    """Get delivery status for one queued message"""
+    jobs = messaging.get_jobs([job_id])
+    if not jobs:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': jobs[0]})
+
 @app.route('/api/message-log', methods=['GET'])
 @login_required
+@conditional_get('message')
 def get_message_log():
-    """Get simulated message log"""
-    try:
-        messages = []
-        log_file = 'sent_messages.log'
-        
-        if os.path.exists(log_file):
-            with open(log_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            blocks = content.split('='*60)
-            for block in blocks:
-                block = block.strip()
-                if not block:
-                    continue
-                    
-                lines = block.split('\n')
-                msg = {}
-                
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith('EMAIL -') or line.startswith('SMS -'):
-                        msg['type'] = 'email' if 'EMAIL' in line else 'sms'
-                        msg['timestamp'] = line.split(' - ')[1] if ' - ' in line else ''
-                    elif line.startswith('To:'):
-                        msg['to'] = line.replace('To:', '').strip()
-                    elif line.startswith('Subject:'):
-                        msg['subject'] = line.replace('Subject:', '').strip()
-                    elif line.startswith('Message:'):
-                        msg_index = lines.index(line)
-                        msg['message'] = '\n'.join(lines[msg_index+1:]).strip()
-                        break
-                
-                if msg.get('to'):
-                    messages.append(msg)
-        
-        messages.reverse()
+    """Get simulated message log, newest first.
+
+    Returns 50 messages by default; pass limit and the returned next_before
+    to page further back.
+    """
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    before = request.args.get('before', type=int)
+    if limit is None or limit < 1:
+        return jsonify({'success': False, 'error': 'limit must be a positive integer'}), 400
+    
+    try:
+        messages, next_before = messaging.get_messages(min(limit, MAX_PAGE_SIZE), before)
         
         return jsonify({
             'success': True,
-            'messages': messages[:50]
+            'messages': messages,
+            'next_before': next_before
         })
         
     except Exception as e:
         print(f"❌ Error reading message log: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.cli.command('import-message-log')
+@click.argument('path', default=messaging.LEGACY_LOG_FILE)
+def import_message_log_command(path):
+    """Import an old sent_messages.log into the messages table"""
+    migrate()
+    imported = messaging.import_legacy_log(path)
+    changes.prune(get_db())
+    print(f"✅ Imported {imported} messages from {path}")
+
+# ============= DASHBOARD ROUTES =============
+
+@app.route('/api/stats', methods=['GET'])
+@login_required
+@conditional_get('candidate', 'message')
+def get_stats():
+    """Candidate and message totals for the dashboard, from the maintained counters"""
+    try:
+        return jsonify({'success': True, 'stats': stats.get_stats(get_db())})
+    except Exception as e:
+        print(f"❌ Error getting stats: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.cli.command('rebuild-stats')
+@click.option('--check', is_flag=True, help='Only report counters that differ from a full recount')
+def rebuild_stats_command(check):
+    """Recount the dashboard counters from the candidates and messages tables"""
+    migrate()
+    differences = stats.verify_stats(get_db())
+    for difference in differences:
+        print(f"   {difference['dimension']}={difference['value']!r}: counter {difference['counter']}, actual {difference['actual']}")
+    if check:
+        print(f"{'❌' if differences else '✅'} {len(differences)} counters out of date")
+        return
+    stats.rebuild_stats(get_db())
+    print(f"✅ Stats rebuilt ({len(differences)} counters corrected)")
+
+# ============= CHANGE FEED ROUTES =============
+
+CHANGE_STREAM_MAX_SECONDS = int(os.getenv('CHANGE_STREAM_MAX_SECONDS', '300'))
+CHANGE_HEARTBEAT_SECONDS = 15
+CHANGE_STREAM_ENVIRON_KEY = 'hr.change_stream_since'
+
+def change_to_dict(change):
+    """Shape a change's candidate data like the candidate list does"""
+    if change['entity'] == 'candidate' and change['data']:
+        change['data'] = candidate_row_to_dict(change['data'], CANDIDATE_FIELDS)
+    return change
+
+def parse_since(value):
+    """Read a since / Last-Event-ID value, raising ValueError if it isn't a seq"""
+    since = int(value)
+    if since < 0:
+        raise ValueError
+    return since
+
+@app.route('/api/changes', methods=['GET'])
+@login_required
+def get_changes():
+    """Changes after since (a seq from /api/candidates or an earlier call), oldest first"""
+    try:
+        since = parse_since(request.args.get('since', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'since must be a sequence number'}), 400
+    
+    conn = get_db()
+    if changes.is_expired(conn, since):
+        return jsonify({'success': False, 'reset': True, 'error': 'since is older than the change log; reload the list'}), 410
+    
+    batch = [change_to_dict(change) for change in changes.changes_since(conn, since)]
+    return jsonify({
+        'success': True,
+        'changes': batch,
+        'seq': batch[-1]['seq'] if batch else since,
+        'more': len(batch) == changes.CHANGE_BATCH_SIZE
+    })
+
+def sse_event(event, data, event_id=None):
+    """Format one Server-Sent Event"""
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {json.dumps(data)}']
+    return '\n'.join(lines) + '\n\n'
+
+def next_change_events(conn, since):
+    """One poll of the change log for a stream positioned after since.
+
+    Returns (events, since, state) where state is 'reset' if the client fell
+    behind the retained log, 'more' if a full batch was read and the next
+    one should be read at once, and 'idle' otherwise.
+    """
+    if changes.is_expired(conn, since):
+        return [sse_event('reset', {'seq': changes.latest_seq(conn)})], since, 'reset'
+    batch = changes.changes_since(conn, since)
+    events = [sse_event('change', change_to_dict(change), change['seq']) for change in batch]
+    if batch:
+        since = batch[-1]['seq']
+    return events, since, 'more' if len(batch) == changes.CHANGE_BATCH_SIZE else 'idle'
+
+@app.route('/api/changes/stream', methods=['GET'])
+@login_required
+def stream_changes():
+    """Server-Sent Events feed of changes.
+
+    Starts after since, or after the Last-Event-ID header a reconnecting
+    EventSource sends, or at the current end of the log. Each event's id is
+    its seq. A reset event means the client fell behind the retained log and
+    must reload the list. Streams close after CHANGE_STREAM_MAX_SECONDS;
+    EventSource reconnects by itself and resumes from the last id.
+    """
+    resume_from = request.headers.get('Last-Event-ID') or request.args.get('since')
+    conn = get_db()
+    try:
+        since = parse_since(resume_from) if resume_from else changes.latest_seq(conn)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'since must be a sequence number'}), 400
+    
+    # asgi.py serves the stream itself from here, without holding a thread
+    request.environ[CHANGE_STREAM_ENVIRON_KEY] = since
+    
+    def generate(since):
+        deadline = time.monotonic() + CHANGE_STREAM_MAX_SECONDS
+        heartbeat = time.monotonic()
+        yield 'retry: 3000\n\n'
+        while True:
+            events, since, state = next_change_events(conn, since)
+            yield from events
+            if state == 'reset':
+                return
+            if events:
+                heartbeat = time.monotonic()
+            if state == 'more':
+                continue
+            
+            if time.monotonic() > deadline:
+                return
+            if time.monotonic() - heartbeat > CHANGE_HEARTBEAT_SECONDS:
+                yield ': keepalive\n\n'
+                heartbeat = time.monotonic()
+            time.sleep(changes.CHANGE_POLL_INTERVAL_SECONDS)
+    
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(generate(since)), mimetype='text/event-stream', headers=headers)
+
 # ============= JOB SETTINGS ROUTES =============
 
+def load_job_settings():
+    """Read the current job settings, or {} if none are saved"""
+    row = get_db().execute('SELECT * FROM job_settings ORDER BY id DESC LIMIT 1').fetchone()
+    if not row:
+        return {}
+    return {
+        'job_title': row['job_title'],
+        'company_name': row['company_name'],
+        'job_description': row['job_description'],
+        'requirements': row['requirements'],
+        'location': row['location'],
+        'salary_range': row['salary_range']
+    }
+
 @app.route('/api/job-settings', methods=['GET'])
 @login_required
+@conditional_get('job_settings')
 def get_job_settings():
     """Get job settings"""
     try:
-        conn = sqlite3.connect(DATABASE)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM job_settings ORDER BY id DESC LIMIT 1')
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            settings = {
-                'job_title': row['job_title'],
-                'company_name': row['company_name'],
-                'job_description': row['job_description'],
-                'requirements': row['requirements'],
-                'location': row['location'],
-                'salary_range': row['salary_range']
-            }
-            return jsonify({'success': True, 'settings': settings})
-        else:
-            return jsonify({'success': True, 'settings': {}})
+        settings = cache.job_settings_cache.get('current', load_job_settings)
+        return jsonify({'success': True, 'settings': settings})
             
     except Exception as e:
         print(f"❌ Error getting job settings: {e}")
@@ -659,7 +1850,7 @@ def update_job_settings():
     try:
         data = request.json
         
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('DELETE FROM job_settings')
@@ -675,9 +1866,10 @@ def update_job_settings():
             data.get('location', ''),
             data.get('salary_range', '')
         ))
+        matching.update_job_vector(cursor, data.get('requirements', ''), data.get('location', ''))
         
         conn.commit()
-        conn.close()
+        cache.job_settings_cache.invalidate()
         
         return jsonify({'success': True, 'message': 'Job settings updated'})
         
@@ -685,5 +1877,139 @@ def update_job_settings():
         print(f"❌ Error updating job settings: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# ============= INTERVIEW SCHEDULING ROUTES =============
+
+@app.route('/api/interview-rooms', methods=['GET'])
+@login_required
+def get_interview_rooms():
+    """List interview rooms"""
+    return jsonify({'success': True, 'rooms': scheduler.list_rooms(get_db())})
+
+@app.route('/api/interview-rooms', methods=['POST'])
+@login_required
+def create_interview_room():
+    """Add an interview room: {"name": "Room A", "location": "Mumbai office"}"""
+    data = request.json or {}
+    try:
+        room_id = scheduler.create_room(get_db(), data.get('name'), data.get('location'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'id': room_id}), 201
+
+@app.route('/api/interview-slots', methods=['GET'])
+@login_required
+def get_interview_slots():
+    """List slots, optionally by date_from/date_to, room_id and available=1|0"""
+    args = request.args
+    available = args.get('available')
+    try:
+        slots = scheduler.list_slots(
+            get_db(), args.get('date_from'), args.get('date_to'), args.get('room_id', type=int),
+            None if available is None else available == '1'
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'slots': slots})
+
+@app.route('/api/interview-slots', methods=['POST'])
+@login_required
+def create_interview_slots():
+    """Create slots, rejecting any that overlap a slot of the same room.
+
+    Either explicit {"slots": [{"room_id": 1, "starts_at": "2025-05-02 10:00",
+    "ends_at": "2025-05-02 10:30"}]} or a generated day: {"room_ids": [1, 2],
+    "date": "2025-05-02", "start": "10:00", "end": "17:00", "minutes": 30, "gap": 0}.
+    """
+    data = request.json or {}
+    try:
+        if 'slots' in data:
+            if not isinstance(data['slots'], list) or not all(isinstance(slot, dict) for slot in data['slots']):
+                raise ValueError('slots must be a list of objects')
+            slots = [(slot.get('room_id'), slot.get('starts_at'), slot.get('ends_at')) for slot in data['slots']]
+        else:
+            room_ids = data.get('room_ids')
+            if not isinstance(room_ids, list) or not room_ids or not all(isinstance(i, int) for i in room_ids):
+                raise ValueError('slots, or room_ids with date, start and end, are required')
+            slots = scheduler.generate_slots(
+                room_ids, data.get('date'), data.get('start'), data.get('end'),
+                int(data.get('minutes') or scheduler.INTERVIEW_SLOT_MINUTES), int(data.get('gap') or 0)
+            )
+        created, rejected = scheduler.create_slots(get_db(), slots)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Error creating interview slots: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, 'created': len(created), 'ids': created, 'rejected': rejected})
+
+@app.route('/api/interview-slots/<int:slot_id>/book', methods=['POST'])
+@login_required
+def book_interview_slot(slot_id):
+    """Book a slot for {"candidate_id": 12}; refuses double bookings"""
+    candidate_id = (request.json or {}).get('candidate_id')
+    if not isinstance(candidate_id, int):
+        return jsonify({'success': False, 'error': 'candidate_id is required'}), 400
+    try:
+        scheduler.book_slot(get_db(), slot_id, candidate_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except Exception as e:
+        print(f"❌ Error booking interview slot: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True})
+
+@app.route('/api/interview-slots/<int:slot_id>/release', methods=['POST'])
+@login_required
+def release_interview_slot(slot_id):
+    """Free a booked slot"""
+    try:
+        candidate_id = scheduler.release_slot(get_db(), slot_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    return jsonify({'success': True, 'candidate_id': candidate_id})
+
+@app.route('/api/interviews/auto-assign', methods=['POST'])
+@login_required
+def auto_assign_interviews():
+    """Pack candidates into open slots in one transaction.
+
+    Takes candidate_ids (served in that order) or a status/location filter
+    (served oldest first), plus optional date_from/date_to and room_ids to
+    limit the slots used.
+    """
+    data = request.json or {}
+    candidate_ids = data.get('candidate_ids')
+    room_ids = data.get('room_ids')
+    if candidate_ids is None and not data.get('status'):
+        return jsonify({'success': False, 'error': 'candidate_ids or status is required'}), 400
+    if candidate_ids is not None and (
+        not isinstance(candidate_ids, list) or not all(isinstance(i, int) for i in candidate_ids)
+    ):
+        return jsonify({'success': False, 'error': 'candidate_ids must be a list of integers'}), 400
+    if room_ids is not None and (not isinstance(room_ids, list) or not all(isinstance(i, int) for i in room_ids)):
+        return jsonify({'success': False, 'error': 'room_ids must be a list of integers'}), 400
+    
+    try:
+        conn = get_db()
+        if candidate_ids is None:
+            clauses, params = build_candidate_filters({'status': data.get('status'), 'location': data.get('location')})
+            candidate_ids = [row[0] for row in conn.execute(
+                f"SELECT id FROM candidates WHERE {' AND '.join(clauses)} ORDER BY id", params
+            )]
+        assigned, unassigned = scheduler.auto_assign(
+            conn, candidate_ids, data.get('date_from'), data.get('date_to'), room_ids
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Error assigning interviews: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({
+        'success': True,
+        'assigned': len(assigned),
+        'assignments': assigned,
+        'unassigned': unassigned
+    })
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
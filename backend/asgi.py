@@ -0,0 +1,252 @@
+"""ASGI entry point serving the Flask app with non-blocking I/O.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+
+Routes, JSON contracts and sessions are those of app.py: every request
+still runs through the Flask app, on a thread of a bounded executor
+(ASGI_THREADS), because the routes and SQLite are blocking. The event loop
+only moves bytes, so slow clients, uploads in transit and idle keep-alive
+connections hold no threads. Two things that hold a thread for seconds
+under a WSGI server don't here:
+
+- /api/changes/stream: the Flask view checks the session and the since
+  position, then the stream is served from the loop, with each poll of the
+  change log run on the executor and asyncio.sleep in between
+- outbound messages: the queue is drained by messaging.AsyncMessageWorker,
+  whose provider waits are coroutines
+
+Single resume uploads are parsed in the resume process pool when
+RESUME_PARSE_IN_POOL is on, so a long parse doesn't hold the GIL the
+executor threads share.
+"""
+import asyncio
+import contextvars
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import changes
+import messaging
+import resume_parser
+from app import (
+    CHANGE_HEARTBEAT_SECONDS, CHANGE_STREAM_ENVIRON_KEY, CHANGE_STREAM_MAX_SECONDS,
+    app as flask_app, create_app, next_change_events
+)
+from db import acquire_connection, release_connection
+
+# Configuration
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', '16'))
+# Request bodies larger than this are spooled to a temporary file
+ASGI_SPOOL_BYTES = int(os.getenv('ASGI_SPOOL_BYTES', str(1024 * 1024)))
+
+executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix='asgi')
+
+# Returned by next() when a response body is exhausted
+DONE = object()
+
+
+async def read_body(receive):
+    """Read the request body into a spooled file; returns (file, size).
+
+    Past MAX_CONTENT_LENGTH the rest is counted but not kept, since Flask
+    answers 413 from the size alone.
+    """
+    limit = flask_app.config.get('MAX_CONTENT_LENGTH')
+    body = tempfile.SpooledTemporaryFile(max_size=ASGI_SPOOL_BYTES)
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            body.close()
+            return None, 0
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if limit is None or size <= limit:
+            body.write(chunk)
+        more_body = message.get('more_body', False)
+    body.seek(0)
+    return body, size
+
+
+def build_environ(scope, body, size):
+    """WSGI environ of an ASGI HTTP request"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(size),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = name if name == 'CONTENT_TYPE' else f'HTTP_{name}'
+        if key in environ:
+            separator = '; ' if key == 'HTTP_COOKIE' else ','
+            value = environ[key] + separator + value
+        environ[key] = value
+    return environ
+
+
+def call_app(environ):
+    """Run the Flask app; returns (status, headers, body, iterable).
+
+    A response with a Content-Length is read whole here, in one trip to
+    the executor, and body is set. Streamed responses come back as the open
+    iterable, to be read chunk by chunk and closed by the caller.
+    """
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+        return lambda data: None
+
+    iterable = flask_app(environ, start_response)
+    headers = started['headers']
+    if CHANGE_STREAM_ENVIRON_KEY in environ or not any(name.lower() == 'content-length' for name, _ in headers):
+        return started['status'], headers, None, iterable
+    try:
+        body = b''.join(iterable)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    return started['status'], headers, body, None
+
+
+def encode_headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+
+async def wait_for_disconnect(receive, disconnected):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    disconnected.set()
+
+
+async def stream_body(send, run, iterable, disconnected):
+    """Send a streamed response chunk by chunk, reading it on the executor"""
+    iterator = iter(iterable)
+    while not disconnected.is_set():
+        chunk = await run(next, iterator, DONE)
+        if chunk is DONE:
+            break
+        if chunk:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def stream_changes(send, run, since, disconnected):
+    """Serve /api/changes/stream from the loop, like the Flask generator does"""
+    conn = await run(acquire_connection)
+    try:
+        deadline = time.monotonic() + CHANGE_STREAM_MAX_SECONDS
+        heartbeat = time.monotonic()
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+        while not disconnected.is_set():
+            events, since, state = await run(next_change_events, conn, since)
+            if events:
+                heartbeat = time.monotonic()
+                await send({'type': 'http.response.body', 'body': ''.join(events).encode(), 'more_body': True})
+            if state == 'reset':
+                break
+            if state == 'more':
+                continue
+
+            if time.monotonic() > deadline:
+                break
+            if time.monotonic() - heartbeat > CHANGE_HEARTBEAT_SECONDS:
+                await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                heartbeat = time.monotonic()
+            try:
+                await asyncio.wait_for(disconnected.wait(), changes.CHANGE_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        await run(release_connection, conn)
+
+
+async def handle_http(scope, receive, send):
+    body, size = await read_body(receive)
+    if body is None:
+        return
+
+    # Everything one request runs on the executor shares a context, so the
+    # Flask request context that stream_with_context keeps can be popped
+    # from whichever thread reads the last chunk
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+
+    def run(function, *args):
+        return loop.run_in_executor(executor, partial(context.run, function, *args))
+
+    environ = build_environ(scope, body, size)
+    try:
+        status, headers, content, iterable = await run(call_app, environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': encode_headers(headers)})
+        if iterable is None:
+            await send({'type': 'http.response.body', 'body': content})
+            return
+
+        disconnected = asyncio.Event()
+        watcher = loop.create_task(wait_for_disconnect(receive, disconnected))
+        try:
+            if CHANGE_STREAM_ENVIRON_KEY in environ:
+                # The view's generator is never started; closing it ends the request
+                await run(iterable.close)
+                iterable = None
+                await stream_changes(send, run, environ[CHANGE_STREAM_ENVIRON_KEY], disconnected)
+            else:
+                await stream_body(send, run, iterable, disconnected)
+        finally:
+            watcher.cancel()
+            if iterable is not None and hasattr(iterable, 'close'):
+                await run(iterable.close)
+    finally:
+        body.close()
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await asyncio.get_running_loop().run_in_executor(executor, partial(create_app, start_workers=False))
+            await messaging.start_async_workers(executor)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if isinstance(messaging.worker, messaging.AsyncMessageWorker):
+                await messaging.worker.stop_async()
+            # uvicorn re-raises SIGTERM after shutdown, which skips the
+            # atexit hook that would stop the parse pool's processes
+            await asyncio.get_running_loop().run_in_executor(executor, resume_parser.shutdown_pool)
+            executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'http':
+        await handle_http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
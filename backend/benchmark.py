@@ -0,0 +1,825 @@
+"""Backend benchmarks.
+
+Run from the backend folder against a throwaway database:
+
+    DATABASE_PATH=/tmp/bench.db python benchmark.py seed --candidates 1M
+    DATABASE_PATH=/tmp/bench.db python benchmark.py connections
+    DATABASE_PATH=/tmp/bench.db python benchmark.py routes --candidates 100k --iterations 500
+    DATABASE_PATH=/tmp/bench.db python benchmark.py load --concurrency 16 --requests 2000
+    DATABASE_PATH=/tmp/bench.db python benchmark.py load --server uvicorn --concurrency 64 --streams 50
+    DATABASE_PATH=/tmp/bench.db python benchmark.py load --url http://127.0.0.1:5000 --concurrency 16
+    DATABASE_PATH=/tmp/bench.db python benchmark.py pdfs --resumes 100 --pdf-dir /tmp/resumes
+    DATABASE_PATH=/tmp/bench.db python benchmark.py bulk --candidates 1000
+    DATABASE_PATH=/tmp/bench.db python benchmark.py extract --resumes 2000
+    DATABASE_PATH=/tmp/bench.db python benchmark.py search --candidates 100000 --iterations 50
+    DATABASE_PATH=/tmp/bench.db python benchmark.py match --candidates 100000 --iterations 50
+    DATABASE_PATH=/tmp/bench.db python benchmark.py caching --candidates 10000 --iterations 50
+    DATABASE_PATH=/tmp/bench.db python benchmark.py schedule --candidates 10000 --slots 5000
+    DATABASE_PATH=/tmp/bench.db python benchmark.py dedupe --candidates 1M --iterations 2000
+    DATABASE_PATH=/tmp/bench.db python benchmark.py startup --starts 20
+
+Every run prints one JSON document (add --output FILE to also save it)
+with the suite's results and the process's peak RSS, so runs before and
+after a change can be diffed.
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import random
+import re
+import resource
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DATABASE_PATH', 'benchmark.db')
+
+import db
+import dedupe
+import gazetteer
+import matching
+import messaging
+import resume_parser
+import scheduler
+import search
+from app import create_app
+from sample_resumes import synthetic_pdfs, synthetic_resume
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+# Created in main(), so importing this module starts no migrations or workers
+app = None
+
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Priya', 'Ananya', 'Diya', 'Rohan', 'Isha', 'Kabir', 'Meera']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Reddy', 'Khan', 'Gupta', 'Nair', 'Singh', 'Das', 'Joshi']
+
+
+SEED_CHUNK_SIZE = 10000
+
+
+def parse_count(value):
+    """Accept 1000, 1k, 100k or 1M on the command line"""
+    units = {'k': 1000, 'm': 1000000}
+    value = value.strip().lower()
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def seed_candidates(count):
+    """Fill the candidates table with synthetic rows up to count.
+
+    Rows go in SEED_CHUNK_SIZE at a time, one transaction each, so a 1M
+    row seed keeps memory flat. Returns the number of rows added.
+    """
+    conn = db.get_db()
+    existing = conn.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+    rng = random.Random(existing)
+    skill_names = sorted(gazetteer.SKILLS)
+    for start in range(existing, count, SEED_CHUNK_SIZE):
+        rows = []
+        for i in range(start, min(start + SEED_CHUNK_SIZE, count)):
+            skills = rng.sample(skill_names, 4)
+            location = rng.choice(gazetteer.LOCATIONS)
+            name, phone, email = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}', f'98{i:08d}', f'candidate{i}@example.com'
+            rows.append((
+                '2024-01-01', name, phone, email, location, ', '.join(skills), f'{i % 15} years', f'BENCH-{i:07d}', 'New',
+                f'Worked in {location} on {skills[0]} and {skills[1]} projects for {rng.randint(1, 15)} years.',
+                *dedupe.candidate_keys(email, phone, name)
+            ))
+        conn.executemany('''
+            INSERT INTO candidates (date, name, phone, email, location, skills, experience, code, status, resume_text,
+                                    email_key, phone_key, name_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+    return max(count - existing, 0)
+
+
+def bench_seed(count):
+    """Time seeding the candidates table up to count rows"""
+    start = time.perf_counter()
+    added = seed_candidates(count)
+    elapsed = time.perf_counter() - start
+    return {
+        'candidates': db.get_db().execute('SELECT COUNT(*) FROM candidates').fetchone()[0],
+        'added': added,
+        'seconds': round(elapsed, 2),
+        'rows_per_sec': round(added / elapsed, 1) if added else None
+    }
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def latency_summary(samples, elapsed, errors=0):
+    """p50/p95/p99 in milliseconds and throughput of one measured run"""
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'p50_ms': round(percentile(samples, 0.5), 2),
+        'p95_ms': round(percentile(samples, 0.95), 2),
+        'p99_ms': round(percentile(samples, 0.99), 2),
+        'max_ms': round(max(samples), 2),
+        'requests_per_sec': round(len(samples) / elapsed, 1)
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux)"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def timed(fn, iterations):
+    """Call fn repeatedly and return calls per second"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return round(iterations / elapsed, 1)
+
+
+def bench_connections(iterations):
+    """Compare connect-per-call (the old pattern) against the pooled layer"""
+    queries = {
+        'login_lookup': ('SELECT * FROM users WHERE username = ?', ('admin',)),
+        'job_settings': ('SELECT * FROM job_settings ORDER BY id DESC LIMIT 1', ()),
+        'candidate_by_email': ('SELECT id FROM candidates WHERE email = ?', ('candidate1@example.com',)),
+    }
+    results = {}
+
+    for name, (sql, params) in queries.items():
+        def per_call():
+            conn = sqlite3.connect(db.DATABASE)
+            conn.row_factory = sqlite3.Row
+            conn.execute(sql, params).fetchall()
+            conn.close()
+
+        def pooled():
+            conn = db.acquire_connection()
+            conn.execute(sql, params).fetchall()
+            db.release_connection(conn)
+
+        results[name] = {
+            'connect_per_call_ops': timed(per_call, iterations),
+            'pooled_ops': timed(pooled, iterations)
+        }
+
+    def write_per_call():
+        conn = sqlite3.connect(db.DATABASE)
+        conn.execute('UPDATE candidates SET status = ? WHERE id = 1', ('New',))
+        conn.commit()
+        conn.close()
+
+    def write_pooled():
+        conn = db.acquire_connection()
+        conn.execute('UPDATE candidates SET status = ? WHERE id = 1', ('New',))
+        conn.commit()
+        db.release_connection(conn)
+
+    results['update_status'] = {
+        'connect_per_call_ops': timed(write_per_call, iterations),
+        'pooled_ops': timed(write_pooled, iterations)
+    }
+    return results
+
+
+def bench_pdfs(count, directory):
+    """Write synthetic PDF resumes to directory, e.g. for an external load tool"""
+    os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+    total = 0
+    for i, pdf in enumerate(synthetic_pdfs(count)):
+        with open(os.path.join(directory, f'resume_{i:05d}.pdf'), 'wb') as f:
+            f.write(pdf)
+        total += len(pdf)
+    return {
+        'directory': directory,
+        'files': count,
+        'bytes': total,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def route_requests(candidates, pdfs):
+    """The routes under test as name -> factory of (method, path, json body, files).
+
+    Each call of a factory describes one request, so writes use fresh
+    emails, random candidate ids and a different PDF every time.
+    """
+    rng = random.Random(11)
+    counter = iter(range(10 ** 9))
+    pdf_cycle = iter(pdfs * 1000)
+
+    def candidate():
+        n = next(counter)
+        return {'candidate': {
+            'name': f'Bench Save {n}', 'email': f'save{n}.{uuid.uuid4().hex[:6]}@example.com',
+            'phone': f'97{n:08d}', 'location': rng.choice(gazetteer.LOCATIONS),
+            'skills': 'Python, SQL', 'experience': '3 years'
+        }}
+
+    return {
+        'POST /api/login': lambda: ('POST', '/api/login', {'username': 'admin', 'password': 'admin123'}, None),
+        'POST /api/upload-resume': lambda: ('POST', '/api/upload-resume', None, ('resume.pdf', next(pdf_cycle))),
+        'POST /api/save-candidate': lambda: ('POST', '/api/save-candidate', candidate(), None),
+        'GET /api/candidates': lambda: ('GET', '/api/candidates?limit=50', None, None),
+        'POST /api/update-candidate': lambda: ('POST', '/api/update-candidate', {
+            'id': rng.randint(1, candidates), 'field': 'status', 'value': rng.choice(['New', 'Shortlisted', 'Interview'])
+        }, None),
+        'POST /api/send-message': lambda: ('POST', '/api/send-message', {
+            'candidate_id': rng.randint(1, candidates), 'email': 'bench@example.com', 'phone': '9800000000',
+            'subject': 'Interview', 'message': 'Hi, please confirm your interview slot.'
+        }, None),
+        'GET /api/message-log': lambda: ('GET', '/api/message-log?limit=50', None, None),
+    }
+
+
+def test_client_call(client, method, path, body, upload):
+    """Send one described request through the Flask test client; returns the status"""
+    if upload:
+        filename, data = upload
+        response = client.post(path, data={'file': (io.BytesIO(data), filename)}, content_type='multipart/form-data')
+    else:
+        response = client.open(path, method=method, json=body)
+    return response.status_code
+
+
+def bench_routes(iterations, candidates):
+    """Latency percentiles and throughput of each route through the test client (no HTTP)"""
+    client = app.test_client()
+    client.post('/api/login', json={'username': 'admin', 'password': 'admin123'})
+    requests = route_requests(candidates, synthetic_pdfs(iterations))
+
+    results = {}
+    # The simulated senders and the parser print progress; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, describe in requests.items():
+            samples, errors = [], 0
+            started = time.perf_counter()
+            for _ in range(iterations):
+                call = describe()
+                start = time.perf_counter()
+                status = test_client_call(client, *call)
+                samples.append((time.perf_counter() - start) * 1000)
+                errors += status >= 400
+            results[name] = latency_summary(samples, time.perf_counter() - started, errors)
+    return results
+
+
+def multipart_body(filename, data):
+    """Encode one file field as multipart/form-data; returns (body, content type)"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'
+    ).encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+class HttpWorker:
+    """One keep-alive connection with its own login session"""
+
+    def __init__(self, url):
+        self.url = urllib.parse.urlsplit(url)
+        self.conn = None
+        self.cookie = ''
+        self.send('POST', '/api/login', {'username': 'admin', 'password': 'admin123'}, None)
+
+    def send(self, method, path, body, upload):
+        headers = {'Cookie': self.cookie}
+        payload = None
+        if upload:
+            payload, headers['Content-Type'] = multipart_body(*upload)
+        elif body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=60)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # The server closed the keep-alive connection; reconnect once
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            self.cookie = cookie.split(';', 1)[0]
+        if response.getheader('Connection', '').lower() == 'close':
+            self.conn.close()
+            self.conn = None
+        return response.status
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Werkzeug's handler without the per-request access log"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+@contextlib.contextmanager
+def local_server():
+    """Serve the app over HTTP on a free local port in a background thread"""
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+
+
+@contextlib.contextmanager
+def uvicorn_server():
+    """Serve asgi.py with uvicorn in a child process on a free local port"""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    env = dict(os.environ, DATABASE_PATH=os.path.abspath(db.DATABASE))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('uvicorn did not start; is it installed (pip install uvicorn)?')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def open_change_streams(worker, count):
+    """Open count /api/changes/stream connections and leave them streaming"""
+    streams = []
+    for _ in range(count):
+        conn = http.client.HTTPConnection(worker.url.hostname, worker.url.port or 80, timeout=60)
+        conn.request('GET', '/api/changes/stream', headers={'Cookie': worker.cookie})
+        if conn.getresponse().status != 200:
+            raise RuntimeError('change stream refused')
+        streams.append(conn)
+    return streams
+
+
+def bench_load(url, requests, concurrency, candidates, server='werkzeug', streams=0):
+    """Drive every route over HTTP from concurrency keep-alive clients.
+
+    Without url the app is served by Werkzeug's threaded server in this
+    process (so peak RSS covers server and clients), or with server=uvicorn
+    by asgi.py under uvicorn in a child process; pass url to load a
+    separately started server (e.g. gunicorn) instead. streams change
+    stream connections are held open for the whole run, as open browser
+    tabs would.
+    """
+    if url:
+        serving = contextlib.nullcontext(url)
+    else:
+        serving = uvicorn_server() if server == 'uvicorn' else local_server()
+    results = {'concurrency': concurrency, 'server': 'external' if url else server, 'streams': streams, 'routes': {}}
+    with serving as base, contextlib.redirect_stdout(io.StringIO()):
+        results['url'] = base
+        workers = [HttpWorker(base) for _ in range(concurrency)]
+        open_streams = open_change_streams(workers[0], streams)
+        for name, describe in route_requests(candidates, synthetic_pdfs(requests)).items():
+            calls = [describe() for _ in range(requests)]
+            lock = threading.Lock()
+            samples, errors = [], [0]
+
+            def run(worker, share):
+                for call in share:
+                    start = time.perf_counter()
+                    try:
+                        status = worker.send(*call)
+                    except (http.client.HTTPException, OSError):
+                        status = 599
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        samples.append(elapsed)
+                        errors[0] += status >= 400
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                for i, worker in enumerate(workers):
+                    pool.submit(run, worker, calls[i::concurrency])
+            results['routes'][name] = latency_summary(samples, time.perf_counter() - started, errors[0])
+        for conn in open_streams:
+            conn.close()
+    return results
+
+
+def bench_bulk(recipients):
+    """Queue one email+SMS campaign and time rendering/queueing and delivery"""
+    client = app.test_client()
+    client.post('/api/login', json={'username': 'admin', 'password': 'admin123'})
+    ids = [row[0] for row in db.get_db().execute('SELECT id FROM candidates LIMIT ?', (recipients,))]
+
+    # The simulated senders print every message; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        response = client.post('/api/send-bulk', json={
+            'candidate_ids': ids,
+            'subject': 'Interview for {name}',
+            'message': 'Hi {name}, your code is {code}. Interview on {interview_date}.'
+        })
+        queued = time.perf_counter() - start
+        campaign_id = response.json['campaign_id']
+
+        while True:
+            counts = messaging.campaign_status(campaign_id)['counts']
+            if not counts.get('queued') and not counts.get('sending'):
+                break
+            time.sleep(0.05)
+        delivered = time.perf_counter() - start
+
+    jobs = response.json['jobs_queued']
+    return {
+        'recipients': len(ids),
+        'jobs': jobs,
+        'queue_seconds': round(queued, 3),
+        'queue_jobs_per_sec': round(jobs / queued, 1),
+        'delivery_seconds': round(delivered, 3),
+        'delivered_jobs_per_sec': round(jobs / delivered, 1),
+        'status_counts': counts,
+        'channel_concurrency': messaging.CHANNEL_CONCURRENCY,
+        'sequential_estimate_seconds': round(len(ids) * 0.8, 1)
+    }
+
+
+def legacy_extract_candidate_info(text):
+    """extract_candidate_info as it was before the single-pass rewrite, for comparison"""
+    info = {'name': '', 'email': '', 'phone': '', 'location': '', 'skills': '', 'experience': ''}
+    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+    if emails:
+        info['email'] = emails[0]
+    phones = re.findall(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]', text)
+    if phones:
+        info['phone'] = phones[0].strip()
+    cities = ['Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune', 'Ahmedabad']
+    for city in cities:
+        if city.lower() in text.lower():
+            info['location'] = city
+            break
+    return info
+
+
+def bench_extract(resumes):
+    """Throughput of the legacy and current field extractors over synthetic resumes"""
+    rng = random.Random(42)
+    corpus = [synthetic_resume(rng, i) for i in range(resumes)]
+    megabytes = sum(len(text.encode('utf-8')) for text in corpus) / (1024 * 1024)
+
+    results = {'resumes': resumes, 'corpus_mb': round(megabytes, 2)}
+    for name, extractor in [('legacy', legacy_extract_candidate_info),
+                            ('current', resume_parser.extract_candidate_info)]:
+        start = time.perf_counter()
+        for text in corpus:
+            extractor(text)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'seconds': round(elapsed, 3),
+            'mb_per_sec': round(megabytes / elapsed, 2),
+            'resumes_per_sec': round(resumes / elapsed, 1)
+        }
+    return results
+
+
+def bench_search(iterations):
+    """Latency of /api/candidates/search for a few typical recruiter queries"""
+    client = app.test_client()
+    client.post('/api/login', json={'username': 'admin', 'password': 'admin123'})
+    queries = ['python', 'react mumbai', 'sharma', 'kubernetes aws', 'machine learn', 'pune java spring']
+
+    results = {}
+    for query in queries:
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            client.get('/api/candidates/search', query_string={'q': query, 'limit': 20})
+            samples.append((time.perf_counter() - start) * 1000)
+        sql_start = time.perf_counter()
+        for _ in range(iterations):
+            search.search_candidates(db.get_db(), query, ['id', 'name'], 20)
+        results[query] = {
+            'p50_ms': round(percentile(samples, 0.5), 2),
+            'p95_ms': round(percentile(samples, 0.95), 2),
+            'query_only_ms': round((time.perf_counter() - sql_start) * 1000 / iterations, 2)
+        }
+    return results
+
+
+def bench_match(iterations):
+    """Cost of building candidate vectors and of ranking against a few jobs"""
+    client = app.test_client()
+    client.post('/api/login', json={'username': 'admin', 'password': 'admin123'})
+    conn = db.get_db()
+
+    start = time.perf_counter()
+    matching.rebuild_index(conn)
+    rebuild = time.perf_counter() - start
+    candidates = conn.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+
+    start = time.perf_counter()
+    for row in conn.execute('SELECT id, skills, experience, location FROM candidates LIMIT ?', (iterations,)).fetchall():
+        matching.index_candidate(conn.cursor(), row['id'], row['skills'], row['experience'], row['location'])
+    conn.commit()
+    incremental = (time.perf_counter() - start) * 1000 / iterations
+
+    jobs = {
+        'python web': ('Python, Django, PostgreSQL, REST', 'Bangalore'),
+        'frontend': ('JavaScript, TypeScript, React, Redux, CSS', 'Mumbai'),
+        'data': ('Python, Pandas, NumPy, Machine Learning, SQL, Spark', ''),
+    }
+    results = {
+        'candidates': candidates,
+        'rebuild_seconds': round(rebuild, 2),
+        'index_candidate_ms': round(incremental, 3),
+        'jobs': {}
+    }
+    for name, (requirements, location) in jobs.items():
+        client.post('/api/job-settings', json={
+            'job_title': name, 'company_name': 'Bench', 'requirements': requirements, 'location': location
+        })
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            client.get('/api/candidates/match', query_string={'limit': 50})
+            samples.append((time.perf_counter() - start) * 1000)
+        results['jobs'][name] = {
+            'p50_ms': round(percentile(samples, 0.5), 2),
+            'p95_ms': round(percentile(samples, 0.95), 2)
+        }
+    return results
+
+
+def bench_caching(iterations):
+    """Bytes and latency of read routes: plain, gzip-compressed and revalidated with 304"""
+    client = app.test_client()
+    client.post('/api/login', json={'username': 'admin', 'password': 'admin123'})
+    results = {}
+    for route in ['/api/candidates', '/api/job-settings', '/api/message-log', '/api/stats']:
+        etag = client.get(route).headers['ETag']
+        variants = {
+            'plain': {},
+            'gzip': {'Accept-Encoding': 'gzip'},
+            'not_modified': {'If-None-Match': etag, 'Accept-Encoding': 'gzip'},
+        }
+        results[route] = {}
+        for name, headers in variants.items():
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response = client.get(route, headers=headers)
+                samples.append((time.perf_counter() - start) * 1000)
+            results[route][name] = {
+                'status': response.status_code,
+                'bytes': len(response.get_data()),
+                'p50_ms': round(percentile(samples, 0.5), 2)
+            }
+    return results
+
+
+def bench_schedule(slots, iterations):
+    """Slot creation, conflict checks and auto-assignment over a drive of many slots"""
+    conn = db.get_db()
+    tag = uuid.uuid4().hex[:6]
+    rooms = [scheduler.create_room(conn, f'Bench {tag} {n}') for n in range(20)]
+    per_day = len(rooms) * 16
+    days = max(slots // per_day, 1)
+
+    generated = []
+    for day in range(days):
+        date = (datetime(2030, 1, 1) + timedelta(days=day)).strftime('%Y-%m-%d')
+        generated.extend(scheduler.generate_slots(rooms, date, '09:00', '17:00', 30))
+    start = time.perf_counter()
+    created, rejected = scheduler.create_slots(conn, generated)
+    create = time.perf_counter() - start
+
+    # Conflict checks against the busiest room: the predecessor seek
+    # against the range scan it replaces
+    rng = random.Random(3)
+    probes = [rng.choice(generated) for _ in range(iterations)]
+    cursor = conn.cursor()
+    timings = {}
+    for name, sql in [
+        ('predecessor_seek', None),
+        ('range_scan', 'SELECT id FROM interview_slots WHERE room_id = ? AND starts_at < ? AND ends_at > ? LIMIT 1'),
+    ]:
+        samples = []
+        for room_id, starts_at, ends_at in probes:
+            begin = time.perf_counter()
+            if sql:
+                cursor.execute(sql, (room_id, ends_at, starts_at)).fetchone()
+            else:
+                scheduler.clash(cursor, 'room_id', room_id, starts_at, ends_at)
+            samples.append((time.perf_counter() - begin) * 1000)
+        timings[name] = {'p50_ms': round(percentile(samples, 0.5), 4), 'p99_ms': round(percentile(samples, 0.99), 4)}
+
+    candidate_ids = [row[0] for row in conn.execute(
+        'SELECT id FROM candidates WHERE id NOT IN (SELECT candidate_id FROM interview_slots WHERE candidate_id IS NOT NULL) '
+        'ORDER BY id LIMIT ?', (len(created),)
+    )]
+    start = time.perf_counter()
+    assigned, unassigned = scheduler.auto_assign(conn, candidate_ids, room_ids=rooms)
+    assign = time.perf_counter() - start
+
+    return {
+        'rooms': len(rooms),
+        'slots_created': len(created),
+        'slots_rejected': len(rejected),
+        'create_seconds': round(create, 3),
+        'slots_per_sec': round(len(created) / create, 1),
+        'conflict_check': timings,
+        'candidates': len(candidate_ids),
+        'assigned': len(assigned),
+        'unassigned': len(unassigned),
+        'auto_assign_seconds': round(assign, 3)
+    }
+
+
+def bench_dedupe(iterations):
+    """Key backfill, the duplicate check on save and whole-table clustering"""
+    conn = db.get_db()
+    total = conn.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+    rng = random.Random(5)
+
+    # Returning candidates written differently: +tag and upper case email,
+    # phone with country code and spaces
+    tag = uuid.uuid4().hex[:6]
+    originals = rng.sample(range(total), min(max(total // 100, 1), total))
+    rows = []
+    for n, i in enumerate(originals):
+        name, phone, email = f'Returning {i}', f'+91 98{i:08d}', f'Candidate{i}+{tag}{n}@Example.com'
+        rows.append((name, phone, email, 'Pune', f'DUP-{tag}-{n}', *dedupe.candidate_keys(email, phone, name)))
+    conn.executemany('''
+        INSERT INTO candidates (name, phone, email, location, code, email_key, phone_key, name_key)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+
+    start = time.perf_counter()
+    dedupe.rebuild_keys(conn)
+    rebuild = time.perf_counter() - start
+
+    cursor = conn.cursor()
+    samples = []
+    for _ in range(iterations):
+        i = rng.randrange(total * 2)
+        begin = time.perf_counter()
+        dedupe.find_duplicate(cursor, f'Candidate{i}@example.com', f'098{i:08d}')
+        samples.append((time.perf_counter() - begin) * 1000)
+
+    start = time.perf_counter()
+    clusters = dedupe.find_clusters(conn)
+    clustering = time.perf_counter() - start
+
+    return {
+        'candidates': total + len(rows),
+        'planted_duplicates': len(rows),
+        'rebuild_keys_seconds': round(rebuild, 2),
+        'save_check_p50_ms': round(percentile(samples, 0.5), 4),
+        'save_check_p99_ms': round(percentile(samples, 0.99), 4),
+        'clusters': len(clusters),
+        'cluster_seconds': round(clustering, 2)
+    }
+
+
+# Run in a fresh interpreter per start; prints the phase timings as JSON
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+ready = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (ready - imported) * 1000,
+    'pypdf2_loaded': 'PyPDF2' in sys.modules
+}))
+'''
+
+
+def bench_startup(starts):
+    """Cold-start backend processes, as gunicorn/uvicorn workers are started.
+
+    worker_boot starts against a database already at SCHEMA_VERSION (every
+    boot but the first after a deploy); first_deploy starts against a new
+    empty database each time, so the schema is created and migrated.
+    """
+    backend = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for scenario in ('worker_boot', 'first_deploy'):
+            phases = {'process_ms': [], 'import_ms': [], 'create_app_ms': []}
+            for i in range(starts):
+                database = os.path.abspath(db.DATABASE)
+                if scenario == 'first_deploy':
+                    database = os.path.join(scratch, f'start-{i}.db')
+                env = dict(os.environ, DATABASE_PATH=database, MESSAGE_WORKERS_ENABLED='0')
+                start = time.perf_counter()
+                output = subprocess.run(
+                    [sys.executable, '-c', STARTUP_SCRIPT], cwd=backend, env=env,
+                    capture_output=True, text=True, check=True
+                ).stdout
+                phases['process_ms'].append((time.perf_counter() - start) * 1000)
+                timings = json.loads(output.strip().splitlines()[-1])
+                phases['import_ms'].append(timings['import_ms'])
+                phases['create_app_ms'].append(timings['create_app_ms'])
+            results[scenario] = {
+                name: {'p50_ms': round(percentile(samples, 0.5), 1), 'max_ms': round(max(samples), 1)}
+                for name, samples in phases.items()
+            }
+    results['pypdf2_loaded_at_start'] = timings['pypdf2_loaded']
+    return results
+
+
+def main():
+    global app
+    parser = argparse.ArgumentParser(description='Benchmark the HR recruiter backend')
+    parser.add_argument('suite', choices=[
+        'seed', 'connections', 'routes', 'load', 'pdfs', 'bulk', 'extract', 'search', 'match', 'caching', 'schedule', 'dedupe',
+        'startup'
+    ])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--candidates', type=parse_count, default=1000, help='e.g. 1000, 100k, 1M')
+    parser.add_argument('--resumes', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=1000, help='requests per route (load)')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent HTTP clients (load)')
+    parser.add_argument('--slots', type=int, default=5000, help='interview slots to create (schedule)')
+    parser.add_argument('--starts', type=int, default=10, help='processes to cold-start (startup)')
+    parser.add_argument('--server', choices=['werkzeug', 'uvicorn'], default='werkzeug', help='server to load (load)')
+    parser.add_argument('--streams', type=int, default=0, help='change streams to hold open (load)')
+    parser.add_argument('--url', help='load an already running server instead of an in-process one')
+    parser.add_argument('--pdf-dir', default='synthetic_resumes')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+    app = create_app()
+
+    report = {'suite': args.suite, 'database': db.DATABASE}
+    if args.suite == 'extract':
+        results = bench_extract(args.resumes)
+    elif args.suite == 'pdfs':
+        results = bench_pdfs(args.resumes, args.pdf_dir)
+    elif args.suite == 'seed':
+        results = bench_seed(args.candidates)
+    elif args.suite == 'startup':
+        results = bench_startup(args.starts)
+    else:
+        seed_candidates(args.candidates)
+        if args.suite == 'connections':
+            results = bench_connections(args.iterations)
+        elif args.suite == 'routes':
+            results = bench_routes(args.iterations, args.candidates)
+        elif args.suite == 'load':
+            results = bench_load(args.url, args.requests, args.concurrency, args.candidates, args.server, args.streams)
+        elif args.suite == 'search':
+            results = bench_search(args.iterations)
+        elif args.suite == 'caching':
+            results = bench_caching(args.iterations)
+        elif args.suite == 'match':
+            results = bench_match(args.iterations)
+        elif args.suite == 'dedupe':
+            results = bench_dedupe(args.iterations)
+        elif args.suite == 'schedule':
+            results = bench_schedule(args.slots, args.iterations)
+        else:
+            results = bench_bulk(args.candidates)
+
+    report.update(results=results, peak_rss_mb=peak_rss_mb())
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""In-process caches for hot, rarely changing reads (job settings, users).
+
+Each cache is tied to a row in cache_versions. Triggers bump that row in the
+same transaction as any write to the underlying table, so a cache notices
+writes made by other processes (gunicorn workers, CLI commands) the next
+time it checks the version, at most CACHE_VERSION_CHECK_SECONDS later.
+Writes made through this process also clear the cache at once.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from db import get_db
+
+# Configuration
+CACHE_TTL_SECONDS = float(os.getenv('CACHE_TTL_SECONDS', '300'))
+CACHE_VERSION_CHECK_SECONDS = float(os.getenv('CACHE_VERSION_CHECK_SECONDS', '1'))
+
+# Cache name -> tables whose writes invalidate it
+CACHED_TABLES = {
+    'job_settings': ['job_settings'],
+    'users': ['users'],
+}
+
+_MISSING = object()
+
+
+def init_cache_versions(cursor):
+    """Create the version rows and the triggers that bump them"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cache_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for name, tables in CACHED_TABLES.items():
+        cursor.execute('INSERT OR IGNORE INTO cache_versions (name) VALUES (?)', (name,))
+        for table in tables:
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS cache_version_{table}_{event.lower()} AFTER {event} ON {table} BEGIN
+                        UPDATE cache_versions SET version = version + 1 WHERE name = '{name}';
+                    END
+                ''')
+
+
+class VersionedCache:
+    """LRU cache with a TTL that empties itself when its version row changes"""
+
+    def __init__(self, name, maxsize=128, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = CACHE_TTL_SECONDS if ttl is None else ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.version = None
+        self.generation = 0
+        self.checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def check_version(self):
+        """Empty the cache if another writer bumped the version; rate limited"""
+        now = time.monotonic()
+        if now - self.checked_at < CACHE_VERSION_CHECK_SECONDS:
+            return
+        row = get_db().execute('SELECT version FROM cache_versions WHERE name = ?', (self.name,)).fetchone()
+        version = row[0] if row else 0
+        with self.lock:
+            self.checked_at = now
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self.clear()
+                self.version = version
+
+    def clear(self):
+        """Drop every entry (lock held); loads already running won't be stored"""
+        self.entries.clear()
+        self.generation += 1
+
+    def get(self, key, loader):
+        """Cached value for key, calling loader() to fill a miss"""
+        self.check_version()
+        now = time.monotonic()
+        with self.lock:
+            value, expires = self.entries.get(key, (_MISSING, 0))
+            if value is not _MISSING and expires > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            generation = self.generation
+
+        value = loader()
+        with self.lock:
+            if generation != self.generation:
+                return value
+            self.entries[key] = (value, now + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """Drop every entry; call after this process writes the cached table"""
+        with self.lock:
+            self.clear()
+            self.checked_at = 0.0
+            self.invalidations += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'invalidations': self.invalidations,
+                'version': self.version
+            }
+
+
+job_settings_cache = VersionedCache('job_settings', maxsize=1)
+users_cache = VersionedCache('users', maxsize=256)
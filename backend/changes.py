@@ -0,0 +1,158 @@
+"""Change log behind the live dashboard feed.
+
+Triggers append one row to change_log for every insert, update (that
+changes a visible column) and delete of a candidate, every new job settings row and every sent message, so all
+write paths (single saves, batch updates, imports, the message workers) are
+covered without each one having to remember to log. seq is the position in
+the feed; clients pass the last seq they applied to get only newer changes.
+"""
+import json
+import os
+import threading
+import time
+
+# Configuration
+CHANGE_LOG_RETENTION = int(os.getenv('CHANGE_LOG_RETENTION', '100000'))
+CHANGE_POLL_INTERVAL_SECONDS = float(os.getenv('CHANGE_POLL_INTERVAL_SECONDS', '1'))
+CHANGE_PRUNE_INTERVAL_SECONDS = 60
+CHANGE_BATCH_SIZE = 500
+
+# Candidate columns carried in each change; resume_text is left out, it is
+# large and the dashboard never shows it
+CANDIDATE_COLUMNS = (
+    'id', 'date', 'name', 'phone', 'email', 'dob', 'location', 'skills', 'experience', 'code',
+    'status', 'interview_date', 'interview_time', 'interview_location', 'message_sent'
+)
+JOB_SETTINGS_COLUMNS = ('job_title', 'company_name', 'job_description', 'requirements', 'location', 'salary_range')
+MESSAGE_COLUMNS = ('id', 'type', 'recipient', 'subject', 'message', 'sent_at')
+
+_prune_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def json_object_sql(row, columns):
+    """SQL json_object() call over the given columns of NEW or OLD"""
+    return 'json_object(' + ', '.join(f"'{column}', {row}.{column}" for column in columns) + ')'
+
+
+def changed_sql(columns):
+    """SQL condition true when an UPDATE changed any of the given columns"""
+    return ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in columns)
+
+
+def log_trigger_sql(name, event, table, entity, action, row, columns, when=None):
+    """CREATE TRIGGER statement that appends one change for each affected row"""
+    data = json_object_sql(row, columns) if columns else 'NULL'
+    condition = f'WHEN {when}' if when else ''
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} {condition} BEGIN
+            INSERT INTO change_log (entity, entity_id, action, data)
+            VALUES ('{entity}', {row}.id, '{action}', {data});
+        END
+    '''
+
+
+def init_change_log(cursor):
+    """Create the change log and the triggers that feed it"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,
+            entity_id INTEGER,
+            action TEXT NOT NULL,
+            data TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_change_log_entity ON change_log (entity, seq)')
+
+    # Search, match and stats bookkeeping never updates candidates, and
+    # resume_text isn't part of the feed, so only visible columns fire
+    # updates, and only when one of them actually changed. Dropped first so
+    # databases created before the WHEN guard get it
+    visible = [column for column in CANDIDATE_COLUMNS if column != 'id']
+    cursor.execute('DROP TRIGGER IF EXISTS change_log_candidate_update')
+    triggers = [
+        log_trigger_sql('change_log_candidate_insert', 'INSERT', 'candidates', 'candidate', 'upsert', 'new', CANDIDATE_COLUMNS),
+        log_trigger_sql(
+            'change_log_candidate_update', f"UPDATE OF {', '.join(visible)}", 'candidates', 'candidate', 'upsert', 'new',
+            CANDIDATE_COLUMNS, when=changed_sql(visible)
+        ),
+        log_trigger_sql('change_log_candidate_delete', 'DELETE', 'candidates', 'candidate', 'delete', 'old', None),
+        log_trigger_sql('change_log_job_settings', 'INSERT', 'job_settings', 'job_settings', 'upsert', 'new', JOB_SETTINGS_COLUMNS),
+        log_trigger_sql('change_log_message', 'INSERT', 'messages', 'message', 'insert', 'new', MESSAGE_COLUMNS),
+    ]
+    for sql in triggers:
+        cursor.execute(sql)
+
+
+def latest_seq(conn):
+    """seq of the newest change, or 0 when the log is empty"""
+    return conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+
+
+def entity_version(conn, entities):
+    """Version of the data behind a read endpoint: the newest seq of its entities.
+
+    One index lookup per entity, used as the validator for conditional GETs.
+    Once pruning has removed every change of an entity, the seq just below
+    the oldest retained change stands in, so the version never goes back to
+    a value that was handed out for older data.
+    """
+    oldest = oldest_seq(conn)
+    floor = oldest - 1 if oldest else 0
+    return max(
+        max(conn.execute('SELECT MAX(seq) FROM change_log WHERE entity = ?', (entity,)).fetchone()[0] or 0, floor)
+        for entity in entities
+    )
+
+
+def oldest_seq(conn):
+    """seq of the oldest retained change, or None when the log is empty"""
+    return conn.execute('SELECT MIN(seq) FROM change_log').fetchone()[0]
+
+
+def changes_since(conn, since, limit=CHANGE_BATCH_SIZE):
+    """Changes after seq since, oldest first, as dicts with parsed data"""
+    rows = conn.execute('''
+        SELECT seq, entity, entity_id, action, data FROM change_log
+        WHERE seq > ? ORDER BY seq LIMIT ?
+    ''', (since, limit)).fetchall()
+    return [{
+        'seq': row['seq'],
+        'entity': row['entity'],
+        'id': row['entity_id'],
+        'action': row['action'],
+        'data': json.loads(row['data']) if row['data'] else None
+    } for row in rows]
+
+
+def is_expired(conn, since):
+    """True if changes after since have already been pruned, so a full reload is needed"""
+    oldest = oldest_seq(conn)
+    return oldest is not None and since < oldest - 1
+
+
+def prune(conn, keep=None):
+    """Drop all but the newest keep changes"""
+    keep = CHANGE_LOG_RETENTION if keep is None else keep
+    conn.execute('DELETE FROM change_log WHERE seq <= (SELECT MAX(seq) FROM change_log) - ?', (keep,))
+    conn.commit()
+
+
+def prune_periodically(conn):
+    """prune() at most once a minute per process, from whichever write comes first.
+
+    Called after writes (requests other than GET, message results), so the
+    log stays bounded however few dashboards are open. Skipped while conn
+    has a transaction open, since prune() commits.
+    """
+    global _last_prune
+    if conn.in_transaction:
+        return
+    with _prune_lock:
+        if time.monotonic() - _last_prune < CHANGE_PRUNE_INTERVAL_SECONDS:
+            return
+        _last_prune = time.monotonic()
+    prune(conn)
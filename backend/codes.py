@@ -0,0 +1,56 @@
+import os
+from datetime import datetime
+
+# Configuration
+CANDIDATE_CODE_DIGITS = int(os.getenv('CANDIDATE_CODE_DIGITS', '6'))
+
+# Multiplier of the counter permutation; it only has to share no factor
+# with 10**digits (i.e. be odd and not end in 5) for the mapping to be a bijection
+CODE_MULTIPLIER = 7654321
+
+
+def init_codes(cursor):
+    """Create the per-year counters that candidate codes are drawn from"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS code_sequences (
+            year INTEGER PRIMARY KEY,
+            next_value INTEGER NOT NULL
+        )
+    ''')
+
+
+def permute(counter, year, digits=None):
+    """Map the nth code of a year to a distinct, non-sequential number.
+
+    n -> (n * CODE_MULTIPLIER + offset) mod 10**digits is a bijection on
+    0..10**digits - 1, so codes never repeat within a year while
+    consecutive candidates still get unrelated-looking codes.
+    """
+    space = 10 ** (digits or CANDIDATE_CODE_DIGITS)
+    offset = (year * 2654435761) % space
+    return (counter * CODE_MULTIPLIER + offset) % space
+
+
+def allocate_codes(cursor, count, year=None):
+    """Take the next count candidate codes for the year, e.g. HR2025-408113.
+
+    The counter is bumped in the caller's transaction, so it rolls back
+    with a failed insert and concurrent writers are serialized by SQLite's
+    write lock: one statement for the whole block, no retries.
+    """
+    year = year or datetime.now().year
+    digits = CANDIDATE_CODE_DIGITS
+    end = cursor.execute('''
+        INSERT INTO code_sequences (year, next_value) VALUES (?, ?)
+        ON CONFLICT (year) DO UPDATE SET next_value = next_value + excluded.next_value
+        RETURNING next_value
+    ''', (year, count)).fetchone()[0]
+
+    if end > 10 ** digits:
+        raise ValueError(f'All {10 ** digits} candidate codes for {year} are used; raise CANDIDATE_CODE_DIGITS')
+    return [f'HR{year}-{permute(counter, year, digits):0{digits}d}' for counter in range(end - count, end)]
+
+
+def allocate_code(cursor, year=None):
+    """Take the next candidate code for the year"""
+    return allocate_codes(cursor, 1, year)[0]
@@ -0,0 +1,181 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from dotenv import load_dotenv
+from flask import g, has_app_context
+
+import metrics
+
+# Load environment variables before reading the pool configuration
+load_dotenv()
+
+# Configuration
+DATABASE = os.getenv('DATABASE_PATH', 'candidates.db')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
+DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))
+DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+DB_STATEMENT_CACHE = int(os.getenv('DB_STATEMENT_CACHE', '256'))
+
+# INSERT/UPDATE/DELETE ... RETURNING needs SQLite 3.35
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+_local = threading.local()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports the execution time of every statement to metrics"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            metrics.observe_query(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            metrics.observe_query(time.perf_counter() - start)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, including the execute() shortcuts, are instrumented"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect():
+    """Open a new tuned connection to the candidates database"""
+    # check_same_thread is off because pooled connections move between the
+    # request threads Werkzeug spawns; each one is only used by one thread at a time.
+    conn = sqlite3.connect(
+        DATABASE,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=DB_STATEMENT_CACHE,
+        factory=InstrumentedConnection if metrics.METRICS_ENABLED else sqlite3.Connection
+    )
+    conn.row_factory = sqlite3.Row
+
+    # WAL lets readers keep going while a writer commits; NORMAL sync is
+    # durable across application crashes and only skips the fsync per commit.
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KB}')
+    conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}')
+    return conn
+
+
+def acquire_connection():
+    """Take a connection from the pool, opening a new one if the pool is empty"""
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return connect()
+
+
+def release_connection(conn):
+    """Return a connection to the pool, closing it if the pool is full"""
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def get_db():
+    """Get the connection for the current request or background thread.
+
+    Inside a request the connection is checked out of the pool once and handed
+    back by close_db() on teardown. Outside a request (CLI commands, worker
+    threads) every thread keeps one long-lived connection of its own.
+    """
+    if has_app_context():
+        if 'db' not in g:
+            g.db = acquire_connection()
+        return g.db
+
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = connect()
+        _local.conn = conn
+    return conn
+
+
+def close_db(exception=None):
+    """Return the request's connection to the pool"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        release_connection(conn)
+
+
+def close_all():
+    """Close every idle pooled connection and this thread's own connection"""
+    while True:
+        try:
+            _pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def init_app(app):
+    """Register the pool teardown with the Flask app"""
+    app.teardown_appcontext(close_db)
+
+
+def add_column_if_missing(cursor, table, column, definition):
+    """Add a column to an existing table; CREATE TABLE IF NOT EXISTS won't"""
+    columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+    if column not in columns:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+
+def check_sqlite_version(version=sqlite3.sqlite_version_info):
+    """Refuse to start on an SQLite library too old for the queries we run"""
+    if version < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f'SQLite {".".join(map(str, MIN_SQLITE_VERSION))} or newer is required; '
+            f'Python is linked against {".".join(map(str, version))}'
+        )
+
+
+def schema_version(conn):
+    """Schema version recorded by the last completed migration, 0 if none"""
+    try:
+        row = conn.execute('SELECT version FROM schema_version WHERE id = 1').fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+def set_schema_version(cursor, version):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            migrated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('INSERT OR REPLACE INTO schema_version (id, version) VALUES (1, ?)', (version,))
@@ -0,0 +1,235 @@
+"""Normalized identity keys for spotting returning candidates.
+
+email_key, phone_key and name_key are computed once when a candidate is
+written and stored in indexed columns of candidates:
+
+- email_key: lower case, +tag dropped, dots dropped for Gmail addresses
+- phone_key: E.164 style, '+' and digits, with the default country code
+  added to national numbers ("098765 43210" and "+91 98765-43210" agree)
+- name_key: the sorted Soundex codes of the name's words, so spelling
+  variants and swapped first/last names agree
+
+The check on save is an index seek on email_key and phone_key. Finding
+duplicate clusters in the whole table groups rows by each key through its
+index and joins the groups with union-find, so no pair of rows is ever
+compared directly.
+"""
+import os
+import re
+import unicodedata
+
+from db import add_column_if_missing
+
+# Configuration
+DEFAULT_PHONE_COUNTRY_CODE = os.getenv('DEFAULT_PHONE_COUNTRY_CODE', '91')
+NATIONAL_NUMBER_DIGITS = int(os.getenv('NATIONAL_NUMBER_DIGITS', '10'))
+
+KEY_COLUMNS = ('email_key', 'phone_key', 'name_key')
+
+# Fields whose change means the keys must be recomputed
+KEYED_FIELDS = ('email', 'phone', 'name')
+
+# Providers that ignore dots in the local part, and their canonical domain
+DOTLESS_EMAIL_DOMAINS = {'gmail.com': 'gmail.com', 'googlemail.com': 'gmail.com'}
+
+SOUNDEX_CODES = {
+    letter: digit
+    for digit, letters in (('1', 'bfpv'), ('2', 'cgjkqsxz'), ('3', 'dt'), ('4', 'l'), ('5', 'mn'), ('6', 'r'))
+    for letter in letters
+}
+
+REBUILD_BATCH_SIZE = 5000
+
+# SQLite's default limit on bound parameters is 999
+ID_CHUNK_SIZE = 900
+
+
+def init_dedupe(cursor):
+    """Add the key columns and their indexes.
+
+    Returns True if the columns were added now and still need a backfill.
+    """
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(candidates)')}
+    for column in KEY_COLUMNS:
+        add_column_if_missing(cursor, 'candidates', column, 'TEXT')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_candidates_{column} ON candidates ({column})')
+    return 'email_key' not in columns
+
+
+def email_key(email):
+    email = (email or '').strip().lower()
+    if '@' not in email:
+        return email or None
+    local, domain = email.rsplit('@', 1)
+    local = local.split('+', 1)[0]
+    if domain in DOTLESS_EMAIL_DOMAINS:
+        local = local.replace('.', '')
+        domain = DOTLESS_EMAIL_DOMAINS[domain]
+    return f'{local}@{domain}'
+
+
+def phone_key(phone):
+    raw = (phone or '').strip()
+    digits = re.sub(r'\D', '', raw)
+    if not digits:
+        return None
+    if raw.startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    # A leading 0 is the national trunk prefix
+    digits = digits.lstrip('0')
+    if len(digits) == NATIONAL_NUMBER_DIGITS:
+        return f'+{DEFAULT_PHONE_COUNTRY_CODE}{digits}'
+    return '+' + digits
+
+
+def soundex(word):
+    """American Soundex code of one lower-case ASCII word, e.g. sharma -> S650"""
+    code = word[0].upper()
+    last = SOUNDEX_CODES.get(word[0])
+    for letter in word[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        if digit and digit != last:
+            code += digit
+        if letter not in 'hw':
+            last = digit
+    return (code + '000')[:4]
+
+
+def name_key(name):
+    ascii_name = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode().lower()
+    # Initials are left out; "Priya S." and "Priya" share a key with each other, not with "Priya Sharma"
+    codes = sorted({soundex(word) for word in re.findall(r'[a-z]+', ascii_name) if len(word) > 1})
+    return ' '.join(codes) or None
+
+
+def candidate_keys(email, phone, name):
+    """(email_key, phone_key, name_key) of one candidate"""
+    return email_key(email), phone_key(phone), name_key(name)
+
+
+def find_duplicate(cursor, email, phone, exclude_id=None):
+    """An existing candidate with the same email or phone key, or None.
+
+    Returns (row, reason) where reason is 'email' or 'phone'. Two index
+    seeks, one per key.
+    """
+    keys = {'email': email_key(email), 'phone': phone_key(phone)}
+    for reason, key in keys.items():
+        if not key:
+            continue
+        row = cursor.execute(
+            f'SELECT id, code, name, email, phone FROM candidates WHERE {reason}_key = ? AND id IS NOT ? LIMIT 1',
+            (key, exclude_id)
+        ).fetchone()
+        if row:
+            return row, reason
+    return None
+
+
+def duplicate_error(row, reason, email, phone):
+    """Error message for a save rejected as a duplicate"""
+    if reason == 'email':
+        return f'Candidate with email {email} is already registered ({row["code"]})'
+    return f'Candidate with phone {phone} is already registered ({row["code"]})'
+
+
+def update_keys(cursor, candidate_ids):
+    """Recompute the keys of candidates whose name, email or phone changed"""
+    for start in range(0, len(candidate_ids), ID_CHUNK_SIZE):
+        chunk = candidate_ids[start:start + ID_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        rows = cursor.execute(f'SELECT id, email, phone, name FROM candidates WHERE id IN ({placeholders})', chunk).fetchall()
+        cursor.executemany(
+            'UPDATE candidates SET email_key = ?, phone_key = ?, name_key = ? WHERE id = ?',
+            [candidate_keys(row['email'], row['phone'], row['name']) + (row['id'],) for row in rows]
+        )
+
+
+def rebuild_keys(conn, only_missing=False, commit=True):
+    """Recompute the keys of every candidate (or only those without keys) in batches.
+
+    Each batch is committed on its own unless commit=False, which leaves
+    the whole rebuild to the caller's transaction.
+    """
+    condition = 'AND email_key IS NULL' if only_missing else ''
+    last_id = 0
+    updated = 0
+    while True:
+        rows = conn.execute(f'''
+            SELECT id, email, phone, name FROM candidates WHERE id > ? {condition} ORDER BY id LIMIT ?
+        ''', (last_id, REBUILD_BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            'UPDATE candidates SET email_key = ?, phone_key = ?, name_key = ? WHERE id = ?',
+            [candidate_keys(row['email'], row['phone'], row['name']) + (row['id'],) for row in rows]
+        )
+        if commit:
+            conn.commit()
+        last_id = rows[-1]['id']
+        updated += len(rows)
+    return updated
+
+
+class UnionFind:
+    """Disjoint sets of candidate ids with path halving and union by size"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        while parent != item:
+            grandparent = self.parent[parent]
+            self.parent[item] = grandparent
+            item, parent = parent, grandparent
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size.get(a, 1) < self.size.get(b, 1):
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] = self.size.get(a, 1) + self.size.get(b, 1)
+
+
+def find_clusters(conn, use_names=True, limit=None):
+    """Groups of candidates that are probably the same person, largest first.
+
+    Rows sharing an email key or a phone key are linked, and so are rows
+    sharing a name key and a date of birth when use_names is set. Each key
+    is grouped through its index (O(n log n) overall), and the groups are
+    merged with union-find, so A-B by email and B-C by phone end up in one
+    cluster. Returns [{'ids': [...], 'reasons': [...]}].
+    """
+    groupings = [('email', 'email_key', 'email_key IS NOT NULL'), ('phone', 'phone_key', 'phone_key IS NOT NULL')]
+    if use_names:
+        groupings.append(('name_dob', 'name_key, dob', "name_key IS NOT NULL AND coalesce(dob, '') != ''"))
+
+    sets = UnionFind()
+    links = []
+    for reason, columns, condition in groupings:
+        for (ids,) in conn.execute(f'''
+            SELECT group_concat(id) FROM candidates WHERE {condition}
+            GROUP BY {columns} HAVING COUNT(*) > 1
+        '''):
+            ids = [int(candidate_id) for candidate_id in ids.split(',')]
+            for other in ids[1:]:
+                sets.union(ids[0], other)
+            links.append((ids[0], reason))
+
+    clusters = {}
+    for candidate_id in list(sets.parent):
+        clusters.setdefault(sets.find(candidate_id), {'ids': [], 'reasons': set()})['ids'].append(candidate_id)
+    for candidate_id, reason in links:
+        clusters[sets.find(candidate_id)]['reasons'].add(reason)
+
+    result = sorted(clusters.values(), key=lambda cluster: (-len(cluster['ids']), min(cluster['ids'])))
+    if limit:
+        result = result[:limit]
+    return [{'ids': sorted(cluster['ids']), 'reasons': sorted(cluster['reasons'])} for cluster in result]
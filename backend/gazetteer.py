@@ -0,0 +1,153 @@
+"""Default dictionaries for resume field extraction.
+
+Extend them without code changes through RESUME_LOCATIONS_FILE (one place
+per line) and RESUME_SKILLS_FILE (one skill per line, optionally followed by
+a colon and comma-separated aliases, e.g. "JavaScript: ecmascript, es6").
+"""
+
+# Indian cities and metro areas, then common international hiring locations.
+# Alternate spellings map to the same canonical name in LOCATION_ALIASES.
+LOCATIONS = [
+    'Mumbai', 'Delhi', 'New Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune',
+    'Ahmedabad', 'Surat', 'Jaipur', 'Lucknow', 'Kanpur', 'Nagpur', 'Indore', 'Thane',
+    'Bhopal', 'Visakhapatnam', 'Patna', 'Vadodara', 'Ghaziabad', 'Ludhiana', 'Agra',
+    'Nashik', 'Faridabad', 'Meerut', 'Rajkot', 'Varanasi', 'Srinagar', 'Aurangabad',
+    'Dhanbad', 'Amritsar', 'Navi Mumbai', 'Allahabad', 'Ranchi', 'Howrah', 'Coimbatore',
+    'Jabalpur', 'Gwalior', 'Vijayawada', 'Jodhpur', 'Madurai', 'Raipur', 'Kota',
+    'Guwahati', 'Chandigarh', 'Solapur', 'Hubli', 'Mysore', 'Tiruchirappalli', 'Bareilly',
+    'Aligarh', 'Tiruppur', 'Gurgaon', 'Noida', 'Greater Noida', 'Moradabad', 'Jalandhar',
+    'Bhubaneswar', 'Salem', 'Warangal', 'Thiruvananthapuram', 'Kochi', 'Dehradun',
+    'Mangalore', 'Udaipur', 'Goa', 'Panaji', 'Shimla', 'Jammu', 'Puducherry', 'Nellore',
+    'Belgaum', 'Ajmer', 'Gandhinagar', 'Siliguri', 'Jamshedpur', 'Cuttack', 'Kozhikode',
+    'Thrissur', 'Vellore', 'Manipal', 'Mohali', 'Secunderabad',
+    'Singapore', 'Dubai', 'Abu Dhabi', 'London', 'New York', 'San Francisco', 'Seattle',
+    'Toronto', 'Sydney', 'Melbourne', 'Berlin', 'Amsterdam', 'Tokyo', 'Hong Kong'
+]
+
+LOCATION_ALIASES = {
+    'bengaluru': 'Bangalore',
+    'bombay': 'Mumbai',
+    'madras': 'Chennai',
+    'calcutta': 'Kolkata',
+    'gurugram': 'Gurgaon',
+    'poona': 'Pune',
+    'mysuru': 'Mysore',
+    'prayagraj': 'Allahabad',
+    'trivandrum': 'Thiruvananthapuram',
+    'cochin': 'Kochi',
+    'mangaluru': 'Mangalore',
+    'vizag': 'Visakhapatnam',
+    'baroda': 'Vadodara',
+    'belagavi': 'Belgaum',
+    'calicut': 'Kozhikode',
+    'ncr': 'Delhi',
+}
+
+# Canonical skill name -> aliases that should be reported under that name.
+# Purely alphabetic terms shorter than three letters (Go, R, C) are too
+# ambiguous to match and are only found through their aliases.
+SKILLS = {
+    'Python': ['python3'],
+    'Java': [],
+    'JavaScript': ['ecmascript'],
+    'TypeScript': [],
+    'C++': ['cpp'],
+    'C#': ['csharp', 'c sharp'],
+    'Go': ['golang'],
+    'Rust': [],
+    'Ruby': [],
+    'PHP': [],
+    'Kotlin': [],
+    'Swift': [],
+    'Scala': [],
+    'MATLAB': [],
+    'Perl': [],
+    'Dart': [],
+    'SQL': [],
+    'HTML': ['html5'],
+    'CSS': ['css3'],
+    'React': ['react.js', 'reactjs'],
+    'Angular': ['angularjs', 'angular.js'],
+    'Vue': ['vue.js', 'vuejs'],
+    'Node.js': ['nodejs', 'node'],
+    'Express': ['express.js', 'expressjs'],
+    'Next.js': ['nextjs'],
+    'Django': [],
+    'Flask': [],
+    'FastAPI': [],
+    'Spring': ['spring boot', 'springboot'],
+    '.NET': ['dotnet', 'asp.net'],
+    'Laravel': [],
+    'Rails': ['ruby on rails'],
+    'jQuery': [],
+    'Bootstrap': [],
+    'Tailwind': ['tailwindcss', 'tailwind css'],
+    'Redux': [],
+    'GraphQL': [],
+    'REST': ['rest api', 'restful'],
+    'MySQL': [],
+    'PostgreSQL': ['postgres'],
+    'SQLite': [],
+    'MongoDB': ['mongo'],
+    'Redis': [],
+    'Oracle': [],
+    'SQL Server': ['mssql'],
+    'Elasticsearch': [],
+    'Cassandra': [],
+    'DynamoDB': [],
+    'Firebase': [],
+    'AWS': ['amazon web services'],
+    'Azure': [],
+    'GCP': ['google cloud'],
+    'Docker': [],
+    'Kubernetes': ['k8s'],
+    'Terraform': [],
+    'Ansible': [],
+    'Jenkins': [],
+    'Git': ['github', 'gitlab'],
+    'CI/CD': ['ci cd'],
+    'Linux': ['unix'],
+    'Bash': ['shell scripting'],
+    'Kafka': [],
+    'RabbitMQ': [],
+    'Spark': ['pyspark', 'apache spark'],
+    'Hadoop': [],
+    'Airflow': [],
+    'Pandas': [],
+    'NumPy': [],
+    'scikit-learn': ['sklearn'],
+    'TensorFlow': [],
+    'PyTorch': [],
+    'Keras': [],
+    'Machine Learning': [],
+    'Deep Learning': [],
+    'NLP': ['natural language processing'],
+    'Computer Vision': [],
+    'Data Analysis': ['data analytics'],
+    'Power BI': ['powerbi'],
+    'Tableau': [],
+    'Excel': ['ms excel', 'microsoft excel'],
+    'Android': [],
+    'iOS': [],
+    'Flutter': [],
+    'React Native': [],
+    'Selenium': [],
+    'Jest': [],
+    'Pytest': [],
+    'JUnit': [],
+    'Figma': [],
+    'Photoshop': [],
+    'SAP': [],
+    'Salesforce': [],
+    'Tally': [],
+    'Agile': ['scrum'],
+    'JIRA': [],
+    'Microservices': [],
+    'Communication': ['communication skills'],
+    'Leadership': [],
+    'Sales': [],
+    'Marketing': ['digital marketing'],
+    'SEO': [],
+    'Recruitment': ['talent acquisition'],
+    'Customer Service': ['customer support'],
+}
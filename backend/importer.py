@@ -0,0 +1,202 @@
+import csv
+import io
+import os
+from datetime import datetime
+
+import codes
+import dedupe
+import matching
+
+# Configuration
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+MAX_IMPORT_ERRORS = int(os.getenv('MAX_IMPORT_ERRORS', '1000'))
+
+# SQLite's default limit on bound parameters is 999
+ID_CHUNK_SIZE = 900
+
+IMPORT_FIELDS = ('date', 'name', 'phone', 'email', 'dob', 'location', 'skills', 'experience', 'status')
+MANDATORY_FIELDS = ('email', 'phone', 'location')
+
+# Column headers other systems use for our fields
+HEADER_ALIASES = {
+    'e_mail': 'email',
+    'email_address': 'email',
+    'mobile': 'phone',
+    'phone_number': 'phone',
+    'mobile_number': 'phone',
+    'contact_number': 'phone',
+    'city': 'location',
+    'current_location': 'location',
+    'full_name': 'name',
+    'candidate_name': 'name',
+    'date_of_birth': 'dob',
+    'key_skills': 'skills',
+    'total_experience': 'experience',
+    'applied_on': 'date',
+}
+
+
+def normalize_header(header):
+    """Map a spreadsheet column header to a candidate field name (or None)"""
+    key = str(header or '').strip().lower().replace('-', '_').replace(' ', '_')
+    key = HEADER_ALIASES.get(key, key)
+    return key if key in IMPORT_FIELDS else None
+
+
+def read_csv_rows(stream):
+    """Yield one dict per CSV data row, streaming from a binary file object"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    headers = [normalize_header(header) for header in next(reader, [])]
+    for values in reader:
+        yield {field: value for field, value in zip(headers, values) if field}
+
+
+def read_xlsx_rows(stream):
+    """Yield one dict per row of the first worksheet.
+
+    openpyxl is only needed for XLSX imports, so it is imported here.
+    """
+    try:
+        import openpyxl
+    except ImportError:
+        raise ValueError('XLSX import needs openpyxl: pip install openpyxl')
+
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [normalize_header(header) for header in next(rows, ())]
+        for values in rows:
+            yield {field: '' if value is None else str(value) for field, value in zip(headers, values) if field}
+    finally:
+        workbook.close()
+
+
+def read_rows(filename, stream):
+    """Pick the reader for a .csv or .xlsx upload"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'csv':
+        return read_csv_rows(stream)
+    if extension == 'xlsx':
+        return read_xlsx_rows(stream)
+    raise ValueError('Only .csv and .xlsx files can be imported')
+
+
+class ImportReport:
+    """Counts and per-row errors of one import; keeps the first MAX_IMPORT_ERRORS errors"""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row, message):
+        self.failed += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            self.errors.append({'row': row, 'error': message})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
+
+
+def existing_keys(cursor, column, keys):
+    """The subset of email or phone keys already registered, in a few IN queries"""
+    keys = [key for key in keys if key]
+    found = set()
+    for start in range(0, len(keys), ID_CHUNK_SIZE):
+        chunk = keys[start:start + ID_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        found.update(row[0] for row in cursor.execute(f'SELECT {column} FROM candidates WHERE {column} IN ({placeholders})', chunk))
+    return found
+
+
+def insert_chunk(conn, chunk, seen, report):
+    """Validate, deduplicate and insert one chunk of (row number, row) in one transaction.
+
+    Rows are matched on the normalized email and phone keys, against the
+    table and against earlier rows of the file.
+    """
+    cursor = conn.cursor()
+    valid = []
+    for number, row in chunk:
+        row = {field: (row.get(field) or '').strip() for field in IMPORT_FIELDS}
+        missing = [field.capitalize() for field in MANDATORY_FIELDS if not row[field]]
+        if missing:
+            report.error(number, f'Missing mandatory fields: {", ".join(missing)}')
+            continue
+        row['email_key'], row['phone_key'], row['name_key'] = dedupe.candidate_keys(row['email'], row['phone'], row['name'])
+        # A value with no key (e.g. phone "N/A") matches nothing, as on save
+        keys = {(kind, row[f'{kind}_key']) for kind in ('email', 'phone') if row[f'{kind}_key']}
+        if ('email', row['email_key']) in keys & seen:
+            report.error(number, f'Duplicate email {row["email"]} in file')
+        elif ('phone', row['phone_key']) in keys & seen:
+            report.error(number, f'Duplicate phone {row["phone"]} in file')
+        else:
+            seen.update(keys)
+            valid.append((number, row))
+
+    registered_emails = existing_keys(cursor, 'email_key', [row['email_key'] for _, row in valid])
+    registered_phones = existing_keys(cursor, 'phone_key', [row['phone_key'] for _, row in valid])
+    rows = []
+    for number, row in valid:
+        if row['email_key'] in registered_emails:
+            report.error(number, f'Candidate with email {row["email"]} is already registered')
+        elif row['phone_key'] in registered_phones:
+            report.error(number, f'Candidate with phone {row["phone"]} is already registered')
+        else:
+            rows.append(row)
+    if not rows:
+        return
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    for row, code in zip(rows, codes.allocate_codes(cursor, len(rows))):
+        row['code'] = code
+        row['date'] = row['date'] or today
+        row['status'] = row['status'] or 'New'
+    cursor.executemany('''
+        INSERT INTO candidates (date, name, phone, email, dob, location, skills, experience, code, status,
+                                email_key, phone_key, name_key)
+        VALUES (:date, :name, :phone, :email, :dob, :location, :skills, :experience, :code, :status,
+                :email_key, :phone_key, :name_key)
+    ''', rows)
+
+    # executemany can't return the new ids; codes are unique, so look them up
+    ids = {}
+    code_list = [row['code'] for row in rows]
+    for start in range(0, len(code_list), ID_CHUNK_SIZE):
+        part = code_list[start:start + ID_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(part))
+        ids.update(cursor.execute(f'SELECT code, id FROM candidates WHERE code IN ({placeholders})', part).fetchall())
+    matching.index_new_candidates(
+        cursor, [(ids[row['code']], row['skills'], row['experience'], row['location']) for row in rows]
+    )
+
+    conn.commit()
+    report.imported += len(rows)
+
+
+def import_candidates(conn, rows, chunk_size=None):
+    """Insert candidate rows in chunked transactions and report per-row errors.
+
+    rows is any iterable of dicts (see read_rows), consumed as a stream.
+    Row numbers in the report count the header as row 1, as spreadsheets
+    do. Each chunk is committed on its own, so a failure part way through
+    keeps the chunks before it.
+    """
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+    report = ImportReport()
+    seen = set()
+    chunk = []
+    for number, row in enumerate(rows, start=2):
+        chunk.append((number, row))
+        if len(chunk) >= chunk_size:
+            insert_chunk(conn, chunk, seen, report)
+            chunk = []
+    if chunk:
+        insert_chunk(conn, chunk, seen, report)
+    return report.to_dict()
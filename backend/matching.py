@@ -0,0 +1,222 @@
+import math
+import os
+import re
+
+from resume_parser import GAZETTEER
+
+# Configuration
+MATCH_LOCATION_WEIGHT = float(os.getenv('MATCH_LOCATION_WEIGHT', '0.25'))
+MATCH_REBUILD_BATCH = 2000
+
+SKILL_SEPARATORS_RE = re.compile(r'[,;|/\n]+')
+MAX_TERM_LENGTH = 40
+LOCATION_PREFIX = 'location:'
+
+
+def init_matching(cursor):
+    """Create the sparse vector tables used for job matching.
+
+    candidate_terms is an inverted index: one row per (term, candidate)
+    clustered by term, so scoring a job only reads the posting lists of its
+    own terms. job_terms holds the current job's terms. Returns True if the
+    candidate vectors were created now and still need a rebuild.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidate_terms'"
+    ).fetchone()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_terms (
+            term TEXT NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            weight REAL NOT NULL,
+            PRIMARY KEY (term, candidate_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_candidate_terms_candidate ON candidate_terms (candidate_id)')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS candidate_terms_delete AFTER DELETE ON candidates BEGIN
+            DELETE FROM candidate_terms WHERE candidate_id = old.id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_terms (
+            term TEXT PRIMARY KEY,
+            label TEXT NOT NULL
+        )
+    ''')
+
+    return not exists
+
+
+def skill_terms(skills, experience=''):
+    """Canonical skill names from a skills list and free-text experience.
+
+    Known skills and their aliases map to one name (python3 -> Python);
+    listed skills the dictionary doesn't know are kept as written.
+    Returns {term key: label}.
+    """
+    terms = {}
+    for piece in SKILL_SEPARATORS_RE.split(skills or ''):
+        piece = piece.strip()
+        if not piece:
+            continue
+        known = GAZETTEER.scan(piece.lower())['skills']
+        if known:
+            for name in known:
+                terms.setdefault(name.lower(), name)
+        elif len(piece) <= MAX_TERM_LENGTH:
+            terms.setdefault(piece.lower(), piece)
+
+    for name in GAZETTEER.scan((experience or '').lower())['skills']:
+        terms.setdefault(name.lower(), name)
+    return terms
+
+
+def location_term(location):
+    """Term for a location, using the canonical city name when it's known"""
+    location = (location or '').strip()
+    if not location:
+        return None, None
+    known = GAZETTEER.scan(location.lower())['location']
+    label = known[0] if known else location
+    return LOCATION_PREFIX + label.lower(), label
+
+
+def candidate_vector(skills, experience, location):
+    """Sparse vector for one candidate as [(term, weight)].
+
+    Skills are binary features scaled to unit length, so a long skills list
+    doesn't outscore a focused one; the location is a separate feature of
+    weight 1 that the job side scales by MATCH_LOCATION_WEIGHT.
+    """
+    terms = skill_terms(skills, experience)
+    vector = []
+    if terms:
+        weight = 1 / math.sqrt(len(terms))
+        vector = [(term, weight) for term in terms]
+    term, _ = location_term(location)
+    if term:
+        vector.append((term, 1.0))
+    return vector
+
+
+def index_candidate(cursor, candidate_id, skills, experience, location):
+    """Replace one candidate's vector; runs in the caller's transaction"""
+    cursor.execute('DELETE FROM candidate_terms WHERE candidate_id = ?', (candidate_id,))
+    cursor.executemany(
+        'INSERT INTO candidate_terms (term, candidate_id, weight) VALUES (?, ?, ?)',
+        [(term, candidate_id, weight) for term, weight in candidate_vector(skills, experience, location)]
+    )
+
+
+def index_new_candidates(cursor, rows):
+    """Add vectors for newly inserted candidates: [(id, skills, experience, location)]"""
+    cursor.executemany(
+        'INSERT INTO candidate_terms (term, candidate_id, weight) VALUES (?, ?, ?)',
+        [(term, candidate_id, weight)
+         for candidate_id, skills, experience, location in rows
+         for term, weight in candidate_vector(skills, experience, location)]
+    )
+
+
+def rebuild_index(conn, commit=True):
+    """Recompute every candidate vector from the candidates table; commit=False leaves it to the caller's transaction"""
+    conn.execute('DELETE FROM candidate_terms')
+    last_id = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, skills, experience, location FROM candidates
+            WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, MATCH_REBUILD_BATCH)).fetchall()
+        if not rows:
+            break
+        index_new_candidates(conn, rows)
+        last_id = rows[-1]['id']
+    if commit:
+        conn.commit()
+
+
+def update_job_vector(cursor, requirements, location):
+    """Store the terms of the job's requirements and location.
+
+    Called when job settings change; candidate vectors are left alone.
+    """
+    terms = skill_terms(requirements)
+    term, label = location_term(location)
+    if term:
+        terms[term] = label
+    cursor.execute('DELETE FROM job_terms')
+    cursor.executemany('INSERT INTO job_terms (term, label) VALUES (?, ?)', list(terms.items()))
+
+
+def job_weights(conn):
+    """IDF-weighted, unit-length job vector as {term: (label, weight)}.
+
+    IDF comes from the posting list sizes at query time, so it stays
+    current as candidates are added without touching their vectors.
+    """
+    total = conn.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+    rows = conn.execute('''
+        SELECT j.term, j.label,
+               (SELECT COUNT(*) FROM candidate_terms t WHERE t.term = j.term) AS df
+        FROM job_terms j
+    ''').fetchall()
+
+    weights = {}
+    for row in rows:
+        if row['term'].startswith(LOCATION_PREFIX):
+            continue
+        weights[row['term']] = (row['label'], math.log((1 + total) / (1 + row['df'])) + 1)
+    norm = math.sqrt(sum(weight * weight for _, weight in weights.values())) or 1
+    weights = {term: (label, weight / norm) for term, (label, weight) in weights.items()}
+
+    for row in rows:
+        if row['term'].startswith(LOCATION_PREFIX):
+            weights[row['term']] = (row['label'], MATCH_LOCATION_WEIGHT)
+    return weights
+
+
+def rank_candidates(conn, columns, limit=50, min_score=0.0):
+    """Score every candidate against the job in one query, best first.
+
+    The score is the dot product of the job and candidate vectors: the
+    cosine similarity of their skills plus the location bonus. Only
+    candidates sharing at least one term with the job are scored.
+    """
+    weights = job_weights(conn)
+    if not weights:
+        return []
+
+    values = ', '.join('(?, ?)' for _ in weights)
+    params = [value for term, (_, weight) in weights.items() for value in (term, weight)]
+    selected = ', '.join(f'c.{column}' for column in columns)
+    rows = conn.execute(f'''
+        WITH job (term, weight) AS (VALUES {values}),
+        scores AS (
+            SELECT t.candidate_id, SUM(t.weight * job.weight) AS score
+            FROM job JOIN candidate_terms t ON t.term = job.term
+            GROUP BY t.candidate_id
+            HAVING score >= ?
+            ORDER BY score DESC, t.candidate_id DESC
+            LIMIT ?
+        )
+        SELECT {selected}, scores.score
+        FROM scores JOIN candidates c ON c.id = scores.candidate_id
+        ORDER BY scores.score DESC, c.id DESC
+    ''', params + [min_score, limit]).fetchall()
+    if not rows:
+        return []
+
+    # Which job terms each shortlisted candidate matched; looked up only for
+    # the shortlist rather than concatenated for every scored candidate
+    ids = [row['id'] for row in rows]
+    matched = {}
+    for term_row in conn.execute(f'''
+        SELECT candidate_id, term FROM candidate_terms
+        WHERE candidate_id IN ({', '.join('?' for _ in ids)})
+    ''', ids):
+        if term_row['term'] in weights:
+            matched.setdefault(term_row['candidate_id'], []).append(weights[term_row['term']][0])
+    return [(row, matched.get(row['id'], [])) for row in rows]
@@ -0,0 +1,626 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import changes
+import metrics
+from db import add_column_if_missing, get_db
+
+# Configuration
+MESSAGE_WORKERS_ENABLED = os.getenv('MESSAGE_WORKERS_ENABLED', '1') == '1'
+MESSAGE_MAX_ATTEMPTS = int(os.getenv('MESSAGE_MAX_ATTEMPTS', '5'))
+MESSAGE_RETRY_BACKOFF_SECONDS = float(os.getenv('MESSAGE_RETRY_BACKOFF_SECONDS', '2'))
+MESSAGE_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv('MESSAGE_RETRY_BACKOFF_MAX_SECONDS', '300'))
+MESSAGE_POLL_INTERVAL_SECONDS = float(os.getenv('MESSAGE_POLL_INTERVAL_SECONDS', '1'))
+MESSAGE_LEASE_SECONDS = float(os.getenv('MESSAGE_LEASE_SECONDS', '60'))
+CHANNEL_CONCURRENCY = {
+    'email': int(os.getenv('MESSAGE_EMAIL_CONCURRENCY', '8')),
+    'sms': int(os.getenv('MESSAGE_SMS_CONCURRENCY', '4'))
+}
+
+# ============= MESSAGE LOG =============
+
+LEGACY_LOG_FILE = 'sent_messages.log'
+
+def init_message_log(cursor):
+    """Create the append-only log of simulated messages"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            message TEXT,
+            sent_at TEXT NOT NULL
+        )
+    ''')
+
+def log_message(message_type, recipient, subject, message, sent_at=None):
+    """Append one sent message to the log"""
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO messages (type, recipient, subject, message, sent_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (message_type, recipient, subject, message, sent_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+    conn.commit()
+
+def get_messages(limit, before=None):
+    """Read one page of the log newest first.
+
+    before is the id of the last message on the previous page. Returns the
+    messages and the id to pass as before for the next page (None at the end).
+    """
+    params = []
+    where = ''
+    if before is not None:
+        where = 'WHERE id < ?'
+        params.append(before)
+    params.append(limit + 1)
+    rows = get_db().execute(f'''
+        SELECT id, type, recipient, subject, message, sent_at FROM messages
+        {where} ORDER BY id DESC LIMIT ?
+    ''', params).fetchall()
+
+    next_before = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_before = rows[-1]['id']
+
+    messages = []
+    for row in rows:
+        msg = {
+            'id': row['id'],
+            'type': row['type'],
+            'timestamp': row['sent_at'],
+            'to': row['recipient'],
+            'message': row['message'] or ''
+        }
+        if row['subject'] is not None:
+            msg['subject'] = row['subject']
+        messages.append(msg)
+    return messages, next_before
+
+def parse_legacy_log(lines):
+    """Yield (type, recipient, subject, message, sent_at) from sent_messages.log lines"""
+    separator = '=' * 60
+    block = []
+    for line in lines:
+        if line.rstrip('\n') == separator:
+            if block:
+                entry = parse_legacy_block(block)
+                if entry:
+                    yield entry
+            block = []
+        else:
+            block.append(line.rstrip('\n'))
+    if block:
+        entry = parse_legacy_block(block)
+        if entry:
+            yield entry
+
+def parse_legacy_block(lines):
+    """Parse one EMAIL/SMS block of the old text log, or return None"""
+    message_type = sent_at = recipient = subject = None
+    for index, raw in enumerate(lines):
+        line = raw.strip()
+        if line.startswith('EMAIL -') or line.startswith('SMS -'):
+            message_type = 'email' if line.startswith('EMAIL') else 'sms'
+            sent_at = line.split(' - ', 1)[1] if ' - ' in line else ''
+        elif line.startswith('To:'):
+            recipient = line[len('To:'):].strip()
+        elif line.startswith('Subject:'):
+            subject = line[len('Subject:'):].strip()
+        elif line.startswith('Message:'):
+            # Email bodies start on the next line, SMS bodies on the same one
+            body = [line[len('Message:'):].strip()] + lines[index + 1:]
+            message = '\n'.join(body).strip()
+            if message_type and recipient:
+                return (message_type, recipient, subject, message, sent_at)
+            return None
+    return None
+
+def import_legacy_log(path=LEGACY_LOG_FILE, batch_size=1000):
+    """Copy an old sent_messages.log into the messages table, oldest first.
+
+    The file is streamed, never loaded whole, and renamed to *.imported
+    afterwards so running the import twice cannot duplicate messages.
+    Returns the number of messages imported.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    conn = get_db()
+    imported = 0
+    batch = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for entry in parse_legacy_log(f):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                conn.executemany('''
+                    INSERT INTO messages (type, recipient, subject, message, sent_at) VALUES (?, ?, ?, ?, ?)
+                ''', batch)
+                imported += len(batch)
+                batch = []
+    if batch:
+        conn.executemany('''
+            INSERT INTO messages (type, recipient, subject, message, sent_at) VALUES (?, ?, ?, ?, ?)
+        ''', batch)
+        imported += len(batch)
+    conn.commit()
+
+    os.replace(path, path + '.imported')
+    return imported
+
+# ============= SIMULATED TRANSPORTS =============
+
+# Simulated provider round trip per channel
+SIMULATED_SEND_SECONDS = {'email': 0.5, 'sms': 0.3}
+
+def record_simulated_email(to_email, subject, message):
+    """Print and log an email once the simulated provider has accepted it"""
+    print(f"\n{'='*60}")
+    print(f"📧 SIMULATED EMAIL SENT")
+    print(f"{'='*60}")
+    print(f"To: {to_email}")
+    print(f"Subject: {subject}")
+    print(f"Message:\n{message}")
+    print(f"{'='*60}\n")
+    
+    try:
+        log_message('email', to_email, subject, message)
+    except Exception as e:
+        print(f"❌ Message log error: {e}")
+    
+    return {
+        'success': True,
+        'demo_mode': True,
+        'message': 'Email simulated successfully'
+    }
+
+def record_simulated_sms(to_phone, message):
+    """Print and log an SMS once the simulated provider has accepted it"""
+    print(f"\n{'='*60}")
+    print(f"📱 SIMULATED SMS SENT")
+    print(f"{'='*60}")
+    print(f"To: {to_phone}")
+    print(f"Message: {message}")
+    print(f"{'='*60}\n")
+    
+    try:
+        log_message('sms', to_phone, None, message)
+    except Exception as e:
+        print(f"❌ Message log error: {e}")
+    
+    return {
+        'success': True,
+        'demo_mode': True,
+        'message': 'SMS simulated successfully',
+        'sid': f'DEMO_{datetime.now().strftime("%Y%m%d%H%M%S")}'
+    }
+
+@metrics.timed_send('email')
+def send_gmail(to_email, subject, message):
+    """Simulated email sending - DEMO MODE"""
+    try:
+        time.sleep(SIMULATED_SEND_SECONDS['email'])
+        return record_simulated_email(to_email, subject, message)
+    except Exception as e:
+        print(f"❌ Simulation error: {e}")
+        return {'success': False, 'error': str(e)}
+
+@metrics.timed_send('sms')
+def send_sms(to_phone, message):
+    """Simulated SMS sending - DEMO MODE"""
+    try:
+        time.sleep(SIMULATED_SEND_SECONDS['sms'])
+        return record_simulated_sms(to_phone, message)
+    except Exception as e:
+        print(f"❌ Simulation error: {e}")
+        return {'success': False, 'error': str(e)}
+
+@metrics.timed_send('email')
+async def send_gmail_async(to_email, subject, message, executor=None):
+    """send_gmail for the asyncio worker; waiting on the provider holds no thread"""
+    try:
+        await asyncio.sleep(SIMULATED_SEND_SECONDS['email'])
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, record_simulated_email, to_email, subject, message
+        )
+    except Exception as e:
+        print(f"❌ Simulation error: {e}")
+        return {'success': False, 'error': str(e)}
+
+@metrics.timed_send('sms')
+async def send_sms_async(to_phone, message, executor=None):
+    """send_sms for the asyncio worker; waiting on the provider holds no thread"""
+    try:
+        await asyncio.sleep(SIMULATED_SEND_SECONDS['sms'])
+        return await asyncio.get_running_loop().run_in_executor(executor, record_simulated_sms, to_phone, message)
+    except Exception as e:
+        print(f"❌ Simulation error: {e}")
+        return {'success': False, 'error': str(e)}
+
+# Local stand-in transports, one per channel. Each takes a job row and
+# returns the sender's result dict.
+TRANSPORTS = {
+    'email': lambda job: send_gmail(job['recipient'], job['subject'], job['message']),
+    'sms': lambda job: send_sms(job['recipient'], job['message'])
+}
+
+# The same for the asyncio worker; the executor runs their database writes
+ASYNC_TRANSPORTS = {
+    'email': lambda job, executor: send_gmail_async(job['recipient'], job['subject'], job['message'], executor),
+    'sms': lambda job, executor: send_sms_async(job['recipient'], job['message'], executor)
+}
+
+# ============= OUTBOUND QUEUE =============
+
+def init_queue(cursor):
+    """Create the outbound jobs table"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS message_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_id INTEGER,
+            channel TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            result TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_message_jobs_due
+        ON message_jobs (status, channel, next_attempt_at)
+    ''')
+    
+    # Jobs queued together by /api/send-bulk share a campaign id
+    add_column_if_missing(cursor, 'message_jobs', 'campaign_id', 'TEXT')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_message_jobs_campaign ON message_jobs (campaign_id, status)')
+
+def enqueue_messages(conn, jobs):
+    """Insert outbound jobs without committing and return their ids.
+
+    Each job is a dict with candidate_id, channel, recipient, subject and
+    message. The caller commits, so jobs can be queued in the same
+    transaction as the write that triggered them.
+    """
+    now = time.time()
+    ids = []
+    for job in jobs:
+        if job['channel'] not in TRANSPORTS:
+            raise ValueError(f"Unknown channel: {job['channel']}")
+        cursor = conn.execute('''
+            INSERT INTO message_jobs (candidate_id, channel, recipient, subject, message, max_attempts, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            job.get('candidate_id'),
+            job['channel'],
+            job['recipient'],
+            job.get('subject'),
+            job['message'],
+            MESSAGE_MAX_ATTEMPTS,
+            now
+        ))
+        ids.append(cursor.lastrowid)
+    return ids
+
+def enqueue_campaign(conn, jobs):
+    """Insert many outbound jobs with one executemany, without committing.
+
+    Returns the campaign id the jobs were grouped under; use
+    campaign_status() to follow delivery.
+    """
+    campaign_id = uuid.uuid4().hex
+    now = time.time()
+    for job in jobs:
+        if job['channel'] not in TRANSPORTS:
+            raise ValueError(f"Unknown channel: {job['channel']}")
+    conn.executemany('''
+        INSERT INTO message_jobs (campaign_id, candidate_id, channel, recipient, subject, message, max_attempts, next_attempt_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (campaign_id, job.get('candidate_id'), job['channel'], job['recipient'], job.get('subject'),
+         job['message'], MESSAGE_MAX_ATTEMPTS, now)
+        for job in jobs
+    ])
+    return campaign_id
+
+def campaign_status(campaign_id):
+    """Count a campaign's jobs by status"""
+    rows = get_db().execute('''
+        SELECT status, COUNT(*) AS count FROM message_jobs WHERE campaign_id = ? GROUP BY status
+    ''', (campaign_id,)).fetchall()
+    counts = {row['status']: row['count'] for row in rows}
+    return {
+        'campaign_id': campaign_id,
+        'total': sum(counts.values()),
+        'counts': counts
+    }
+
+def job_row_to_dict(row):
+    """Build the API representation of a message job"""
+    return {
+        'id': row['id'],
+        'campaign_id': row['campaign_id'],
+        'candidate_id': row['candidate_id'],
+        'channel': row['channel'],
+        'recipient': row['recipient'],
+        'status': row['status'],
+        'attempts': row['attempts'],
+        'max_attempts': row['max_attempts'],
+        'last_error': row['last_error'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at']
+    }
+
+def get_jobs(job_ids):
+    """Fetch the status of the given jobs, in the order requested"""
+    if not job_ids:
+        return []
+    placeholders = ', '.join('?' * len(job_ids))
+    rows = get_db().execute(f'SELECT * FROM message_jobs WHERE id IN ({placeholders})', list(job_ids)).fetchall()
+    by_id = {row['id']: job_row_to_dict(row) for row in rows}
+    return [by_id[job_id] for job_id in job_ids if job_id in by_id]
+
+def retry_delay(attempts):
+    """Exponential backoff before the next attempt, capped"""
+    return min(MESSAGE_RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1)), MESSAGE_RETRY_BACKOFF_MAX_SECONDS)
+
+class MessageWorker:
+    """Drains message_jobs with a thread pool.
+
+    A dispatcher thread claims due jobs and hands them to the pool. Each
+    channel has its own semaphore, so a slow SMS provider can never take
+    the threads email needs. Claiming is a conditional UPDATE, so several
+    worker processes can share one database without sending a job twice.
+    """
+
+    def __init__(self, concurrency=None):
+        self.concurrency = dict(concurrency or CHANNEL_CONCURRENCY)
+        self.slots = {channel: threading.BoundedSemaphore(limit) for channel, limit in self.concurrency.items()}
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.executor = None
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.executor = ThreadPoolExecutor(
+            max_workers=sum(self.concurrency.values()),
+            thread_name_prefix='message-worker'
+        )
+        self.thread = threading.Thread(target=self.run, name='message-dispatcher', daemon=True)
+        self.thread.start()
+
+    def stop(self, wait=True):
+        self.stopping.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+            self.executor = None
+        self.stopping.clear()
+
+    def notify(self):
+        """Wake the dispatcher because new jobs were queued"""
+        self.wakeup.set()
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                dispatched = self.dispatch_due_jobs()
+            except Exception as e:
+                print(f"❌ Message dispatcher error: {e}")
+                dispatched = 0
+            if not dispatched:
+                self.wakeup.wait(self.idle_timeout())
+                self.wakeup.clear()
+
+    def idle_timeout(self):
+        """Sleep until the next retry is due, polling at least every interval"""
+        try:
+            next_due = get_db().execute('''
+                SELECT MIN(next_attempt_at) FROM message_jobs WHERE status IN ('queued', 'sending')
+            ''').fetchone()[0]
+        except Exception:
+            next_due = None
+        wait = (next_due or 0) - time.time()
+        if wait <= 0:
+            # Nothing scheduled, or due jobs are waiting on busy channel
+            # slots; a finished delivery wakes the dispatcher.
+            return MESSAGE_POLL_INTERVAL_SECONDS
+        return min(wait, MESSAGE_POLL_INTERVAL_SECONDS)
+
+    def dispatch_due_jobs(self):
+        """Claim as many due jobs as there are free channel slots"""
+        dispatched = 0
+        for channel, slots in self.slots.items():
+            while slots.acquire(blocking=False):
+                job = self.claim_next(channel)
+                if job is None:
+                    slots.release()
+                    break
+                future = self.executor.submit(self.deliver, job)
+                future.add_done_callback(lambda _, slots=slots: self.release(slots))
+                dispatched += 1
+        return dispatched
+
+    def release(self, slots):
+        """Free a channel slot and let the dispatcher fill it"""
+        slots.release()
+        self.wakeup.set()
+
+    def claim_next(self, channel):
+        """Lease the next due job on a channel, or return None.
+
+        A claimed job stays 'sending' with next_attempt_at pushed out by the
+        lease time. If the process dies mid-send the lease runs out and any
+        worker picks the job up again.
+        """
+        conn = get_db()
+        now = time.time()
+        row = conn.execute('''
+            SELECT id, status, next_attempt_at FROM message_jobs
+            WHERE status IN ('queued', 'sending') AND channel = ? AND next_attempt_at <= ?
+            ORDER BY next_attempt_at LIMIT 1
+        ''', (channel, now)).fetchone()
+        if row is None:
+            return None
+
+        cursor = conn.execute('''
+            UPDATE message_jobs
+            SET status = 'sending', attempts = attempts + 1, next_attempt_at = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = ? AND next_attempt_at = ?
+        ''', (now + MESSAGE_LEASE_SECONDS, row['id'], row['status'], row['next_attempt_at']))
+        conn.commit()
+        if cursor.rowcount == 0:
+            # Another process claimed it first; try the next one
+            return self.claim_next(channel)
+        return conn.execute('SELECT * FROM message_jobs WHERE id = ?', (row['id'],)).fetchone()
+
+    def deliver(self, job):
+        try:
+            result = TRANSPORTS[job['channel']](job)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        self.record_result(job, result)
+
+    def record_result(self, job, result):
+        """Mark a job sent, due for a retry, or failed after its last attempt"""
+        conn = get_db()
+        if result.get('success'):
+            conn.execute('''
+                UPDATE message_jobs SET status = 'sent', result = ?, last_error = NULL, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (json.dumps(result), job['id']))
+        elif job['attempts'] < job['max_attempts']:
+            conn.execute('''
+                UPDATE message_jobs SET status = 'queued', last_error = ?, next_attempt_at = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (result.get('error'), time.time() + retry_delay(job['attempts']), job['id']))
+        else:
+            conn.execute('''
+                UPDATE message_jobs SET status = 'failed', last_error = ?, result = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (result.get('error'), json.dumps(result), job['id']))
+        conn.commit()
+        changes.prune_periodically(conn)
+
+class AsyncMessageWorker(MessageWorker):
+    """Drains message_jobs on an asyncio event loop (used by asgi.py).
+
+    Sends are coroutines, so a channel's concurrency is only a semaphore
+    count and in-flight sends hold no threads; claiming jobs and recording
+    results still go through the given executor because SQLite is blocking.
+    """
+
+    def __init__(self, concurrency=None, executor=None):
+        super().__init__(concurrency)
+        self.db_executor = executor
+        self.loop = None
+        self.task = None
+        self.inflight = set()
+
+    def start(self):
+        """Start dispatching; call from a coroutine running on the serving loop"""
+        if self.task is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.async_slots = {channel: asyncio.Semaphore(limit) for channel, limit in self.concurrency.items()}
+        self.async_wakeup = asyncio.Event()
+        self.task = self.loop.create_task(self.run_async())
+
+    async def stop_async(self):
+        """Stop claiming jobs and wait for the sends in flight"""
+        if self.task is None:
+            return
+        self.stopping.set()
+        self.async_wakeup.set()
+        await self.task
+        if self.inflight:
+            await asyncio.gather(*self.inflight, return_exceptions=True)
+        self.task = None
+        self.stopping.clear()
+
+    def notify(self):
+        """Wake the dispatcher; safe to call from request threads"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.async_wakeup.set)
+
+    async def run_async(self):
+        while not self.stopping.is_set():
+            try:
+                dispatched = await self.dispatch_due_jobs_async()
+            except Exception as e:
+                print(f"❌ Message dispatcher error: {e}")
+                dispatched = 0
+            if not dispatched:
+                timeout = await self.loop.run_in_executor(self.db_executor, self.idle_timeout)
+                try:
+                    await asyncio.wait_for(self.async_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self.async_wakeup.clear()
+
+    async def dispatch_due_jobs_async(self):
+        """Claim as many due jobs as there are free channel slots"""
+        dispatched = 0
+        for channel, slots in self.async_slots.items():
+            while not slots.locked():
+                job = await self.loop.run_in_executor(self.db_executor, self.claim_next, channel)
+                if job is None:
+                    break
+                await slots.acquire()
+                task = self.loop.create_task(self.deliver_async(job, slots))
+                self.inflight.add(task)
+                task.add_done_callback(self.inflight.discard)
+                dispatched += 1
+        return dispatched
+
+    async def deliver_async(self, job, slots):
+        try:
+            try:
+                result = await ASYNC_TRANSPORTS[job['channel']](job, self.db_executor)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            await self.loop.run_in_executor(self.db_executor, self.record_result, job, result)
+        finally:
+            slots.release()
+            self.async_wakeup.set()
+
+worker = MessageWorker()
+
+def start_workers():
+    """Start draining the queue in this process unless disabled by config"""
+    if MESSAGE_WORKERS_ENABLED:
+        worker.start()
+
+async def start_async_workers(executor, concurrency=None):
+    """Swap the thread worker for an AsyncMessageWorker on the running loop.
+
+    Called by asgi.py at startup. If a thread worker was already running,
+    jobs it claimed but didn't finish are left to their lease and picked
+    up again.
+    """
+    global worker
+    if not MESSAGE_WORKERS_ENABLED:
+        return
+    worker.stop(wait=False)
+    worker = AsyncMessageWorker(concurrency, executor)
+    worker.start()
@@ -0,0 +1,249 @@
+"""Request, database, resume parsing and message send metrics.
+
+Histograms and counters live in this process and are rendered in the
+Prometheus text format at /metrics; each gunicorn worker reports its own
+numbers, so scrape every worker or run one. Database time is collected by
+the instrumented cursor in db.py and attributed to the request running on
+the same thread.
+
+The profiler hook runs cProfile around a request when the request sends
+X-Profile with PROFILE_TOKEN, or for a PROFILE_SAMPLE_RATE fraction of all
+requests, and writes a .prof file plus a readable summary to PROFILE_DIR
+when the request took at least PROFILE_SLOW_MS.
+"""
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Configuration
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Serve /metrics without a token; off unless explicitly set
+METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', '0') == '1'
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_SLOW_MS = float(os.getenv('PROFILE_SLOW_MS', '500'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_HEADER = 'X-Profile'
+
+# Latency buckets in seconds, from sub-millisecond queries to slow uploads
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+INF_BUCKET = 'le="+Inf"'
+
+_request = threading.local()
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=''):
+    """{a="x",b="y"} with Prometheus escaping; extra is appended as is"""
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, *label_values):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self.lock:
+            for label_values, value in sorted(self.values.items()):
+                lines.append(f'{self.name}{format_labels(self.labels, label_values)} {value:g}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            for label_values, (counts, total, count) in sorted(self.series.items()):
+                cumulative = 0
+                for bound, bucket in zip(self.buckets, counts):
+                    cumulative += bucket
+                    labels = format_labels(self.labels, label_values, f'le="{bound:g}"')
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                lines.append(f'{self.name}_bucket{format_labels(self.labels, label_values, INF_BUCKET)} {count}')
+                lines.append(f'{self.name}_sum{format_labels(self.labels, label_values)} {total:.6f}')
+                lines.append(f'{self.name}_count{format_labels(self.labels, label_values)} {count}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'hr_http_request_duration_seconds', 'Time to build the response, by route', ('method', 'endpoint', 'status')
+)
+REQUEST_DB_QUERIES = Histogram(
+    'hr_http_request_db_queries', 'Database statements run per request, by route', ('endpoint',), COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Counter(
+    'hr_http_request_db_seconds_total', 'Time spent executing database statements in requests, by route', ('endpoint',)
+)
+DB_QUERY_SECONDS = Histogram('hr_db_query_duration_seconds', 'Execution time of single database statements')
+RESUME_PARSE_SECONDS = Histogram(
+    'hr_resume_parse_duration_seconds', 'Text and field extraction time of uploaded resumes', ('format',)
+)
+MESSAGE_SEND_SECONDS = Histogram(
+    'hr_message_send_duration_seconds', 'Outbound email/SMS send time', ('channel', 'outcome')
+)
+PROFILES_WRITTEN = Counter('hr_profiles_written_total', 'Slow request profiles written to PROFILE_DIR')
+
+REGISTRY = [
+    REQUEST_SECONDS, REQUEST_DB_QUERIES, REQUEST_DB_SECONDS, DB_QUERY_SECONDS,
+    RESUME_PARSE_SECONDS, MESSAGE_SEND_SECONDS, PROFILES_WRITTEN
+]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def observe_query(seconds):
+    """Record one database statement, and charge it to the current request if any"""
+    DB_QUERY_SECONDS.observe(seconds)
+    db = getattr(_request, 'db', None)
+    if db is not None:
+        db[0] += 1
+        db[1] += seconds
+
+
+def timed_send(channel):
+    """Decorator timing a transport function (plain or async) that returns {'success': ...}"""
+    def decorator(send):
+        if inspect.iscoroutinefunction(send):
+            @wraps(send)
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                result = await send(*args, **kwargs)
+                outcome = 'success' if result.get('success') else 'error'
+                MESSAGE_SEND_SECONDS.observe(time.perf_counter() - start, channel, outcome)
+                return result
+            return timed_async
+
+        @wraps(send)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = send(*args, **kwargs)
+            outcome = 'success' if result.get('success') else 'error'
+            MESSAGE_SEND_SECONDS.observe(time.perf_counter() - start, channel, outcome)
+            return result
+        return timed
+    return decorator
+
+
+def should_profile(header):
+    """True if this request asked for a profile with the right token, or was sampled"""
+    if PROFILE_TOKEN and header == PROFILE_TOKEN:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def start_request(profile_header=None):
+    """Reset the per-thread request counters; start the profiler if wanted"""
+    _request.start = time.perf_counter()
+    _request.db = [0, 0.0]
+    _request.forced = bool(PROFILE_TOKEN) and profile_header == PROFILE_TOKEN
+    _request.profiler = None
+    if should_profile(profile_header):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active (Python 3.12+ allows one at a time)
+            return
+        _request.profiler = profiler
+
+
+def finish_request(method, endpoint, status):
+    """Record the request's latency and database use; returns a profile path if one was written"""
+    start = getattr(_request, 'start', None)
+    if start is None:
+        return None
+    elapsed = time.perf_counter() - start
+    queries, db_seconds = _request.db
+    _request.start = _request.db = None
+
+    REQUEST_SECONDS.observe(elapsed, method, endpoint, str(status))
+    REQUEST_DB_QUERIES.observe(queries, endpoint)
+    REQUEST_DB_SECONDS.inc(db_seconds, endpoint)
+
+    profiler, _request.profiler = _request.profiler, None
+    if profiler is None:
+        return None
+    profiler.disable()
+    if not _request.forced and elapsed * 1000 < PROFILE_SLOW_MS:
+        return None
+    return write_profile(profiler, method, endpoint, elapsed)
+
+
+def write_profile(profiler, method, endpoint, elapsed):
+    """Dump a .prof file (for snakeviz/pstats) and a top-40 text summary"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', endpoint).strip('_') or 'root'
+    base = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{int(elapsed * 1000)}ms")
+    profiler.dump_stats(base + '.prof')
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(40)
+    with open(base + '.txt', 'w') as f:
+        f.write(f'{method} {endpoint} took {elapsed * 1000:.1f} ms\n')
+        f.write(summary.getvalue())
+    PROFILES_WRITTEN.inc()
+    print(f"🐢 {method} {endpoint} took {elapsed * 1000:.0f} ms; profile written to {base}.txt")
+    return base + '.prof'
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from db import get_db
+
+# Configuration
+RESUME_CACHE_MEMORY_ENTRIES = int(os.getenv('RESUME_CACHE_MEMORY_ENTRIES', '256'))
+RESUME_CACHE_MAX_BYTES = int(os.getenv('RESUME_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Bump when extraction changes so entries parsed by the old code are ignored
+EXTRACTOR_VERSION = 2
+
+
+def content_hash(file_content, chunk_size=1024 * 1024):
+    """SHA-256 of the uploaded bytes or file object, used as the cache key.
+
+    File objects are hashed in chunks from their current position, so large
+    uploads are never held in memory whole.
+    """
+    if isinstance(file_content, bytes):
+        return hashlib.sha256(file_content).hexdigest()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file_content.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def init_cache(cursor):
+    """Create the persistent tier of the parsed resume cache"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resume_cache (
+            hash TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            info TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_cache_last_used ON resume_cache (last_used_at)')
+
+    # Running size of the table, kept by triggers so a store never sums it.
+    # Filled from existing rows the first time
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resume_cache_size (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            bytes INTEGER NOT NULL,
+            entries INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO resume_cache_size (id, bytes, entries)
+        SELECT 1, COALESCE(SUM(size), 0), COUNT(*) FROM resume_cache
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS resume_cache_size_insert AFTER INSERT ON resume_cache BEGIN
+            UPDATE resume_cache_size SET bytes = bytes + new.size, entries = entries + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS resume_cache_size_delete AFTER DELETE ON resume_cache BEGIN
+            UPDATE resume_cache_size SET bytes = bytes - old.size, entries = entries - 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS resume_cache_size_update AFTER UPDATE OF size ON resume_cache
+        WHEN old.size IS NOT new.size BEGIN
+            UPDATE resume_cache_size SET bytes = bytes - old.size + new.size;
+        END
+    ''')
+
+
+class ResumeCache:
+    """Two-tier cache of parsed resumes keyed by content hash.
+
+    A bounded in-process LRU answers repeat uploads without touching the
+    database. Misses fall through to the resume_cache table, which is shared
+    by every worker process and evicts least recently used entries once the
+    stored text exceeds RESUME_CACHE_MAX_BYTES. The stored size is read from
+    the trigger-maintained resume_cache_size row, so a store costs a few
+    index operations however large the table is.
+
+    Writes go through the request's connection and are only committed here
+    if no transaction was open already; a caller's open transaction (e.g.
+    an auto_save batch) commits or rolls them back with its own rows.
+    """
+
+    def __init__(self, memory_entries=RESUME_CACHE_MEMORY_ENTRIES, max_bytes=RESUME_CACHE_MAX_BYTES):
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def remember(self, key, entry):
+        with self.lock:
+            self.memory[key] = entry
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Return (text, info, tier) for a cached resume, or None on a miss"""
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+                self.counters['memory_hits'] += 1
+        if entry is not None:
+            return entry[0], dict(entry[1]), 'memory'
+
+        conn = get_db()
+        row = conn.execute(
+            'SELECT text, info FROM resume_cache WHERE hash = ? AND version = ?',
+            (key, EXTRACTOR_VERSION)
+        ).fetchone()
+        if row is None:
+            self.count('misses')
+            return None
+
+        owns_transaction = not conn.in_transaction
+        conn.execute('UPDATE resume_cache SET last_used_at = ? WHERE hash = ?', (time.time(), key))
+        if owns_transaction:
+            conn.commit()
+        entry = (row['text'], json.loads(row['info']))
+        self.remember(key, entry)
+        self.count('disk_hits')
+        return entry[0], dict(entry[1]), 'disk'
+
+    def put(self, key, text, info):
+        """Store a parsed resume in both tiers"""
+        entry = (text, dict(info))
+        self.remember(key, entry)
+
+        conn = get_db()
+        owns_transaction = not conn.in_transaction
+        # An upsert rather than INSERT OR REPLACE, whose implicit delete
+        # would skip the size trigger
+        conn.execute('''
+            INSERT INTO resume_cache (hash, version, text, info, size, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (hash) DO UPDATE SET
+                version = excluded.version, text = excluded.text, info = excluded.info,
+                size = excluded.size, last_used_at = excluded.last_used_at
+        ''', (key, EXTRACTOR_VERSION, text, json.dumps(info), len(text.encode('utf-8')), time.time()))
+        self.evict(conn)
+        if owns_transaction:
+            conn.commit()
+        self.count('stores')
+
+    def evict(self, conn):
+        """Drop least recently used rows until the table fits in max_bytes"""
+        total = conn.execute('SELECT bytes FROM resume_cache_size').fetchone()[0]
+        evicted = 0
+        while total > self.max_bytes:
+            row = conn.execute('''
+                DELETE FROM resume_cache WHERE hash = (SELECT hash FROM resume_cache ORDER BY last_used_at LIMIT 1)
+                RETURNING size
+            ''').fetchone()
+            if row is None:
+                break
+            total -= row[0]
+            evicted += 1
+        if evicted:
+            self.count('evictions', evicted)
+
+    def stats(self):
+        """Hit/miss counters for this process plus the size of both tiers"""
+        with self.lock:
+            stats = dict(self.counters)
+            stats['memory_entries'] = len(self.memory)
+        row = get_db().execute('SELECT entries, bytes FROM resume_cache_size').fetchone()
+        stats['disk_entries'] = row[0]
+        stats['disk_bytes'] = row[1]
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+cache = ResumeCache()
@@ -0,0 +1,281 @@
+import io
+import multiprocessing
+import os
+import re
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import gazetteer
+
+# Configuration
+RESUME_PARSE_WORKERS = int(os.getenv('RESUME_PARSE_WORKERS', str(os.cpu_count() or 2)))
+MAX_RESUME_PAGES = int(os.getenv('MAX_RESUME_PAGES', '20'))
+RESUME_EARLY_STOP = os.getenv('RESUME_EARLY_STOP', '1') == '1'
+RESUME_PARSE_IN_POOL = os.getenv('RESUME_PARSE_IN_POOL', '1') == '1'
+
+_pool = None
+
+
+def extract_text_from_image(image_data):
+    """Extract text from image using OCR (basic implementation)"""
+    # In production, use Tesseract OCR or Google Vision API
+    # For demo, return placeholder
+    return "Sample extracted text from image"
+
+
+def has_required_fields(found, page_text):
+    """Record which required fields (email, phone, location, a skill) appear in a page"""
+    if 'email' not in found and EMAIL_RE.search(page_text):
+        found.add('email')
+    if 'phone' not in found and PHONE_RE.search(page_text):
+        found.add('phone')
+    if not {'location', 'skills'} <= found:
+        terms = GAZETTEER.scan(page_text.lower())
+        found.update(category for category in ('location', 'skills') if terms[category])
+    return len(found) == 4
+
+
+def extract_text_from_pdf(stream, max_pages=None, stop_when_complete=None):
+    """Extract page text from a PDF file object or bytes.
+
+    Reads at most max_pages pages and, with stop_when_complete, stops at the
+    first page by which email, phone, location and at least one skill have
+    all been seen, so a long portfolio costs no more than its first pages.
+    Skills listed only on the pages after that are not extracted. Returns
+    the text and metadata about the pages read.
+    """
+    # PyPDF2 takes ~40 ms to import and only PDF uploads need it
+    import PyPDF2
+    
+    max_pages = MAX_RESUME_PAGES if max_pages is None else max_pages
+    stop_when_complete = RESUME_EARLY_STOP if stop_when_complete is None else stop_when_complete
+    if isinstance(stream, bytes):
+        stream = io.BytesIO(stream)
+    
+    pdf_reader = PyPDF2.PdfReader(stream)
+    page_count = len(pdf_reader.pages)
+    parts = []
+    found = set()
+    stopped_early = False
+    for index in range(min(page_count, max_pages)):
+        page_text = pdf_reader.pages[index].extract_text() or ''
+        parts.append(page_text)
+        if stop_when_complete and has_required_fields(found, page_text):
+            stopped_early = index + 1 < min(page_count, max_pages)
+            break
+    
+    return ''.join(parts), {
+        'page_count': page_count,
+        'pages_parsed': len(parts),
+        'truncated': page_count > max_pages and not stopped_early,
+        'stopped_early': stopped_early
+    }
+
+
+def extract_text(filename, file_content):
+    """Extract text based on file type; returns the text and parse metadata"""
+    if filename.lower().endswith('.pdf'):
+        return extract_text_from_pdf(file_content)
+    # For images, use basic extraction (in production, use OCR)
+    return extract_text_from_image(file_content), {}
+
+
+@contextmanager
+def measure_peak_memory():
+    """Track peak Python heap allocation while the block runs.
+
+    Yields a dict that holds peak_memory_kb afterwards. Only measures in
+    the pool's worker processes, which run one parse at a time, so the
+    figure is that parse's alone. tracemalloc slows every allocation in
+    the process, so in the web process the dict stays empty.
+    """
+    result = {}
+    if multiprocessing.parent_process() is None or tracemalloc.is_tracing():
+        yield result
+        return
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_memory_kb'] = peak // 1024
+
+
+# Precompiled patterns; only the first match of each is used
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE_RE = re.compile(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]')
+MIN_TERM_LENGTH = 3
+
+
+def load_terms_file(path):
+    """Read extra dictionary entries: 'Name' or 'Name: alias, alias' per line"""
+    entries = {}
+    if not path or not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            name, _, aliases = line.partition(':')
+            entries[name.strip()] = [alias.strip() for alias in aliases.split(',') if alias.strip()]
+    return entries
+
+
+def build_trie_pattern(terms):
+    """Compile lowercase terms into one regex whose alternation is a trie.
+
+    Shared prefixes are factored out ('pun(?:e|jab)'), so at each position
+    the regex engine follows one path down the trie instead of trying every
+    term in turn, much like an Aho-Corasick automaton. Terms only match as
+    whole words, and the longest term wins.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node):
+        end = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            return '(?:' + body + ')?'
+        return body
+
+    return re.compile(r'(?<![\w+#.])(' + emit(trie) + r')(?![\w+#])')
+
+
+def matchable(term):
+    """Skip short purely alphabetic terms, which match too many ordinary words"""
+    return len(term) >= MIN_TERM_LENGTH or not term.isalpha()
+
+
+class Gazetteer:
+    """Single-pass dictionary matcher over several categories of terms.
+
+    entries maps a category (e.g. 'location') to {canonical name: [aliases]};
+    every spelling is reported under its canonical name.
+    """
+
+    def __init__(self, entries):
+        self.categories = list(entries)
+        self.canonical = {}
+        for category, names in entries.items():
+            for name, aliases in names.items():
+                for term in [name] + list(aliases):
+                    if matchable(term):
+                        self.canonical.setdefault(term.lower(), (category, name))
+        self.pattern = build_trie_pattern(self.canonical)
+
+    def scan(self, text_lower):
+        """Canonical names found per category, in order of first appearance"""
+        found = {category: {} for category in self.categories}
+        for match in self.pattern.finditer(text_lower):
+            category, name = self.canonical[match.group(1)]
+            found[category].setdefault(name, None)
+        return {category: list(names) for category, names in found.items()}
+
+
+def build_gazetteer():
+    """Combine the default and configured locations and skills into one matcher"""
+    locations = {name: [] for name in gazetteer.LOCATIONS}
+    for alias, name in gazetteer.LOCATION_ALIASES.items():
+        locations.setdefault(name, []).append(alias)
+    locations.update(load_terms_file(os.getenv('RESUME_LOCATIONS_FILE')))
+    
+    skills = {name: list(aliases) for name, aliases in gazetteer.SKILLS.items()}
+    skills.update(load_terms_file(os.getenv('RESUME_SKILLS_FILE')))
+    
+    return Gazetteer({'location': locations, 'skills': skills})
+
+
+GAZETTEER = build_gazetteer()
+
+
+def extract_candidate_info(text):
+    """Extract candidate information from text.
+
+    The text is lowercased once, email and phone stop at their first match,
+    and locations and skills are found together in a single pass.
+    """
+    info = {
+        'name': '',
+        'email': '',
+        'phone': '',
+        'location': '',
+        'skills': '',
+        'experience': ''
+    }
+    
+    email = EMAIL_RE.search(text)
+    if email:
+        info['email'] = email.group(0)
+    
+    phone = PHONE_RE.search(text)
+    if phone:
+        info['phone'] = phone.group(0).strip()
+    
+    found = GAZETTEER.scan(text.lower())
+    if found['location']:
+        info['location'] = found['location'][0]
+    info['skills'] = ', '.join(found['skills'])
+    
+    return info
+
+
+def parse_resume(filename, file_content):
+    """Extract text and candidate fields from one resume, as bytes or a file object.
+
+    Runs inside the process pool, so it reports failures in its result
+    instead of raising.
+    """
+    try:
+        if isinstance(file_content, bytes):
+            size = len(file_content)
+        else:
+            size = os.fstat(file_content.fileno()).st_size
+        with measure_peak_memory() as memory:
+            text, metadata = extract_text(filename, file_content)
+            candidate = extract_candidate_info(text)
+        metadata.update(memory, bytes=size)
+        return {
+            'filename': filename,
+            'success': True,
+            'candidate': candidate,
+            'metadata': metadata,
+            'text': text
+        }
+    except Exception as e:
+        return {'filename': filename, 'success': False, 'error': str(e)}
+
+
+def parse_resume_file(filename, path):
+    """parse_resume for a file on disk, which the pool worker opens itself"""
+    try:
+        with open(path, 'rb') as stream:
+            return parse_resume(filename, stream)
+    except OSError as e:
+        return {'filename': filename, 'success': False, 'error': str(e)}
+
+
+def get_pool():
+    """Return the shared process pool for CPU-bound resume parsing"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=RESUME_PARSE_WORKERS)
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the pool's worker processes, for servers that exit without running atexit hooks"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,64 @@
+"""Synthetic resumes for the benchmarks and the tests.
+
+Importing this module has no side effects: it neither opens the database nor
+creates the app, so it is safe to use from the test suite.
+"""
+import random
+import textwrap
+import uuid
+
+import gazetteer
+
+
+def synthetic_resume(rng, index):
+    """Plain-text resume with contact details, a city and a few skills"""
+    skills = rng.sample(sorted(gazetteer.SKILLS), 8)
+    city = rng.choice(gazetteer.LOCATIONS)
+    filler = ' '.join(rng.choice(['worked', 'on', 'team', 'delivered', 'projects', 'for', 'clients',
+                                  'using', 'modern', 'tools', 'and', 'improved', 'performance'])
+                      for _ in range(400))
+    return (
+        f"Candidate {index}\nEmail: candidate{index}@example.com\nPhone: +91 98765 {index % 100000:05d}\n"
+        f"Experience\n{filler}\nLocation: {city}\nSkills: {', '.join(skills)}\n"
+    )
+
+
+def pdf_escape(text):
+    """Escape a line for a PDF string literal"""
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def synthetic_pdf(text):
+    """A minimal one-page PDF whose text PyPDF2 can extract, one line per text line.
+
+    Written by hand so the benchmark needs no PDF library; the result is a
+    well-formed PDF 1.4 file with a Helvetica text stream and an xref table.
+    """
+    lines = [wrapped for line in text.splitlines() for wrapped in textwrap.wrap(line, 95) or ['']][:64]
+    content = 'BT /F1 10 Tf 12 TL 50 790 Td ' + ' '.join(f'({pdf_escape(line)}) Tj T*' for line in lines) + ' ET'
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+        '/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        f'<< /Length {len(content.encode("latin-1", "replace"))} >>\nstream\n{content}\nendstream',
+    ]
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1', 'replace')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        out += f'{offset:010d} 00000 n \n'.encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(out)
+
+
+def synthetic_pdfs(count, seed=7):
+    """count distinct PDF resumes, so uploads miss the parsed resume cache"""
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+    return [synthetic_pdf(synthetic_resume(rng, i) + f'Ref: {tag}-{i}\n') for i in range(count)]
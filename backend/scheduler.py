@@ -0,0 +1,354 @@
+"""Interview rooms and slots with conflict checks and bulk auto-assignment.
+
+A slot is one interview in one room over [starts_at, ends_at), stored as
+'YYYY-MM-DD HH:MM' text so string order is time order. Slots of a room
+never overlap, so the only slot that can clash with a new interval is the
+last one starting before the interval ends: one seek on (room_id,
+starts_at) instead of a scan. A candidate's booked slots are kept
+non-overlapping the same way, on (candidate_id, starts_at).
+
+Booking a slot also fills the candidate's interview_date, interview_time
+and interview_location, so the candidate list, message templates and the
+live feed keep working unchanged.
+"""
+import os
+from datetime import datetime, timedelta
+
+# Configuration
+INTERVIEW_SLOT_MINUTES = int(os.getenv('INTERVIEW_SLOT_MINUTES', '30'))
+MAX_GENERATED_SLOTS = int(os.getenv('MAX_GENERATED_SLOTS', '10000'))
+
+TIME_FORMAT = '%Y-%m-%d %H:%M'
+
+# SQLite's default limit on bound parameters is 999
+ID_CHUNK_SIZE = 900
+
+
+def init_scheduler(cursor):
+    """Create the room and slot tables, their interval indexes and cleanup trigger"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS interview_rooms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            location TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS interview_slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_id INTEGER NOT NULL REFERENCES interview_rooms (id),
+            starts_at TEXT NOT NULL,
+            ends_at TEXT NOT NULL,
+            candidate_id INTEGER REFERENCES candidates (id),
+            booked_at TIMESTAMP,
+            CHECK (ends_at > starts_at)
+        )
+    ''')
+
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_interview_slots_room ON interview_slots (room_id, starts_at)')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_interview_slots_candidate ON interview_slots (candidate_id, starts_at)
+        WHERE candidate_id IS NOT NULL
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_interview_slots_open ON interview_slots (starts_at, room_id)
+        WHERE candidate_id IS NULL
+    ''')
+
+    # A deleted candidate's slots become free again
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS interview_slots_candidate_delete AFTER DELETE ON candidates BEGIN
+            UPDATE interview_slots SET candidate_id = NULL, booked_at = NULL WHERE candidate_id = old.id;
+        END
+    ''')
+
+
+def parse_time(value):
+    """Normalize '2025-05-02 10:30' or '2025-05-02T10:30' to TIME_FORMAT"""
+    try:
+        return datetime.fromisoformat(str(value).strip()).strftime(TIME_FORMAT)
+    except ValueError:
+        raise ValueError(f'Invalid time {value!r}; use YYYY-MM-DD HH:MM')
+
+
+def parse_date(value):
+    """Validate a YYYY-MM-DD date"""
+    try:
+        return datetime.strptime(str(value).strip(), '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'Invalid date {value!r}; use YYYY-MM-DD')
+
+
+def date_window(date_from=None, date_to=None):
+    """SQL conditions and params limiting starts_at to whole days, both ends inclusive"""
+    clauses, params = [], []
+    if date_from:
+        clauses.append('s.starts_at >= ?')
+        params.append(parse_date(date_from).strftime('%Y-%m-%d'))
+    if date_to:
+        clauses.append('s.starts_at < ?')
+        params.append((parse_date(date_to) + timedelta(days=1)).strftime('%Y-%m-%d'))
+    return clauses, params
+
+
+def clash(cursor, column, value, starts_at, ends_at):
+    """id of the slot of a room or candidate overlapping [starts_at, ends_at), or None.
+
+    The slots of one room (or candidate) don't overlap each other, so if
+    any of them overlaps the interval, the last one starting before
+    ends_at does: one index seek, O(log n).
+    """
+    row = cursor.execute(f'''
+        SELECT id, ends_at FROM interview_slots
+        WHERE {column} = ? AND starts_at < ?
+        ORDER BY starts_at DESC LIMIT 1
+    ''', (value, ends_at)).fetchone()
+    return row[0] if row and row[1] > starts_at else None
+
+
+def slot_to_dict(row):
+    return {
+        'id': row['id'],
+        'room_id': row['room_id'],
+        'room': row['room'],
+        'starts_at': row['starts_at'],
+        'ends_at': row['ends_at'],
+        'candidate_id': row['candidate_id'],
+        'candidate_name': row['candidate_name']
+    }
+
+
+def list_rooms(conn):
+    return [dict(row) for row in conn.execute('SELECT id, name, location FROM interview_rooms ORDER BY name')]
+
+
+def create_room(conn, name, location=''):
+    """Add a room; names are unique"""
+    name = (name or '').strip()
+    if not name:
+        raise ValueError('Room name is required')
+    if conn.execute('SELECT 1 FROM interview_rooms WHERE name = ?', (name,)).fetchone():
+        raise ValueError(f'Room {name} already exists')
+    room_id = conn.execute(
+        'INSERT INTO interview_rooms (name, location) VALUES (?, ?) RETURNING id', (name, (location or '').strip())
+    ).fetchone()[0]
+    conn.commit()
+    return room_id
+
+
+def generate_slots(room_ids, date, start, end, minutes=None, gap=0):
+    """Back-to-back (room_id, starts_at, ends_at) slots between start and end of a day in each room"""
+    minutes = minutes or INTERVIEW_SLOT_MINUTES
+    if minutes < 1 or gap < 0:
+        raise ValueError('minutes must be positive and gap must not be negative')
+    if not start or not end:
+        raise ValueError('start and end times are required, e.g. "10:00" and "17:00"')
+    day = parse_date(date).strftime('%Y-%m-%d')
+    first = datetime.strptime(parse_time(f'{day} {start}'), TIME_FORMAT)
+    last = datetime.strptime(parse_time(f'{day} {end}'), TIME_FORMAT)
+    if first >= last:
+        raise ValueError('start must be before end')
+    per_room = max(int(((last - first).total_seconds() / 60 + gap) // (minutes + gap)), 0)
+    if per_room * len(room_ids) > MAX_GENERATED_SLOTS:
+        raise ValueError(f'That would create {per_room * len(room_ids)} slots; the limit is {MAX_GENERATED_SLOTS}')
+
+    slots = []
+    for room_id in room_ids:
+        for n in range(per_room):
+            starts = first + timedelta(minutes=n * (minutes + gap))
+            slots.append((room_id, starts.strftime(TIME_FORMAT), (starts + timedelta(minutes=minutes)).strftime(TIME_FORMAT)))
+    return slots
+
+
+def create_slots(conn, slots):
+    """Insert (room_id, starts_at, ends_at) slots that don't clash, in one transaction.
+
+    Each slot is checked against the room's existing slots and the ones
+    inserted before it. Returns the new ids and the rejected slots.
+    """
+    # Take the write lock first so no other writer slips in between the
+    # conflict checks and the inserts
+    conn.execute('BEGIN IMMEDIATE')
+    cursor = conn.cursor()
+    try:
+        rooms = {row[0] for row in cursor.execute('SELECT id FROM interview_rooms')}
+        created, rejected = [], []
+        for index, (room_id, starts_at, ends_at) in enumerate(slots):
+            try:
+                starts_at, ends_at = parse_time(starts_at), parse_time(ends_at)
+            except ValueError as e:
+                rejected.append({'index': index, 'room_id': room_id, 'error': str(e)})
+                continue
+            error = None
+            if room_id not in rooms:
+                error = 'Room not found'
+            elif ends_at <= starts_at:
+                error = 'ends_at must be after starts_at'
+            else:
+                existing = clash(cursor, 'room_id', room_id, starts_at, ends_at)
+                if existing:
+                    error = f'Overlaps slot {existing}'
+            if error:
+                rejected.append({'index': index, 'room_id': room_id, 'starts_at': starts_at, 'error': error})
+                continue
+            created.append(cursor.execute(
+                'INSERT INTO interview_slots (room_id, starts_at, ends_at) VALUES (?, ?, ?) RETURNING id',
+                (room_id, starts_at, ends_at)
+            ).fetchone()[0])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return created, rejected
+
+
+def list_slots(conn, date_from=None, date_to=None, room_id=None, available=None):
+    """Slots in start order, with room and candidate names"""
+    clauses, params = date_window(date_from, date_to)
+    if room_id:
+        clauses.append('s.room_id = ?')
+        params.append(room_id)
+    if available is not None:
+        clauses.append('s.candidate_id IS NULL' if available else 's.candidate_id IS NOT NULL')
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    rows = conn.execute(f'''
+        SELECT s.id, s.room_id, r.name AS room, s.starts_at, s.ends_at, s.candidate_id, c.name AS candidate_name
+        FROM interview_slots s
+        JOIN interview_rooms r ON r.id = s.room_id
+        LEFT JOIN candidates c ON c.id = s.candidate_id
+        {where}
+        ORDER BY s.starts_at, s.room_id
+    ''', params).fetchall()
+    return [slot_to_dict(row) for row in rows]
+
+
+def sync_candidates(cursor, candidate_ids):
+    """Copy each candidate's latest booked slot into the interview_* columns (blank if none)"""
+    rows = []
+    for candidate_id in candidate_ids:
+        slot = cursor.execute('''
+            SELECT s.starts_at, r.name, r.location FROM interview_slots s
+            JOIN interview_rooms r ON r.id = s.room_id
+            WHERE s.candidate_id = ? ORDER BY s.starts_at DESC LIMIT 1
+        ''', (candidate_id,)).fetchone()
+        if slot:
+            date, time = slot['starts_at'].split(' ')
+            location = ', '.join(part for part in (slot['name'], slot['location']) if part)
+            rows.append((date, time, location, candidate_id))
+        else:
+            rows.append(('', '', '', candidate_id))
+    cursor.executemany(
+        'UPDATE candidates SET interview_date = ?, interview_time = ?, interview_location = ? WHERE id = ?', rows
+    )
+
+
+def book_slot(conn, slot_id, candidate_id):
+    """Book one open slot for a candidate who has no overlapping interview"""
+    conn.execute('BEGIN IMMEDIATE')
+    cursor = conn.cursor()
+    try:
+        slot = cursor.execute('SELECT starts_at, ends_at, candidate_id FROM interview_slots WHERE id = ?', (slot_id,)).fetchone()
+        if not slot:
+            raise ValueError('Slot not found')
+        if slot['candidate_id'] is not None:
+            raise ValueError(f'Slot is already booked by candidate {slot["candidate_id"]}')
+        if not cursor.execute('SELECT 1 FROM candidates WHERE id = ?', (candidate_id,)).fetchone():
+            raise ValueError('Candidate not found')
+        existing = clash(cursor, 'candidate_id', candidate_id, slot['starts_at'], slot['ends_at'])
+        if existing:
+            raise ValueError(f'Candidate already has an interview in slot {existing} at that time')
+        cursor.execute(
+            'UPDATE interview_slots SET candidate_id = ?, booked_at = CURRENT_TIMESTAMP WHERE id = ?', (candidate_id, slot_id)
+        )
+        sync_candidates(cursor, [candidate_id])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def release_slot(conn, slot_id):
+    """Free a booked slot; returns the candidate it was booked for"""
+    conn.execute('BEGIN IMMEDIATE')
+    cursor = conn.cursor()
+    try:
+        row = cursor.execute('SELECT candidate_id FROM interview_slots WHERE id = ?', (slot_id,)).fetchone()
+        if not row:
+            raise ValueError('Slot not found')
+        if row[0] is not None:
+            cursor.execute('UPDATE interview_slots SET candidate_id = NULL, booked_at = NULL WHERE id = ?', (slot_id,))
+            sync_candidates(cursor, [row[0]])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return row[0]
+
+
+def auto_assign(conn, candidate_ids, date_from=None, date_to=None, room_ids=None):
+    """Pack candidates into the open slots of a window, earliest slot first, in one transaction.
+
+    Candidates are served in the order given; each takes the earliest open
+    slot (across all rooms) that doesn't overlap an interview they already
+    have. Walking slots in start order fills parallel rooms before later
+    times, so the drive finishes as early as the slots allow. Candidates
+    already booked inside the window are skipped.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    cursor = conn.cursor()
+    try:
+        ids = list(dict.fromkeys(candidate_ids))
+        found = set()
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            found.update(row[0] for row in cursor.execute(f'SELECT id FROM candidates WHERE id IN ({placeholders})', chunk))
+
+        clauses, params = date_window(date_from, date_to)
+        booked_clauses = ['s.candidate_id = ?'] + clauses
+        clauses = ['s.candidate_id IS NULL'] + clauses
+        if room_ids:
+            clauses.append(f"s.room_id IN ({', '.join('?' * len(room_ids))})")
+        open_slots = cursor.execute(f'''
+            SELECT s.id, s.room_id, s.starts_at, s.ends_at FROM interview_slots s
+            WHERE {' AND '.join(clauses)} ORDER BY s.starts_at, s.room_id
+        ''', params + list(room_ids or [])).fetchall()
+
+        taken = [False] * len(open_slots)
+        first_open = 0
+        assigned, unassigned = [], []
+        for candidate_id in ids:
+            if candidate_id not in found:
+                unassigned.append({'candidate_id': candidate_id, 'error': 'Candidate not found'})
+                continue
+            if cursor.execute(f"SELECT 1 FROM interview_slots s WHERE {' AND '.join(booked_clauses)} LIMIT 1",
+                              [candidate_id] + params).fetchone():
+                unassigned.append({'candidate_id': candidate_id, 'error': 'Already scheduled in this window'})
+                continue
+            while first_open < len(taken) and taken[first_open]:
+                first_open += 1
+            for index in range(first_open, len(open_slots)):
+                slot = open_slots[index]
+                if taken[index] or clash(cursor, 'candidate_id', candidate_id, slot['starts_at'], slot['ends_at']):
+                    continue
+                taken[index] = True
+                assigned.append({
+                    'candidate_id': candidate_id, 'slot_id': slot['id'], 'room_id': slot['room_id'],
+                    'starts_at': slot['starts_at'], 'ends_at': slot['ends_at']
+                })
+                break
+            else:
+                unassigned.append({'candidate_id': candidate_id, 'error': 'No open slot left'})
+
+        cursor.executemany(
+            'UPDATE interview_slots SET candidate_id = ?, booked_at = CURRENT_TIMESTAMP WHERE id = ?',
+            [(row['candidate_id'], row['slot_id']) for row in assigned]
+        )
+        sync_candidates(cursor, [row['candidate_id'] for row in assigned])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return assigned, unassigned
@@ -0,0 +1,111 @@
+import html
+import re
+
+# Columns indexed for full-text search and their BM25 weights: a hit in the
+# name or skills counts for more than one buried in the resume text
+SEARCH_COLUMNS = ['name', 'skills', 'experience', 'location', 'resume_text']
+SEARCH_WEIGHTS = [10.0, 5.0, 2.0, 3.0, 1.0]
+BM25_WEIGHTS = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+TOKEN_RE = re.compile(r'\w[\w+#.]*', re.UNICODE)
+
+# snippet() marks hits with these control characters rather than <mark>, so
+# the resume text around them can be escaped before the tags go in
+HIT_START = '\x02'
+HIT_END = '\x03'
+
+
+def init_search(cursor):
+    """Create the FTS5 index over candidates and the triggers that sync it.
+
+    candidates_fts is an external-content table: it stores only the index
+    and reads column values from candidates, so the text is not duplicated.
+    Returns True if the index was created now and still needs a rebuild.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidates_fts'"
+    ).fetchone()
+    
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+            {', '.join(SEARCH_COLUMNS)},
+            content='candidates',
+            content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    ''')
+    
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_insert AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+            INSERT INTO candidates_fts (candidates_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    # Status and interview updates don't touch the index
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_update AFTER UPDATE OF {columns} ON candidates BEGIN
+            INSERT INTO candidates_fts (candidates_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO candidates_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    
+    return not exists
+
+
+def rebuild_index(conn, commit=True):
+    """Rebuild the whole index from the candidates table; commit=False leaves it to the caller's transaction"""
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('optimize')")
+    if commit:
+        conn.commit()
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query: every word must match.
+
+    The last word is matched as a prefix so results follow the user as they
+    type; earlier words are complete and match exactly, which keeps common
+    stems from expanding into many index terms. Words are quoted, so
+    characters that mean something in FTS5 syntax (quotes, colons, NEAR, -)
+    are searched for literally.
+    """
+    tokens = ['"' + token.replace('"', '""') + '"' for token in TOKEN_RE.findall(text)]
+    if tokens:
+        tokens[-1] += '*'
+    return ' '.join(tokens)
+
+
+def snippet_html(snippet):
+    """HTML of a snippet: the text escaped, the hits wrapped in <mark>"""
+    if not snippet:
+        return snippet
+    # Marker characters already in the stored text can only add a stray
+    # <mark>, never markup of their own
+    return html.escape(snippet).replace(HIT_START, '<mark>').replace(HIT_END, '</mark>')
+
+
+def search_candidates(conn, text, columns, limit=20, offset=0):
+    """BM25-ranked candidates matching text, each with a snippet for snippet_html()"""
+    match = build_match_query(text)
+    if not match:
+        return []
+    
+    # bm25() with literal weights is cheaper per row than a configured
+    # 'rank' function, which FTS5 re-parses for every match it scores
+    selected = ', '.join(f'c.{column}' for column in columns)
+    return conn.execute(f'''
+        SELECT {selected},
+               snippet(candidates_fts, -1, ?, ?, '…', 12) AS snippet,
+               -bm25(candidates_fts, {BM25_WEIGHTS}) AS score
+        FROM candidates_fts
+        JOIN candidates c ON c.id = candidates_fts.rowid
+        WHERE candidates_fts MATCH ?
+        ORDER BY score DESC
+        LIMIT ? OFFSET ?
+    ''', (HIT_START, HIT_END, match, limit, offset)).fetchall()
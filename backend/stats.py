@@ -0,0 +1,134 @@
+"""Dashboard counters kept up to date by triggers.
+
+candidate_stats holds one row per (dimension, value): the candidate total,
+candidates per status, per location and per message_sent flag, and sent
+messages per channel. Every write to candidates or messages adjusts the
+affected rows in the same transaction, so reading the dashboard costs a
+scan of this small table instead of the candidates table.
+"""
+
+# Dimensions counted from the candidates table: name -> column expression
+CANDIDATE_DIMENSIONS = {
+    'total': "''",
+    'status': "coalesce({row}.status, '')",
+    'location': "coalesce({row}.location, '')",
+    'message_sent': "coalesce({row}.message_sent, 0)",
+}
+
+
+def counter_sql(dimension, expression, delta):
+    """Statement that adds delta to one counter, creating it if needed"""
+    return f'''
+        INSERT INTO candidate_stats (dimension, value, count) VALUES ('{dimension}', {expression}, {delta})
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + ({delta});
+    '''
+
+
+def init_stats(cursor):
+    """Create the counters table and its triggers.
+
+    Returns True if the table was created now and still needs a rebuild.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidate_stats'"
+    ).fetchone()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_stats (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+
+    added = ''.join(counter_sql(name, expr.format(row='new'), 1) for name, expr in CANDIDATE_DIMENSIONS.items())
+    removed = ''.join(counter_sql(name, expr.format(row='old'), -1) for name, expr in CANDIDATE_DIMENSIONS.items())
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS candidate_stats_insert AFTER INSERT ON candidates BEGIN {added} END')
+    cursor.execute(f'CREATE TRIGGER IF NOT EXISTS candidate_stats_delete AFTER DELETE ON candidates BEGIN {removed} END')
+
+    # One trigger per counted column, so an update only touches the
+    # counters of columns that actually changed
+    for name, expr in CANDIDATE_DIMENSIONS.items():
+        if name == 'total':
+            continue
+        old, new = expr.format(row='old'), expr.format(row='new')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS candidate_stats_update_{name} AFTER UPDATE OF {name} ON candidates
+            WHEN {old} IS NOT {new} BEGIN
+                {counter_sql(name, old, -1)}
+                {counter_sql(name, new, 1)}
+            END
+        ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS candidate_stats_message AFTER INSERT ON messages BEGIN
+            {counter_sql('messages', 'new.type', 1)}
+        END
+    ''')
+
+    return not exists
+
+
+def recompute(conn):
+    """Count everything from scratch as {(dimension, value): count}"""
+    counts = {}
+    for name, expr in CANDIDATE_DIMENSIONS.items():
+        column = expr.format(row='candidates')
+        for value, count in conn.execute(f'SELECT {column}, COUNT(*) FROM candidates GROUP BY {column}'):
+            counts[(name, str(value))] = count
+    for value, count in conn.execute('SELECT type, COUNT(*) FROM messages GROUP BY type'):
+        counts[('messages', value)] = count
+    return counts
+
+
+def maintained(conn):
+    """The trigger-maintained counters as {(dimension, value): count}"""
+    return {
+        (row['dimension'], row['value']): row['count']
+        for row in conn.execute('SELECT dimension, value, count FROM candidate_stats WHERE count != 0')
+    }
+
+
+def verify_stats(conn):
+    """Compare the counters against a full recount; returns the differences"""
+    expected = recompute(conn)
+    actual = maintained(conn)
+    differences = []
+    for dimension, value in sorted(set(expected) | set(actual)):
+        counter = actual.get((dimension, value), 0)
+        count = expected.get((dimension, value), 0)
+        if counter != count:
+            differences.append({'dimension': dimension, 'value': value, 'counter': counter, 'actual': count})
+    return differences
+
+
+def rebuild_stats(conn, commit=True):
+    """Replace the counters with a full recount; commit=False leaves it to the caller's transaction"""
+    conn.execute('DELETE FROM candidate_stats')
+    conn.executemany(
+        'INSERT INTO candidate_stats (dimension, value, count) VALUES (?, ?, ?)',
+        [(dimension, value, count) for (dimension, value), count in recompute(conn).items()]
+    )
+    if commit:
+        conn.commit()
+
+
+def get_stats(conn):
+    """Dashboard aggregates read from the counters"""
+    counters = maintained(conn)
+    grouped = {}
+    for (dimension, value), count in counters.items():
+        grouped.setdefault(dimension, {})[value] = count
+    message_sent = grouped.get('message_sent', {})
+    return {
+        'total': grouped.get('total', {}).get('', 0),
+        'by_status': grouped.get('status', {}),
+        'by_location': [
+            {'location': location, 'count': count}
+            for location, count in sorted(grouped.get('location', {}).items(), key=lambda item: -item[1])
+        ],
+        'message_sent': message_sent.get('1', 0),
+        'not_contacted': message_sent.get('0', 0),
+        'messages': grouped.get('messages', {})
+    }
@@ -0,0 +1,84 @@
+"""Shared fixtures. The whole session runs against a throwaway database.
+
+Run from the backend folder:
+
+    python -m pytest -q tests
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH = tempfile.mkdtemp(prefix='hr-tests-')
+
+# The modules read their configuration at import time
+os.environ['DATABASE_PATH'] = os.path.join(SCRATCH, 'test.db')
+os.environ['MESSAGE_WORKERS_ENABLED'] = '0'
+os.environ['SECRET_KEY'] = 'test'
+sys.path.insert(0, BACKEND)
+
+import pytest
+
+import app as backend
+import db
+import resume_cache
+import stats
+from sample_resumes import synthetic_pdf
+
+# create_app() makes this folder
+backend.UPLOAD_FOLDER = os.path.join(SCRATCH, 'uploads')
+
+# Tables emptied after every test; the schema and the default rows stay
+CLEARED_TABLES = ('candidates', 'message_jobs', 'messages', 'resume_cache', 'interview_slots', 'interview_rooms')
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    yield backend.create_app()
+    shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+@pytest.fixture
+def client(flask_app):
+    client = flask_app.test_client()
+    response = client.post('/api/login', json={'username': 'admin', 'password': 'admin123'})
+    assert response.json['success']
+    return client
+
+
+@pytest.fixture
+def database():
+    """A connection of the test's own, outside any request transaction"""
+    conn = sqlite3.connect(db.DATABASE)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(autouse=True)
+def clean_tables(flask_app):
+    yield
+    conn = sqlite3.connect(db.DATABASE)
+    for table in CLEARED_TABLES:
+        conn.execute(f'DELETE FROM {table}')
+    # The message log is append-only, so no trigger counts its deletes
+    stats.rebuild_stats(conn)
+    conn.close()
+    resume_cache.cache.memory.clear()
+
+
+def resume_pdf(i, location='Bangalore'):
+    """A parseable one-page resume with a unique email and phone"""
+    return synthetic_pdf(
+        f'Candidate Number{i}\ncandidate{i}@example.com\n+91 98{i:08d}\n{location}\nPython, SQL\n'
+    )
+
+
+def save_candidate(client, i, **fields):
+    """Save a candidate through the API; returns its id"""
+    candidate = {'name': f'Candidate {i}', 'email': f'c{i}@example.com', 'phone': f'+91 98{i:08d}', 'location': 'Pune', **fields}
+    response = client.post('/api/save-candidate', json={'candidate': candidate})
+    assert response.json['success'], response.json
+    return response.json['candidate_id']
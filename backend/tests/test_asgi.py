@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+import asgi
+from conftest import save_candidate
+
+
+def call(method, path, body=b'', headers=(), query='', disconnect_after=None):
+    """Run one request through the ASGI app; returns (status, headers, body)"""
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(), 'http_version': '1.1',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers]
+    }
+    sent = []
+
+    async def run():
+        requests = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            if disconnect_after is None:
+                await asyncio.Event().wait()
+            await asyncio.sleep(disconnect_after)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        await asyncio.wait_for(asgi.app(scope, receive, send), 10)
+
+    asyncio.run(run())
+    response_headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], response_headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+
+@pytest.fixture
+def session(flask_app):
+    status, headers, _ = call('POST', '/api/login', json.dumps({'username': 'admin', 'password': 'admin123'}).encode(),
+                              [('Content-Type', 'application/json')])
+    assert status == 200
+    return [('Cookie', headers['set-cookie'].split(';', 1)[0])]
+
+
+def test_json_routes_answer_through_asgi(client, session):
+    save_candidate(client, 1)
+
+    status, headers, body = call('GET', '/api/candidates', headers=session, query='limit=5')
+
+    assert status == 200
+    assert headers['content-type'] == 'application/json'
+    assert [c['email'] for c in json.loads(body)['candidates']] == ['c1@example.com']
+    assert call('GET', '/api/candidates')[0] == 401
+
+
+def test_change_stream_is_served_from_the_loop(client, session, monkeypatch):
+    monkeypatch.setattr(asgi, 'CHANGE_STREAM_MAX_SECONDS', 0)
+    since = client.get('/api/changes', query_string={'since': 0}).json['seq']
+    candidate_id = save_candidate(client, 1)
+
+    status, headers, body = call('GET', '/api/changes/stream', headers=session, query=f'since={since}')
+
+    assert status == 200
+    assert headers['content-type'].startswith('text/event-stream')
+    events = [block for block in body.decode().split('\n\n') if block.startswith('id:')]
+    assert len(events) == 1
+    assert json.loads(events[0].split('data: ', 1)[1])['data']['id'] == candidate_id
+
+
+def test_a_disconnect_ends_the_change_stream(session):
+    status, _, body = call('GET', '/api/changes/stream', headers=session, disconnect_after=0.2)
+
+    assert status == 200
+    assert body.startswith(b'retry: 3000')
@@ -0,0 +1,47 @@
+import io
+import json
+import sqlite3
+
+import db
+from conftest import resume_pdf
+
+
+def batch_files(count):
+    return {'files': [(io.BytesIO(resume_pdf(i)), f'resume{i}.pdf') for i in range(count)], 'auto_save': '1'}
+
+
+def test_auto_save_batch_saves_every_parsed_candidate(client, database):
+    response = client.post('/api/upload-resumes', data=batch_files(3), content_type='multipart/form-data')
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [line['success'] for line in lines[:3]] == [True] * 3
+    assert sorted(line['filename'] for line in lines[3:6]) == ['resume0.pdf', 'resume1.pdf', 'resume2.pdf']
+    assert all(line['saved']['success'] for line in lines[3:6])
+    assert lines[-1] == {'done': True, 'total': 3, 'parsed': 3, 'saved': 3, 'failed': 0}
+    assert database.execute('SELECT COUNT(*) FROM candidates').fetchone()[0] == 3
+
+
+def test_aborted_auto_save_batch_saves_nothing(client, database):
+    response = client.post('/api/upload-resumes', data=batch_files(3), content_type='multipart/form-data')
+    lines = iter(response.response)
+    for _ in range(2):
+        assert json.loads(next(lines))['success']
+    # The client goes away before the summary line
+    response.close()
+
+    assert database.execute('SELECT COUNT(*) FROM candidates').fetchone()[0] == 0
+
+
+def test_streaming_batch_holds_no_write_lock(client):
+    response = client.post('/api/upload-resumes', data=batch_files(3), content_type='multipart/form-data')
+    lines = iter(response.response)
+    next(lines)
+    next(lines)
+
+    # Another writer gets the lock at once while the client reads slowly
+    other = sqlite3.connect(db.DATABASE, timeout=0)
+    other.execute('BEGIN IMMEDIATE')
+    other.rollback()
+    other.close()
+
+    assert json.loads(list(lines)[-1])['saved'] == 3
@@ -0,0 +1,52 @@
+import pytest
+
+import cache
+
+
+@pytest.fixture
+def users(flask_app, monkeypatch):
+    monkeypatch.setattr(cache, 'CACHE_VERSION_CHECK_SECONDS', 0)
+    with flask_app.app_context():
+        yield cache.VersionedCache('users', maxsize=2)
+
+
+def test_hits_misses_and_lru_eviction(users):
+    loads = []
+
+    def loader(key):
+        return lambda: loads.append(key) or key.upper()
+
+    assert [users.get(key, loader(key)) for key in ('a', 'b', 'a', 'c', 'b')] == ['A', 'B', 'A', 'C', 'B']
+
+    # c pushed out b, the least recently used
+    assert loads == ['a', 'b', 'c', 'b']
+    assert (users.stats()['hits'], users.stats()['misses']) == (1, 4)
+
+
+def test_a_write_from_another_connection_empties_the_cache(users, database):
+    users.get('admin', lambda: 'old')
+
+    database.execute("UPDATE users SET full_name = full_name WHERE username = 'admin'")
+    database.commit()
+
+    assert users.get('admin', lambda: 'new') == 'new'
+    assert users.stats()['invalidations'] == 1
+
+
+def test_a_load_overtaken_by_a_write_is_not_stored(users):
+    def racing_loader():
+        users.invalidate()
+        return 'stale'
+
+    assert users.get('admin', racing_loader) == 'stale'
+    assert users.get('admin', lambda: 'fresh') == 'fresh'
+
+
+def test_job_settings_are_read_back_at_once_after_an_update(client):
+    original = client.get('/api/job-settings').json['settings']
+    try:
+        client.post('/api/job-settings', json={**original, 'job_title': 'Data Engineer'})
+
+        assert client.get('/api/job-settings').json['settings']['job_title'] == 'Data Engineer'
+    finally:
+        client.post('/api/job-settings', json=original)
@@ -0,0 +1,87 @@
+from conftest import save_candidate
+
+
+def email_of(database, candidate_id):
+    return database.execute('SELECT email FROM candidates WHERE id = ?', (candidate_id,)).fetchone()[0]
+
+
+def test_single_update_to_another_candidates_email_is_a_conflict(client, database):
+    first = save_candidate(client, 1)
+    second = save_candidate(client, 2)
+
+    response = client.post('/api/update-candidate', json={'id': second, 'field': 'email', 'value': 'C1@Example.com'})
+
+    assert response.status_code == 409
+    assert response.json['duplicate_of'] == first
+    assert email_of(database, second) == 'c2@example.com'
+
+
+def test_single_update_to_own_email_is_allowed(client, database):
+    first = save_candidate(client, 1)
+
+    response = client.post('/api/update-candidate', json={'id': first, 'field': 'email', 'value': 'C1@example.com'})
+
+    assert response.status_code == 200
+    assert response.json['success']
+
+
+def test_batch_update_rejects_duplicate_rows_only(client, database):
+    first = save_candidate(client, 1)
+    second = save_candidate(client, 2)
+    third = save_candidate(client, 3)
+
+    response = client.patch('/api/candidates', json={'updates': [
+        {'id': second, 'changes': {'phone': '098 0000 0001', 'status': 'Shortlisted'}},
+        {'id': third, 'changes': {'email': 'new@example.com'}},
+        {'id': first, 'changes': {'email': 'New@example.com'}},
+    ]})
+
+    results = response.json['results']
+    assert response.json['updated'] == 1
+    assert results[0]['duplicate_of'] == first
+    assert results[1]['success']
+    assert results[2]['duplicate_of'] == third
+    assert email_of(database, third) == 'new@example.com'
+    assert email_of(database, first) == 'c1@example.com'
+
+
+def test_filter_update_cannot_set_email(client):
+    response = client.patch('/api/candidates', json={'filter': {'status': 'New'}, 'changes': {'email': 'x@example.com'}})
+
+    assert response.status_code == 400
+
+
+def test_filter_update_rejects_unknown_keys(client, database):
+    candidate_id = save_candidate(client, 1)
+
+    for filters in ({'status': 'New', 'bogus': 1}, {'stauts': 'New'}):
+        response = client.patch('/api/candidates', json={'filter': filters, 'changes': {'status': 'Rejected'}})
+        assert response.status_code == 400
+        assert response.json['error'].startswith('Unknown filter: ')
+
+    assert database.execute('SELECT status FROM candidates WHERE id = ?', (candidate_id,)).fetchone()[0] == 'New'
+
+
+def test_filter_update_applies_to_matching_rows(client, database):
+    first = save_candidate(client, 1)
+    second = save_candidate(client, 2, location='Delhi')
+
+    response = client.patch('/api/candidates', json={'filter': {'location': 'Delhi'}, 'changes': {'status': 'Hired'}})
+
+    assert response.json['ids'] == [second]
+    assert database.execute('SELECT status FROM candidates WHERE id = ?', (first,)).fetchone()[0] == 'New'
+
+
+def test_batch_update_reports_non_scalar_values_per_row(client, database):
+    first = save_candidate(client, 1)
+    second = save_candidate(client, 2)
+
+    response = client.patch('/api/candidates', json={'updates': [
+        {'id': first, 'changes': {'skills': ['Python', 'SQL']}},
+        {'id': second, 'changes': {'status': 'Shortlisted'}},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json['results'][0] == {'id': first, 'success': False, 'error': 'Value of skills must be a string or number'}
+    assert response.json['results'][1]['success']
+    assert database.execute('SELECT status FROM candidates WHERE id = ?', (second,)).fetchone()[0] == 'Shortlisted'
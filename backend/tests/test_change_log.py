@@ -0,0 +1,49 @@
+import changes
+from conftest import save_candidate as save
+
+
+def change_count(database):
+    return database.execute("SELECT COUNT(*) FROM change_log WHERE entity = 'candidate'").fetchone()[0]
+
+
+def test_update_that_changes_nothing_is_not_logged(client, database):
+    candidate_id = save(client, 1)
+    before = change_count(database)
+
+    client.post('/api/update-candidate', json={'id': candidate_id, 'field': 'status', 'value': 'New'})
+    assert change_count(database) == before
+
+    client.post('/api/update-candidate', json={'id': candidate_id, 'field': 'status', 'value': 'Shortlisted'})
+    assert change_count(database) == before + 1
+
+
+def test_update_trigger_has_the_guard(database):
+    sql = database.execute("SELECT sql FROM sqlite_master WHERE name = 'change_log_candidate_update'").fetchone()[0]
+
+    assert 'WHEN OLD.date IS NOT NEW.date' in sql
+    assert 'OR OLD.status IS NOT NEW.status' in sql
+
+
+def test_writes_prune_the_log(client, database, monkeypatch):
+    monkeypatch.setattr(changes, 'CHANGE_LOG_RETENTION', 2)
+    monkeypatch.setattr(changes, '_last_prune', 0.0)
+    for i in range(4):
+        save(client, i)
+
+    # The first write pruned; the rest fall within the once-a-minute interval
+    assert database.execute('SELECT COUNT(*) FROM change_log').fetchone()[0] == 5
+
+    monkeypatch.setattr(changes, '_last_prune', 0.0)
+    save(client, 9)
+    assert database.execute('SELECT COUNT(*) FROM change_log').fetchone()[0] == 2
+
+
+def test_prune_leaves_an_open_transaction_alone(database, monkeypatch):
+    monkeypatch.setattr(changes, '_last_prune', 0.0)
+    database.execute("INSERT INTO change_log (entity, action) VALUES ('candidate', 'upsert')")
+
+    changes.prune_periodically(database)
+
+    assert database.in_transaction
+    assert changes._last_prune == 0.0
+    database.rollback()
@@ -0,0 +1,42 @@
+import sqlite3
+
+import pytest
+
+import codes
+from conftest import save_candidate
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(':memory:')
+    codes.init_codes(conn.cursor())
+    yield conn.cursor()
+    conn.close()
+
+
+def test_permutation_is_a_bijection():
+    assert sorted(codes.permute(n, 2025, digits=3) for n in range(1000)) == list(range(1000))
+
+
+def test_codes_are_distinct_per_year_and_continue_across_calls(cursor):
+    first = codes.allocate_codes(cursor, 3, year=2025)
+    second = codes.allocate_codes(cursor, 2, year=2025)
+
+    assert len(set(first + second)) == 5
+    assert all(code.startswith('HR2025-') and len(code) == len('HR2025-') + codes.CANDIDATE_CODE_DIGITS for code in first)
+    assert codes.allocate_code(cursor, year=2026).startswith('HR2026-')
+
+
+def test_a_full_year_is_reported(cursor, monkeypatch):
+    monkeypatch.setattr(codes, 'CANDIDATE_CODE_DIGITS', 1)
+    codes.allocate_codes(cursor, 10, year=2025)
+
+    with pytest.raises(ValueError, match='raise CANDIDATE_CODE_DIGITS'):
+        codes.allocate_code(cursor, year=2025)
+
+
+def test_saved_candidates_get_distinct_codes(client, database):
+    for i in range(3):
+        save_candidate(client, i)
+
+    assert database.execute('SELECT COUNT(DISTINCT code) FROM candidates').fetchone()[0] == 3
@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+import dedupe
+from conftest import save_candidate
+
+
+@pytest.mark.parametrize('a, b', [
+    ('Priya.Sharma+jobs@GMail.com', 'priyasharma@googlemail.com'),
+    (' ravi@example.com ', 'RAVI@example.com'),
+])
+def test_equivalent_emails_share_a_key(a, b):
+    assert dedupe.email_key(a) == dedupe.email_key(b)
+
+
+def test_dots_only_ignored_for_gmail():
+    assert dedupe.email_key('a.b@example.com') != dedupe.email_key('ab@example.com')
+
+
+@pytest.mark.parametrize('phone', ['098765 43210', '+91 98765-43210', '0091 9876543210', '9876543210'])
+def test_phone_forms_normalize_to_e164(phone):
+    assert dedupe.phone_key(phone) == '+919876543210'
+
+
+def test_empty_values_have_no_key():
+    assert dedupe.candidate_keys('', '  ', None) == (None, None, None)
+
+
+def test_name_key_matches_spelling_variants_and_order():
+    assert dedupe.name_key('Sharma Priya') == dedupe.name_key('Priya Sharmaa')
+    assert dedupe.name_key('Priya S.') == dedupe.name_key('Priya')
+    assert dedupe.name_key('Priya S.') != dedupe.name_key('Priya Sharma')
+
+
+def test_soundex():
+    assert [dedupe.soundex(word) for word in ('robert', 'rupert', 'ashcraft', 'tymczak')] == ['R163', 'R163', 'A261', 'T522']
+
+
+def test_save_refuses_a_reformatted_phone(client):
+    first = save_candidate(client, 1)
+
+    response = client.post('/api/save-candidate', json={'candidate': {
+        'email': 'other@example.com', 'phone': '098000 00001', 'location': 'Pune'
+    }})
+
+    assert not response.json['success']
+    assert response.json['duplicate_of'] == first
+
+
+def test_find_clusters_links_through_shared_keys():
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute('CREATE TABLE candidates (id INTEGER PRIMARY KEY, email TEXT, phone TEXT, name TEXT, dob TEXT)')
+    dedupe.init_dedupe(conn.cursor())
+    conn.executemany('INSERT INTO candidates (id, email, phone, name, dob) VALUES (?, ?, ?, ?, ?)', [
+        (1, 'a@example.com', '9876543210', 'Asha Rao', ''),
+        (2, 'A+x@example.com', '9000000001', 'Asha R', ''),
+        (3, 'c@example.com', '+91 90000 00001', 'Someone Else', ''),
+        (4, 'd@example.com', '9111111111', 'Vikram Singh', '1990-01-01'),
+        (5, 'e@example.com', '9222222222', 'Vikram Singh', '1990-01-01'),
+        (6, 'f@example.com', '9333333333', 'Alone', ''),
+    ])
+    dedupe.rebuild_keys(conn)
+
+    clusters = dedupe.find_clusters(conn)
+
+    assert sorted(sorted(cluster['ids']) for cluster in clusters) == [[1, 2, 3], [4, 5]]
+    assert not [cluster for cluster in dedupe.find_clusters(conn, use_names=False) if 4 in cluster['ids']]
@@ -0,0 +1,34 @@
+import csv
+import gzip
+import io
+import json
+
+from conftest import save_candidate
+
+
+def test_ndjson_export_has_one_object_per_candidate(client):
+    for i in range(3):
+        save_candidate(client, i, location='Mumbai' if i else 'Pune')
+
+    response = client.get('/api/candidates/export', query_string={'location': 'Mumbai', 'fields': 'name,email'})
+
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(row['email'] for row in rows) == ['c1@example.com', 'c2@example.com']
+    assert all(set(row) == {'id', 'name', 'email'} for row in rows)
+
+
+def test_gzipped_csv_export_starts_with_a_header(client):
+    save_candidate(client, 1)
+
+    response = client.get('/api/candidates/export', query_string={'format': 'csv', 'fields': 'name,location', 'gzip': '1'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.get_data()).decode())))
+    assert rows[0] == ['id', 'name', 'location']
+    assert rows[1][1:] == ['Candidate 1', 'Pune']
+
+
+def test_export_rejects_unknown_formats_and_fields(client):
+    assert client.get('/api/candidates/export', query_string={'format': 'xml'}).status_code == 400
+    assert client.get('/api/candidates/export', query_string={'fields': 'salary'}).status_code == 400
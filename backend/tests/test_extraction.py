@@ -0,0 +1,31 @@
+import resume_parser
+
+
+def test_fields_are_found_in_one_pass():
+    text = 'Asha Rao\nasha.rao@example.com | +91 98765 43210\nBased in Bengaluru, open to Pune\nSkills: python3, C++, C#, JavaScript'
+
+    info = resume_parser.extract_candidate_info(text)
+
+    assert info['email'] == 'asha.rao@example.com'
+    assert info['phone'] == '+91 98765 43210'
+    # Aliases report their canonical name; the first location wins
+    assert info['location'] == 'Bangalore'
+    assert info['skills'] == 'Python, C++, C#, JavaScript'
+
+
+def test_terms_match_whole_words_longest_first():
+    found = resume_parser.GAZETTEER.scan('moved from new delhi; javascript and java, not javanese')
+
+    assert found['location'] == ['New Delhi']
+    assert found['skills'] == ['JavaScript', 'Java']
+
+
+def test_terms_file_adds_names_and_aliases(tmp_path):
+    path = tmp_path / 'skills.txt'
+    path.write_text('# extra skills\nKubernetes: k8s, kube\n\nTerraform\n', encoding='utf-8')
+
+    entries = resume_parser.load_terms_file(str(path))
+    gazetteer = resume_parser.Gazetteer({'skills': entries})
+
+    assert entries == {'Kubernetes': ['k8s', 'kube'], 'Terraform': []}
+    assert gazetteer.scan('ran k8s with terraform')['skills'] == ['Kubernetes', 'Terraform']
@@ -0,0 +1,61 @@
+import gzip
+
+import messaging
+from conftest import save_candidate
+
+
+def get(client, url, etag=None, **headers):
+    if etag:
+        headers['If-None-Match'] = etag
+    return client.get(url, headers=headers)
+
+
+def test_unchanged_list_is_answered_with_304(client):
+    save_candidate(client, 1)
+    first = get(client, '/api/candidates?limit=2')
+
+    again = get(client, '/api/candidates?limit=2', first.headers['ETag'])
+
+    assert again.status_code == 304
+    assert again.headers['ETag'] == first.headers['ETag']
+
+
+def test_etag_depends_on_the_query_string(client):
+    save_candidate(client, 1)
+    etag = get(client, '/api/candidates?limit=2').headers['ETag']
+
+    assert get(client, '/api/candidates?status=Hired', etag).status_code == 200
+    # Same arguments in another order are the same variant
+    a = get(client, '/api/candidates?limit=2&status=New').headers['ETag']
+    assert get(client, '/api/candidates?status=New&limit=2', a).status_code == 304
+
+
+def test_a_write_changes_the_etag(client):
+    save_candidate(client, 1)
+    etag = get(client, '/api/candidates').headers['ETag']
+
+    save_candidate(client, 2)
+
+    assert get(client, '/api/candidates', etag).status_code == 200
+
+
+def test_large_json_is_gzip_compressed(client):
+    for i in range(20):
+        save_candidate(client, i)
+
+    response = get(client, '/api/candidates', **{'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'c19@example.com' in gzip.decompress(response.get_data())
+
+
+def test_etags_only_follow_the_entities_a_route_reads(client, flask_app):
+    save_candidate(client, 1)
+    candidates = get(client, '/api/candidates').headers['ETag']
+    dashboard = get(client, '/api/stats').headers['ETag']
+
+    with flask_app.app_context():
+        messaging.log_message('sms', '+91 9800000001', None, 'Hi')
+
+    assert get(client, '/api/candidates', candidates).status_code == 304
+    assert get(client, '/api/stats', dashboard).status_code == 200
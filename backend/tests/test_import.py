@@ -0,0 +1,70 @@
+import io
+
+import importer
+from conftest import save_candidate
+
+
+def import_csv(client, text):
+    return client.post(
+        '/api/import-candidates', data={'file': (io.BytesIO(text.encode()), 'candidates.csv')},
+        content_type='multipart/form-data'
+    )
+
+
+def test_rows_are_imported_with_codes(client, database):
+    response = import_csv(client, 'name,email,phone,location\nA,a@example.com,9000000001,Pune\nB,b@example.com,9000000002,Delhi\n')
+
+    assert response.json['imported'] == 2
+    codes = [row[0] for row in database.execute('SELECT code FROM candidates ORDER BY id')]
+    assert len(set(codes)) == 2
+
+
+def test_digitless_phones_are_not_duplicates_of_each_other(client):
+    response = import_csv(client, 'name,email,phone,location\n' + ''.join(
+        f'C{i},c{i}@example.com,N/A,Pune\n' for i in range(3)
+    ))
+
+    assert response.json['imported'] == 3
+    assert response.json['errors'] == []
+
+
+def test_duplicates_in_the_file_and_in_the_table_are_skipped(client):
+    save_candidate(client, 1)
+
+    response = import_csv(client, 'name,email,phone,location\n'
+                          'X,C1@example.com,9111111111,Pune\n'
+                          'Y,y@example.com,098765 43210,Pune\n'
+                          'Z,z@example.com,+91 98765-43210,Pune\n'
+                          'W,w@example.com,9222222222,\n')
+
+    assert response.json['imported'] == 1
+    errors = {error['row']: error['error'] for error in response.json['errors']}
+    assert sorted(errors) == [2, 4, 5]
+    assert errors[4] == 'Duplicate phone +91 98765-43210 in file'
+
+
+def test_headers_from_other_systems_are_mapped(client, database):
+    response = import_csv(client, 'Full Name,E-mail,Mobile Number,City,Key Skills,Notes\nAsha,asha@example.com,9000000001,Pune,Python,ignored\n')
+
+    assert response.json['imported'] == 1
+    row = database.execute('SELECT name, phone, location, skills FROM candidates').fetchone()
+    assert tuple(row) == ('Asha', '9000000001', 'Pune', 'Python')
+
+
+def test_duplicates_are_caught_across_chunks(client, monkeypatch):
+    monkeypatch.setattr(importer, 'IMPORT_CHUNK_SIZE', 2)
+
+    response = import_csv(client, 'name,email,phone,location\n' + ''.join(
+        f'C{i},c{i % 3}@example.com,90000000{i:02d},Pune\n' for i in range(5)
+    ))
+
+    assert response.json['imported'] == 3
+    assert [error['row'] for error in response.json['errors']] == [5, 6]
+
+
+def test_other_file_types_are_rejected(client):
+    response = client.post(
+        '/api/import-candidates', data={'file': (io.BytesIO(b'{}'), 'candidates.json')}, content_type='multipart/form-data'
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import save_candidate
+
+
+@pytest.fixture
+def job(client):
+    """Set the job's requirements; the original settings come back afterwards"""
+    original = client.get('/api/job-settings').json['settings']
+
+    def set_job(requirements, location):
+        assert client.post('/api/job-settings', json={**original, 'requirements': requirements, 'location': location}).json['success']
+
+    yield set_job
+    client.post('/api/job-settings', json=original)
+
+
+def ranked(client, **params):
+    return [(c['email'], sorted(c['matched'])) for c in client.get('/api/candidates/match', query_string=params).json['candidates']]
+
+
+def test_candidates_are_ranked_by_skills_then_location(client, job):
+    save_candidate(client, 1, skills='Python, SQL')
+    save_candidate(client, 2, skills='python3', location='Mumbai')
+    save_candidate(client, 3, skills='Java')
+    job('Python, SQL', 'Pune')
+
+    assert ranked(client) == [
+        ('c1@example.com', ['Pune', 'Python', 'SQL']),
+        ('c2@example.com', ['Python']),
+        ('c3@example.com', ['Pune']),
+    ]
+    assert [email for email, _ in ranked(client, min_score=0.5)] == ['c1@example.com', 'c2@example.com']
+
+
+def test_edited_skills_are_reindexed(client, job):
+    save_candidate(client, 1, skills='Python')
+    other = save_candidate(client, 2, skills='Java')
+    job('SQL', '')
+    assert ranked(client) == []
+
+    client.post('/api/update-candidate', json={'id': other, 'field': 'skills', 'value': 'Java, SQL'})
+
+    assert ranked(client) == [('c2@example.com', ['SQL'])]
@@ -0,0 +1,105 @@
+import pytest
+
+import messaging
+
+
+@pytest.fixture
+def worker(flask_app, monkeypatch):
+    """A worker whose transports answer at once; run its steps by hand"""
+    sent = []
+    monkeypatch.setitem(messaging.TRANSPORTS, 'email', lambda job: sent.append(job['recipient']) or {'success': True})
+    monkeypatch.setitem(messaging.TRANSPORTS, 'sms', lambda job: {'success': False, 'error': 'provider down'})
+    worker = messaging.MessageWorker()
+    worker.sent = sent
+    with flask_app.app_context():
+        yield worker
+
+
+def queue(client, **fields):
+    response = client.post('/api/send-message', json={
+        'email': 'c1@example.com', 'phone': '+91 9800000001', 'message': 'Hello', **fields
+    })
+    assert response.status_code == 202
+    return response.json['jobs']
+
+
+def job_status(client, job_id):
+    return client.get(f'/api/message-jobs/{job_id}').json['job']
+
+
+def test_send_message_queues_a_job_per_channel(client):
+    jobs = queue(client)
+
+    response = client.get('/api/message-jobs', query_string={'ids': f"{jobs['sms']},{jobs['email']}"})
+    assert [job['channel'] for job in response.json['jobs']] == ['sms', 'email']
+    assert {job['status'] for job in response.json['jobs']} == {'queued'}
+
+
+def test_worker_delivers_a_claimed_job(client, worker):
+    jobs = queue(client, send_sms=False)
+
+    job = worker.claim_next('email')
+    assert worker.claim_next('email') is None
+    worker.deliver(job)
+
+    assert worker.sent == ['c1@example.com']
+    assert job_status(client, jobs['email'])['status'] == 'sent'
+
+
+def test_failed_sends_back_off_then_fail(client, worker, database, monkeypatch):
+    monkeypatch.setattr(messaging, 'MESSAGE_MAX_ATTEMPTS', 2)
+    jobs = queue(client, send_email=False)
+
+    worker.deliver(worker.claim_next('sms'))
+    status = job_status(client, jobs['sms'])
+    assert (status['status'], status['attempts'], status['last_error']) == ('queued', 1, 'provider down')
+    # Not due again until the backoff has passed
+    assert worker.claim_next('sms') is None
+
+    database.execute('UPDATE message_jobs SET next_attempt_at = 0')
+    database.commit()
+    worker.deliver(worker.claim_next('sms'))
+    assert job_status(client, jobs['sms'])['status'] == 'failed'
+
+
+LEGACY_LOG = f"""{'=' * 60}
+EMAIL - 2024-01-05 10:00:00
+To: old@example.com
+Subject: Interview
+Message:
+Dear candidate,
+see you on Monday.
+{'=' * 60}
+SMS - 2024-01-05 10:01:00
+To: +91 9800000001
+Message: Interview on Monday
+"""
+
+
+def test_message_log_pages_newest_first(client, flask_app):
+    with flask_app.app_context():
+        for i in range(5):
+            messaging.log_message('sms', f'+91 98000000{i:02d}', None, f'message {i}')
+
+    first = client.get('/api/message-log', query_string={'limit': 3}).json
+    second = client.get('/api/message-log', query_string={'limit': 3, 'before': first['next_before']}).json
+
+    assert [m['message'] for m in first['messages'] + second['messages']] == [f'message {i}' for i in range(4, -1, -1)]
+    assert second['next_before'] is None
+    assert 'subject' not in first['messages'][0]
+
+
+def test_legacy_log_is_imported_once(client, flask_app, tmp_path):
+    path = tmp_path / 'sent_messages.log'
+    path.write_text(LEGACY_LOG, encoding='utf-8')
+
+    with flask_app.app_context():
+        assert messaging.import_legacy_log(str(path)) == 2
+        assert messaging.import_legacy_log(str(path)) == 0
+
+    sms, email = client.get('/api/message-log').json['messages']
+    assert email == {
+        'id': email['id'], 'type': 'email', 'timestamp': '2024-01-05 10:00:00', 'to': 'old@example.com',
+        'subject': 'Interview', 'message': 'Dear candidate,\nsee you on Monday.'
+    }
+    assert (sms['type'], sms['to'], sms['message']) == ('sms', '+91 9800000001', 'Interview on Monday')
@@ -0,0 +1,56 @@
+import os
+
+import metrics
+
+
+def test_metrics_are_off_without_a_token(client):
+    assert client.get('/metrics').status_code == 403
+
+
+def test_metrics_need_the_token(client, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_TOKEN', 'secret')
+    client.get('/api/candidates')
+
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert 'hr_http_request_duration_seconds_count{method="GET",endpoint="/api/candidates",status="200"}' in response.get_data(as_text=True)
+
+
+def test_public_metrics_are_an_explicit_opt_in(client, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_PUBLIC', True)
+
+    assert client.get('/metrics').status_code == 200
+
+
+def test_profiles_are_written_but_their_path_is_not_sent(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, 'PROFILE_TOKEN', 'profile-me')
+    monkeypatch.setattr(metrics, 'PROFILE_DIR', str(tmp_path))
+
+    response = client.get('/api/candidates', headers={'X-Profile': 'profile-me'})
+
+    assert response.status_code == 200
+    assert not [header for header in response.headers.keys() if header.lower().startswith('x-profile')]
+    assert sorted(os.path.splitext(name)[1] for name in os.listdir(tmp_path)) == ['.prof', '.txt']
+
+
+def test_histogram_buckets_are_cumulative_and_labels_escaped():
+    histogram = metrics.Histogram('test_seconds', 'Test', ('route',), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, 'say "hi"')
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{route="say \\"hi\\"",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="say \\"hi\\"",le="1"} 2' in lines
+    assert 'test_seconds_bucket{route="say \\"hi\\"",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="say \\"hi\\""} 3' in lines
+
+
+def test_fast_sampled_requests_write_no_profile(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, 'PROFILE_SAMPLE_RATE', 1.0)
+    monkeypatch.setattr(metrics, 'PROFILE_SLOW_MS', 60000)
+    monkeypatch.setattr(metrics, 'PROFILE_DIR', str(tmp_path))
+
+    assert client.get('/api/candidates').status_code == 200
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BACKEND
+
+import app as backend
+import db
+
+BOOT = 'import app; app.create_app(start_workers=False)'
+
+
+def boot_together(database_path, processes):
+    env = {**os.environ, 'DATABASE_PATH': database_path, 'MESSAGE_WORKERS_ENABLED': '0', 'PYTHONPATH': BACKEND}
+    # Run from the database's folder, where create_app() makes its uploads folder
+    cwd = os.path.dirname(database_path)
+    started = [
+        subprocess.Popen([sys.executable, '-c', BOOT], cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        for _ in range(processes)
+    ]
+    return [(process.wait(), process.communicate()) for process in started]
+
+
+def test_concurrent_boots_migrate_once(tmp_path):
+    for trial in range(3):
+        database_path = str(tmp_path / f'boot{trial}.db')
+        results = boot_together(database_path, 6)
+
+        for returncode, (stdout, stderr) in results:
+            assert returncode == 0, stderr.decode()
+        assert sum(b'Database initialized' in stdout for _, (stdout, _) in results) == 1
+
+        conn = sqlite3.connect(database_path)
+        assert conn.execute('SELECT version FROM schema_version').fetchone()[0] == backend.SCHEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'").fetchone()[0] == 1
+        assert conn.execute('SELECT COUNT(*) FROM job_settings').fetchone()[0] == 1
+        conn.close()
+
+
+def test_migrate_is_a_no_op_once_current(flask_app):
+    with flask_app.app_context():
+        assert db.schema_version(db.get_db()) == backend.SCHEMA_VERSION
+        assert backend.migrate() is False
+
+
+def test_old_sqlite_is_refused():
+    db.check_sqlite_version((3, 35, 0))
+    with pytest.raises(RuntimeError, match='3.35.0 or newer'):
+        db.check_sqlite_version((3, 31, 1))
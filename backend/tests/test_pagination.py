@@ -0,0 +1,52 @@
+import pytest
+
+from conftest import save_candidate
+
+
+def pages(client, limit, **params):
+    cursor = None
+    while True:
+        query = {'limit': limit, **params, **({'cursor': cursor} if cursor else {})}
+        response = client.get('/api/candidates', query_string=query)
+        assert response.status_code == 200
+        yield [candidate['id'] for candidate in response.json['candidates']]
+        cursor = response.json['next_cursor']
+        if cursor is None:
+            return
+
+
+def test_pages_cover_every_candidate_once_newest_first(client):
+    ids = [save_candidate(client, i) for i in range(7)]
+
+    result = list(pages(client, 3))
+
+    assert [len(page) for page in result] == [3, 3, 1]
+    assert [candidate_id for page in result for candidate_id in page] == ids[::-1]
+
+
+def test_inserts_between_pages_do_not_shift_later_pages(client):
+    ids = [save_candidate(client, i) for i in range(6)]
+    walk = pages(client, 2)
+
+    first = next(walk)
+    save_candidate(client, 99)
+    rest = [candidate_id for page in walk for candidate_id in page]
+
+    assert first + rest == ids[::-1]
+
+
+def test_pages_with_a_filter(client):
+    ids = [save_candidate(client, i) for i in range(5)]
+    client.patch('/api/candidates', json={'updates': [{'id': i, 'changes': {'status': 'Shortlisted'}} for i in ids[1::2]]})
+
+    result = list(pages(client, 1, status='Shortlisted'))
+
+    assert [candidate_id for page in result for candidate_id in page] == ids[1::2][::-1]
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'WzEsIDJd'])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get('/api/candidates', query_string={'limit': 2, 'cursor': cursor})
+
+    assert response.status_code == 400
+    assert response.json['error'] == 'Invalid cursor'
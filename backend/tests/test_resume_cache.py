@@ -0,0 +1,47 @@
+import pytest
+
+import resume_cache
+
+
+@pytest.fixture
+def small_cache(flask_app):
+    with flask_app.app_context():
+        yield resume_cache.ResumeCache(memory_entries=2, max_bytes=250)
+
+
+def stored(database):
+    return database.execute('SELECT bytes, entries FROM resume_cache_size').fetchone()
+
+
+def actual(database):
+    return database.execute('SELECT COALESCE(SUM(size), 0), COUNT(*) FROM resume_cache').fetchone()
+
+
+def test_size_counter_follows_stores_and_replacements(small_cache, database):
+    small_cache.put('a', 'x' * 100, {'name': 'A'})
+    small_cache.put('b', 'y' * 50, {'name': 'B'})
+    small_cache.put('a', 'x' * 70, {'name': 'A'})
+
+    assert tuple(stored(database)) == tuple(actual(database)) == (120, 2)
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(small_cache, database):
+    for key in 'abc':
+        small_cache.put(key, 'x' * 100, {})
+    # 'a' was the oldest; a read of 'b' from disk makes 'c' older than it
+    small_cache.memory.clear()
+    assert small_cache.get('b')[2] == 'disk'
+    small_cache.put('d', 'x' * 100, {})
+
+    assert [row[0] for row in database.execute('SELECT hash FROM resume_cache ORDER BY hash')] == ['b', 'd']
+    assert tuple(stored(database)) == tuple(actual(database)) == (200, 2)
+    assert small_cache.stats()['evictions'] == 2
+
+
+def test_memory_tier_answers_repeat_lookups(small_cache):
+    small_cache.put('a', 'text', {'email': 'a@example.com'})
+
+    text, info, tier = small_cache.get('a')
+
+    assert (text, info, tier) == ('text', {'email': 'a@example.com'}, 'memory')
+    assert small_cache.get('missing') is None
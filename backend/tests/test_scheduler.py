@@ -0,0 +1,81 @@
+import pytest
+
+from conftest import save_candidate
+
+
+@pytest.fixture
+def room_id(client):
+    response = client.post('/api/interview-rooms', json={'name': 'Room A'})
+    return response.json['id']
+
+
+def generate(client, room_id, **day):
+    return client.post('/api/interview-slots', json={'room_ids': [room_id], 'date': '2025-05-02', 'minutes': 30, **day})
+
+
+def test_generated_day_is_split_into_slots(client, room_id):
+    response = generate(client, room_id, start='10:00', end='12:00')
+
+    assert response.json['created'] == 4
+    assert response.json['rejected'] == []
+
+
+@pytest.mark.parametrize('day', [{'end': '12:00'}, {'start': '10:00'}, {'start': '12:00', 'end': '10:00'}, {'start': '10:00', 'end': '10:00'}])
+def test_generated_day_needs_a_start_before_its_end(client, room_id, database, day):
+    response = generate(client, room_id, **day)
+
+    assert response.status_code == 400
+    assert database.execute('SELECT COUNT(*) FROM interview_slots').fetchone()[0] == 0
+
+
+def slot(client, room_id, start, end):
+    response = client.post('/api/interview-slots', json={'slots': [
+        {'room_id': room_id, 'starts_at': f'2025-05-02 {start}', 'ends_at': f'2025-05-02 {end}'}
+    ]})
+    return response.json
+
+
+def test_overlapping_slots_in_a_room_are_rejected(client, room_id):
+    other_room = client.post('/api/interview-rooms', json={'name': 'Room B'}).json['id']
+    first = slot(client, room_id, '10:00', '10:30')['ids'][0]
+
+    clash = slot(client, room_id, '10:15', '10:45')
+    assert clash['created'] == 0
+    assert clash['rejected'][0]['error'] == f'Overlaps slot {first}'
+    assert slot(client, other_room, '10:15', '10:45')['created'] == 1
+    assert slot(client, room_id, '10:30', '11:00')['created'] == 1
+
+
+def test_booking_refuses_double_bookings_and_syncs_the_candidate(client, room_id, database):
+    other_room = client.post('/api/interview-rooms', json={'name': 'Room B', 'location': 'Pune office'}).json['id']
+    morning = slot(client, other_room, '10:00', '10:30')['ids'][0]
+    overlapping = slot(client, room_id, '10:15', '10:45')['ids'][0]
+    first, second = save_candidate(client, 1), save_candidate(client, 2)
+
+    assert client.post(f'/api/interview-slots/{morning}/book', json={'candidate_id': first}).json['success']
+    assert client.post(f'/api/interview-slots/{morning}/book', json={'candidate_id': second}).status_code == 409
+    assert client.post(f'/api/interview-slots/{overlapping}/book', json={'candidate_id': first}).status_code == 409
+
+    row = database.execute('SELECT interview_date, interview_time, interview_location FROM candidates WHERE id = ?', (first,)).fetchone()
+    assert tuple(row) == ('2025-05-02', '10:00', 'Room B, Pune office')
+
+    assert client.post(f'/api/interview-slots/{morning}/release').json['candidate_id'] == first
+    row = database.execute('SELECT interview_date FROM candidates WHERE id = ?', (first,)).fetchone()
+    assert row[0] == ''
+
+
+def test_auto_assign_fills_parallel_rooms_first(client, room_id):
+    other_room = client.post('/api/interview-rooms', json={'name': 'Room B'}).json['id']
+    for room in (room_id, other_room):
+        generate(client, room, start='10:00', end='11:00')
+    candidates = [save_candidate(client, i) for i in range(6)]
+
+    response = client.post('/api/interviews/auto-assign', json={'candidate_ids': candidates, 'date_from': '2025-05-02'}).json
+
+    assert [(a['candidate_id'], a['starts_at'][-5:]) for a in response['assignments']] == [
+        (candidates[0], '10:00'), (candidates[1], '10:00'), (candidates[2], '10:30'), (candidates[3], '10:30')
+    ]
+    assert [u['candidate_id'] for u in response['unassigned']] == candidates[4:]
+
+    again = client.post('/api/interviews/auto-assign', json={'candidate_ids': candidates[:1]}).json
+    assert again['unassigned'] == [{'candidate_id': candidates[0], 'error': 'Already scheduled in this window'}]
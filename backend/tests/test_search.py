@@ -0,0 +1,18 @@
+import search
+from conftest import save_candidate as save
+
+
+def test_snippet_escapes_resume_text(client, database):
+    candidate_id = save(client, 1, skills='<img src=x onerror=alert(1)> Kubernetes & Go')
+
+    response = client.get('/api/candidates/search?q=kubernetes')
+
+    [candidate] = response.json['candidates']
+    assert candidate['id'] == candidate_id
+    assert '<img' not in candidate['snippet']
+    assert '&lt;img src=x onerror=alert(1)&gt; <mark>Kubernetes</mark> &amp; Go' in candidate['snippet']
+
+
+def test_snippet_html():
+    assert search.snippet_html('a <b> \x02hit\x03') == 'a &lt;b&gt; <mark>hit</mark>'
+    assert search.snippet_html(None) is None
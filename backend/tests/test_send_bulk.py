@@ -0,0 +1,31 @@
+import pytest
+
+from conftest import save_candidate
+
+
+def message_sent(database, candidate_id):
+    return database.execute('SELECT message_sent FROM candidates WHERE id = ?', (candidate_id,)).fetchone()[0]
+
+
+def test_only_candidates_with_a_queued_job_are_marked(client, database):
+    with_phone = save_candidate(client, 1)
+    without_phone = save_candidate(client, 2)
+    database.execute("UPDATE candidates SET phone = '' WHERE id = ?", (without_phone,))
+    database.commit()
+
+    response = client.post('/api/send-bulk', json={
+        'candidate_ids': [with_phone, without_phone], 'message': 'Hi {name}', 'send_email': False
+    })
+
+    assert response.status_code == 202
+    assert response.json['jobs_queued'] == 1
+    assert response.json['skipped'] == [without_phone]
+    assert message_sent(database, with_phone) == 1
+    assert message_sent(database, without_phone) == 0
+
+
+@pytest.mark.parametrize('filters', [{'message_sent': 'yes'}, {'message_sent': 2}, {'location': ['Pune']}])
+def test_invalid_filters_are_rejected(client, filters):
+    response = client.post('/api/send-bulk', json={'status': 'New', 'message': 'Hi', **filters})
+
+    assert response.status_code == 400
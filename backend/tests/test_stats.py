@@ -0,0 +1,39 @@
+import stats
+from conftest import save_candidate
+
+
+def dashboard(client):
+    return client.get('/api/stats').json['stats']
+
+
+def test_counters_follow_inserts_updates_and_deletes(client, database):
+    first = save_candidate(client, 1)
+    save_candidate(client, 2, location='Mumbai')
+    client.post('/api/update-candidate', json={'id': first, 'field': 'status', 'value': 'Shortlisted'})
+    client.post('/api/send-message', json={'candidate_id': first, 'email': 'c1@example.com', 'message': 'Hi', 'send_sms': False})
+
+    result = dashboard(client)
+    assert result['total'] == 2
+    assert result['by_status'] == {'New': 1, 'Shortlisted': 1}
+    assert sorted(result['by_location'], key=lambda item: item['location']) == [
+        {'location': 'Mumbai', 'count': 1}, {'location': 'Pune', 'count': 1}
+    ]
+    assert (result['message_sent'], result['not_contacted']) == (1, 1)
+
+    database.execute('DELETE FROM candidates WHERE id = ?', (first,))
+    database.commit()
+    result = dashboard(client)
+    assert (result['total'], result['by_status'], result['message_sent']) == (1, {'New': 1}, 0)
+    assert stats.verify_stats(database) == []
+
+
+def test_rebuild_repairs_drifted_counters(client, database):
+    save_candidate(client, 1)
+    database.execute("UPDATE candidate_stats SET count = 7 WHERE dimension = 'total'")
+    database.commit()
+    assert stats.verify_stats(database) == [{'dimension': 'total', 'value': '', 'counter': 7, 'actual': 1}]
+
+    stats.rebuild_stats(database)
+
+    assert stats.verify_stats(database) == []
+    assert dashboard(client)['total'] == 1
@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import tracemalloc
+
+import PyPDF2
+import pytest
+
+import resume_parser
+from conftest import resume_pdf
+from sample_resumes import synthetic_pdf
+
+
+@pytest.mark.parametrize('in_pool', [True, False])
+def test_single_upload_is_parsed(client, monkeypatch, in_pool):
+    monkeypatch.setattr(resume_parser, 'RESUME_PARSE_IN_POOL', in_pool)
+    content = resume_pdf(5)
+    before = set(os.listdir(tempfile.gettempdir()))
+
+    response = client.post(
+        '/api/upload-resume', data={'file': (io.BytesIO(content), 'cv.pdf')}, content_type='multipart/form-data'
+    )
+
+    assert response.json['success']
+    assert response.json['candidate']['email'] == 'candidate5@example.com'
+    assert response.json['metadata']['bytes'] == len(content)
+    # The copy handed to the pool is removed afterwards
+    assert set(os.listdir(tempfile.gettempdir())) - before == set()
+
+
+def test_parse_resume_file_reports_a_missing_file():
+    result = resume_parser.parse_resume_file('cv.pdf', '/nonexistent/cv.pdf')
+
+    assert result['success'] is False
+
+
+def test_peak_memory_is_only_measured_in_the_pool(client, monkeypatch):
+    monkeypatch.setattr(resume_parser, 'RESUME_PARSE_IN_POOL', True)
+    response = client.post(
+        '/api/upload-resume', data={'file': (io.BytesIO(resume_pdf(6)), 'cv.pdf')}, content_type='multipart/form-data'
+    )
+
+    assert response.json['metadata']['peak_memory_kb'] > 0
+    assert not tracemalloc.is_tracing()
+    with resume_parser.measure_peak_memory() as memory:
+        pass
+    assert memory == {}
+
+
+def two_page_pdf(first, second):
+    writer = PyPDF2.PdfWriter()
+    for text in (first, second):
+        writer.add_page(PyPDF2.PdfReader(io.BytesIO(synthetic_pdf(text))).pages[0])
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def test_early_stop_waits_for_a_skill():
+    contact = 'Candidate Number1\ncandidate1@example.com\n+91 9800000001\nPune\n'
+
+    text, metadata = resume_parser.extract_text_from_pdf(two_page_pdf(contact, 'Skills: Python, SQL\n'), stop_when_complete=True)
+    assert metadata['pages_parsed'] == 2
+    assert 'Python' in resume_parser.extract_candidate_info(text)['skills']
+
+    _, metadata = resume_parser.extract_text_from_pdf(two_page_pdf(contact + 'Python\n', 'Skills: SQL\n'), stop_when_complete=True)
+    assert metadata == {'page_count': 2, 'pages_parsed': 1, 'truncated': False, 'stopped_early': True}
@@ -0,0 +1,67 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+import app as backend
+from conftest import resume_pdf
+
+
+def zipped(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def upload(client, *files):
+    return client.post('/api/upload-resumes', data={'files': list(files)}, content_type='multipart/form-data')
+
+
+@pytest.fixture
+def no_decompression(monkeypatch):
+    def read(self, name, pwd=None):
+        raise AssertionError('a member was decompressed')
+    monkeypatch.setattr(zipfile.ZipFile, 'read', read)
+
+
+def test_zip_members_are_parsed_and_others_reported(client):
+    archive = zipped([('a/one.pdf', resume_pdf(1)), ('two.pdf', resume_pdf(2)), ('notes.txt', b'x'), ('__MACOSX/._one.pdf', b'')])
+    lines = [json.loads(line) for line in upload(client, (archive, 'batch.zip')).get_data(as_text=True).splitlines()]
+
+    assert lines[0] == {'filename': 'notes.txt', 'success': False, 'error': 'Invalid file type'}
+    assert sorted(line['filename'] for line in lines[1:-1]) == ['one.pdf', 'two.pdf']
+    assert lines[-1]['parsed'] == 2
+
+
+def test_too_many_zip_members_rejected_before_decompressing(client, monkeypatch, no_decompression):
+    monkeypatch.setattr(backend, 'MAX_BATCH_FILES', 3)
+    archive = zipped([(f'{i}.pdf', resume_pdf(i)) for i in range(4)])
+
+    response = upload(client, (archive, 'batch.zip'))
+
+    assert response.status_code == 400
+    assert response.json['error'] == 'Too many files; the limit is 3'
+
+
+def test_plain_files_count_towards_the_zip_limit(client, monkeypatch, no_decompression):
+    monkeypatch.setattr(backend, 'MAX_BATCH_FILES', 3)
+    archive = zipped([(f'{i}.pdf', resume_pdf(i)) for i in range(2)])
+
+    response = upload(client, (io.BytesIO(resume_pdf(7)), 'a.pdf'), (io.BytesIO(resume_pdf(8)), 'b.pdf'), (archive, 'batch.zip'))
+
+    assert response.status_code == 400
+
+
+def test_uncompressed_size_limit(client, monkeypatch, no_decompression):
+    monkeypatch.setattr(backend, 'MAX_BATCH_BYTES', 1024 * 1024)
+    # Compresses to a few kB each
+    archive = zipped([(f'{i}.pdf', b'%PDF-1.4\n' + b'0' * 600 * 1024) for i in range(2)])
+
+    response = upload(client, (archive, 'bomb.zip'))
+
+    assert response.status_code == 400
+    assert 'uncompressed' in response.json['error']